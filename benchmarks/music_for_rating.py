@@ -0,0 +1,44 @@
+"""
+Times `parse_music_for_rating` on a level folder page.
+
+Run with `python -m benchmarks.music_for_rating`.
+"""
+import importlib.util
+import timeit
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from chunithm_net.parser import parse_music_for_rating
+
+PAGE = (
+    Path(__file__).parent.parent
+    / "tests"
+    / "chunithm_net"
+    / "assets"
+    / "music_record_by_level_folder.html"
+)
+
+
+def main():
+    content = PAGE.read_bytes()
+    features = ["html.parser"]
+    if importlib.util.find_spec("lxml"):
+        features.insert(0, "lxml")
+
+    for feature in features:
+        soup = BeautifulSoup(content, feature)
+        records = len(parse_music_for_rating(soup))
+
+        timer = timeit.Timer(lambda: parse_music_for_rating(soup))  # noqa: B023
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=5, number=number)) / number
+
+        print(
+            f"{feature}: {best * 1000:.2f} ms per page, "
+            f"{best / records * 1e6:.1f} µs per record ({records} records)"
+        )
+
+
+if __name__ == "__main__":
+    main()
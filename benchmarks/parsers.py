@@ -0,0 +1,323 @@
+"""
+Times every `parse_*` function, and `ChuniNet._request_parsed` end-to-end against
+a mocked transport, on the pages in `tests/chunithm_net/assets`, once for each
+BeautifulSoup feature.
+
+Run with `python -m benchmarks.parsers`. Reports operations per second, p95 time
+and peak allocated memory for every case.
+
+Timings depend on the machine, so no baselines are committed: record them on
+your machine with `--save-baseline` before changing a parser, which writes
+`benchmarks/baselines.json`, then run with `--compare` after the change.
+
+    python -m benchmarks.parsers --save-baseline
+    # change a parser
+    python -m benchmarks.parsers --compare
+
+The comparison exits with status 1 if any case got slower or used more memory
+than the baseline, beyond `--tolerance`. It also fails if the baselines file is
+missing, or has no baseline for a case that was run, rather than passing without
+comparing anything.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from http.cookiejar import CookieJar
+from pathlib import Path
+from typing import Any, Optional
+from unittest.mock import patch
+
+import httpx
+from bs4 import BeautifulSoup
+
+from chunithm_net import ChuniNet, _bs4, parser
+
+ASSETS = Path(__file__).parent.parent / "tests" / "chunithm_net" / "assets"
+BASELINES = Path(__file__).parent / "baselines.json"
+
+# Pages are streamed to the client in chunks of this size, roughly what a TLS
+# connection delivers at once.
+CHUNK_SIZE = 16 * 1024
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    asset: str
+    parser: str
+    args: tuple = ()
+
+
+CASES = [
+    Case(
+        "player_card_and_avatar",
+        "logged_in_homepage.html",
+        "parse_player_card_and_avatar",
+    ),
+    Case("player_data", "player_data.html", "parse_player_data"),
+    Case("recent_records", "playlog.html", "parse_recent_records"),
+    Case(
+        "detailed_recent_record",
+        "playlog_detail.html",
+        "parse_detailed_recent_record",
+    ),
+    Case("music_record", "music_record.html", "parse_music_record", (428,)),
+    Case(
+        "worlds_end_music_record",
+        "worlds_end_music_record.html",
+        "parse_music_record",
+        (8218,),
+    ),
+    Case("best30", "best30.html", "parse_music_for_rating"),
+    Case("recent10", "recent10.html", "parse_music_for_rating"),
+    Case(
+        "music_record_by_folder",
+        "music_record_by_level_folder.html",
+        "parse_music_for_rating",
+    ),
+]
+
+
+@dataclass
+class Result:
+    ops_per_sec: float
+    p95_ms: float
+    peak_kib: float
+
+
+def _summarize(samples: list[float], peak: int) -> Result:
+    p95 = statistics.quantiles(samples, n=20)[18] if len(samples) > 1 else samples[0]
+
+    return Result(
+        ops_per_sec=len(samples) / sum(samples),
+        p95_ms=p95 * 1000,
+        peak_kib=peak / 1024,
+    )
+
+
+def _measure(run: Callable[[], Any], min_time: float) -> Result:
+    run()  # warm up
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = []
+    deadline = time.perf_counter() + min_time
+
+    while len(samples) < 5 or time.perf_counter() < deadline:
+        started_at = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started_at)
+
+    return _summarize(samples, peak)
+
+
+async def _measure_async(run: Callable[[], Awaitable[Any]], min_time: float) -> Result:
+    await run()
+
+    tracemalloc.start()
+    await run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = []
+    deadline = time.perf_counter() + min_time
+
+    while len(samples) < 5 or time.perf_counter() < deadline:
+        started_at = time.perf_counter()
+        await run()
+        samples.append(time.perf_counter() - started_at)
+
+    return _summarize(samples, peak)
+
+
+def bench_parse(case: Case, feature: str, min_time: float) -> Result:
+    soup = BeautifulSoup((ASSETS / case.asset).read_bytes(), feature)
+    parse = getattr(parser, case.parser)
+
+    return _measure(lambda: parse(soup, *case.args), min_time)
+
+
+def _mock_transport(content: bytes) -> httpx.MockTransport:
+    async def stream():
+        for start in range(0, len(content), CHUNK_SIZE):
+            yield content[start : start + CHUNK_SIZE]
+
+    def handler(_: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "text/html; charset=UTF-8"},
+            content=stream(),
+        )
+
+    return httpx.MockTransport(handler)
+
+
+async def bench_request(case: Case, feature: str, min_time: float) -> Result:
+    transport = _mock_transport((ASSETS / case.asset).read_bytes())
+
+    async def run():
+        return await client._request_parsed(
+            case.parser, "GET", "/mobile/benchmark/", parser_args=case.args
+        )
+
+    with patch.object(_bs4, "BS4_FEATURE", feature), patch(
+        "chunithm_net._engine", parser
+    ):
+        async with ChuniNet(CookieJar(), transport=transport) as client:
+            return await _measure_async(run, min_time)
+
+
+def run_benchmarks(
+    features: list[str], min_time: float, only: Optional[str]
+) -> dict[str, dict[str, Result]]:
+    results: dict[str, dict[str, Result]] = {}
+    cases = [case for case in CASES if only is None or only in case.name]
+
+    for feature in features:
+        feature_results = results[feature] = {}
+
+        for case in cases:
+            name = f"parse/{case.name}"
+            feature_results[name] = bench_parse(case, feature, min_time)
+            _print_result(feature, name, feature_results[name])
+
+        for case in cases:
+            name = f"request/{case.name}"
+            feature_results[name] = asyncio.run(bench_request(case, feature, min_time))
+            _print_result(feature, name, feature_results[name])
+
+    return results
+
+
+def _print_result(feature: str, name: str, result: Result) -> None:
+    print(
+        f"{feature:<12} {name:<36} {result.ops_per_sec:>10.1f} ops/s "
+        f"p95 {result.p95_ms:>8.3f} ms  peak {result.peak_kib:>9.1f} KiB"
+    )
+
+
+def compare(
+    results: dict[str, dict[str, Result]],
+    baselines: dict[str, dict[str, dict[str, float]]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Returns a description of every regression from the baselines. A case with no
+    baseline counts as a regression, so a stale baselines file can't hide one.
+    """
+    regressions = []
+
+    for feature, feature_results in results.items():
+        for name, result in feature_results.items():
+            label = f"{feature} {name}"
+
+            if (baseline := baselines.get(feature, {}).get(name)) is None:
+                regressions.append(f"{label}: no baseline, run with --save-baseline")
+                continue
+
+            if result.ops_per_sec < baseline["ops_per_sec"] * (1 - tolerance):
+                regressions.append(
+                    f"{label}: {result.ops_per_sec:.1f} ops/s, "
+                    f"was {baseline['ops_per_sec']:.1f}"
+                )
+            if result.p95_ms > baseline["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{label}: p95 {result.p95_ms:.3f} ms, "
+                    f"was {baseline['p95_ms']:.3f}"
+                )
+            if result.peak_kib > baseline["peak_kib"] * (1 + tolerance):
+                regressions.append(
+                    f"{label}: peak {result.peak_kib:.1f} KiB, "
+                    f"was {baseline['peak_kib']:.1f}"
+                )
+
+    return regressions
+
+
+def main() -> int:
+    argparser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    argparser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.5,
+        help="Minimum time, in seconds, spent timing each case.",
+    )
+    argparser.add_argument(
+        "--only", help="Only run the cases whose name contains this string."
+    )
+    argparser.add_argument("--baselines", type=Path, default=BASELINES)
+    argparser.add_argument(
+        "--save-baseline",
+        "--save",
+        dest="save_baseline",
+        action="store_true",
+        help="Store the results as the baselines.",
+    )
+    argparser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Fail if the results regressed from the baselines.",
+    )
+    argparser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed relative regression before a comparison fails.",
+    )
+    args = argparser.parse_args()
+
+    features = ["html.parser"]
+    if importlib.util.find_spec("lxml"):
+        features.insert(0, "lxml")
+
+    results = run_benchmarks(features, args.min_time, args.only)
+
+    if args.save_baseline:
+        baselines = {}
+        if args.baselines.exists():
+            baselines = json.loads(args.baselines.read_text())
+
+        for feature, feature_results in results.items():
+            baselines.setdefault(feature, {}).update(
+                {name: asdict(result) for name, result in feature_results.items()}
+            )
+
+        args.baselines.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"Saved baselines to {args.baselines}")
+
+    if args.compare:
+        if not args.baselines.exists():
+            print(
+                f"No baselines at {args.baselines}, "
+                "run with --save-baseline before changing a parser",
+                file=sys.stderr,
+            )
+            return 1
+
+        regressions = compare(
+            results, json.loads(args.baselines.read_text()), args.tolerance
+        )
+
+        if regressions:
+            print("Regressions:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+
+        print("No regressions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
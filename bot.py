@@ -17,6 +17,7 @@ from rapidfuzz import fuzz
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from chunithm_net import close_connection_pool
 from cogs import COG_LIST
 from database.models import Prefix
 from utils.config import config
@@ -124,6 +125,8 @@ class ChuniBot(commands.Bot):
         if hasattr(self, "engine"):
             await self.engine.dispose()
 
+        await close_connection_pool()
+
         return await super().close()
 
 
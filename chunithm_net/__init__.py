@@ -1,41 +1,119 @@
+import asyncio
 import dataclasses
+import itertools
+import os
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Iterable
+from contextvars import ContextVar
 from http.cookiejar import CookieJar
-from typing import TYPE_CHECKING, Optional
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
 
 import httpx
 from bs4 import BeautifulSoup
 
 from ._bs4 import BS4_FEATURE
 from ._httpx_hooks import raise_on_chunithm_net_error, raise_on_scheduled_maintenance
+from ._transport import SHARED_TRANSPORT, close_connection_pool
+from .cache import DataVersion, ResponseCache
 from .consts import _KEY_DETAILED_PARAMS
+from .exceptions import ChuniNetError, InvalidTokenException
+from .memo import ParseMemo
+from .models.batch import RecordBatch
 from .models.enums import Difficulty, Genres, Rank
 from .models.record import MusicRecord, RecentRecord, Record
-from .exceptions import ChuniNetError, InvalidTokenException
-from .parser import (
-    parse_basic_recent_record,
-    parse_detailed_recent_record,
-    parse_music_for_rating,
-    parse_music_record,
-    parse_player_card_and_avatar,
-    parse_player_data,
-)
+from .parser_pool import ParserPool, parse_document
+from .ratelimit import RateLimiter
 
 if TYPE_CHECKING:
     from chunithm_net.models.player_data import PlayerData
 
-__all__ = ["ChuniNet"]
+__all__ = [
+    "ChuniNet",
+    "ParseMemo",
+    "ParserPool",
+    "RateLimiter",
+    "ResponseCache",
+    "close_connection_pool",
+    "load_parser_engine",
+]
+
+T = TypeVar("T")
+
+
+def load_parser_engine(name: str) -> ModuleType:
+    """Returns the module implementing the parsers of a parser engine.
+
+    Both engines implement the same `parse_*` functions, and produce identical
+    results:
+    - `bs4`: BeautifulSoup with CSS selectors. The default.
+    - `lxml`: raw lxml trees with precompiled XPath expressions. Faster, but
+      requires lxml.
+    """
+    if name == "bs4":
+        from . import parser
+
+        return parser
+
+    if name == "lxml":
+        from . import parser_lxml
+
+        return parser_lxml
+
+    msg = f"Unknown parser engine: {name}"
+    raise ValueError(msg)
+
+
+# Selected once, when chunithm_net is first imported.
+_engine = load_parser_engine(os.environ.get("CHUNITHM_NET_PARSER_ENGINE", "bs4"))
 
 _AUTHENTICATION_URL = httpx.URL(
     "https://lng-tgk-aime-gw.am-all.net/common_auth/login?site_id=chuniex&redirect_url=https://chunithm-net-eng.com/mobile/&back_url=https://chunithm.sega.com/"
 )
 _BASE_URL = httpx.URL("https://chunithm-net-eng.com")
 
+# CHUNITHM-NET sessions expire after a period of inactivity, after which every
+# request fails with error 200002/200004 until the session is re-authenticated.
+_SESSION_LIFETIME = 10 * 60
+
+# Delay before the first retry of a request that failed with a transient error,
+# doubled on every subsequent retry.
+_RETRY_BACKOFF = 0.5
+
+
+# Set while a page is fetched for the response cache. The cache only ever hands
+# out copies of what it stores, so the parse memo doesn't have to copy it first.
+_fetching_for_cache: ContextVar[bool] = ContextVar(
+    "_fetching_for_cache", default=False
+)
+
+
+def _data_version(player_data: "PlayerData") -> DataVersion:
+    return DataVersion(player_data.last_play_date, player_data.playcount)
+
 
 class ChuniNet:
-    def __init__(self, cookies: CookieJar) -> None:
+    def __init__(
+        self,
+        cookies: CookieJar,
+        *,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        session_lifetime: float = _SESSION_LIFETIME,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        user_key: Optional[Hashable] = None,
+        parser_pool: Optional[ParserPool] = None,
+        parse_memo: Optional[ParseMemo] = None,
+    ) -> None:
+        if cache is not None and user_key is None:
+            msg = "user_key must be set when a response cache is used"
+            raise ValueError(msg)
+
         self.session = httpx.AsyncClient(
             cookies=cookies,
+            transport=transport if transport is not None else SHARED_TRANSPORT,
             event_hooks={
+                "request": [self._wait_for_rate_limit],
                 "response": [
                     raise_on_scheduled_maintenance,
                     raise_on_chunithm_net_error,
@@ -44,6 +122,29 @@ class ChuniNet:
             follow_redirects=True,
         )
 
+        self.session_lifetime = session_lifetime
+
+        # Monotonic timestamp of the last time CHUNITHM-NET accepted this session.
+        # None if we don't know yet.
+        self.last_validated: Optional[float] = None
+
+        self._reauthentication: Optional[asyncio.Task[httpx.Response]] = None
+
+        # CHUNITHM-NET remembers the song, folder or play last selected with a POST
+        # on the session, and shows it on the page the POST redirects to. Selections
+        # are made one at a time, so they can't show each other's page.
+        self._selection_lock = asyncio.Lock()
+
+        # Parsed pages and the fair share of the rate limit belong to the user,
+        # not to the client, since a user can have more than one client.
+        self.user_key = user_key
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+
+        # Shared between clients, and owned by whoever created them.
+        self.parser_pool = parser_pool
+        self.parse_memo = parse_memo
+
     async def __aenter__(self):
         return self
 
@@ -53,21 +154,46 @@ class ChuniNet:
     async def close(self):
         await self.session.aclose()
 
-    async def authenticate(self) -> "PlayerData":
-        soup = await self._request_soup("GET", "/mobile/home/")
+    async def authenticate(
+        self,
+        *,
+        on_revalidate: Optional[Callable[["PlayerData"], Awaitable[Any]]] = None,
+    ) -> "PlayerData":
+        return await self._cached(
+            "authenticate",
+            (),
+            self._authenticate,
+            on_revalidate=on_revalidate,
+            data_version=_data_version,
+        )
 
-        return parse_player_card_and_avatar(soup)
+    async def _authenticate(self) -> "PlayerData":
+        return await self._request_parsed(
+            "parse_player_card_and_avatar", "GET", "/mobile/home/"
+        )
 
-    async def player_data(self):
-        soup = await self._request_soup("GET", "/mobile/home/playerData")
+    async def player_data(
+        self,
+        *,
+        on_revalidate: Optional[Callable[["PlayerData"], Awaitable[Any]]] = None,
+    ) -> "PlayerData":
+        return await self._cached(
+            "player_data",
+            (),
+            self._player_data,
+            on_revalidate=on_revalidate,
+            data_version=_data_version,
+        )
 
-        return parse_player_data(soup)
+    async def _player_data(self) -> "PlayerData":
+        return await self._request_parsed(
+            "parse_player_data", "GET", "/mobile/home/playerData"
+        )
 
     async def recent_record(self) -> list[RecentRecord]:
-        soup = await self._request_soup("GET", "/mobile/record/playlog")
-        web_records = soup.select(".frame02.w400")
-
-        return [parse_basic_recent_record(record) for record in web_records]
+        return await self._request_parsed(
+            "parse_recent_records", "GET", "/mobile/record/playlog"
+        )
 
     async def detailed_recent_record(self, recent_record: RecentRecord | int):
         if isinstance(recent_record, int):
@@ -78,54 +204,160 @@ class ChuniNet:
         else:
             params = dataclasses.asdict(recent_record.extras[_KEY_DETAILED_PARAMS])
 
-        soup = await self._request_soup(
-            "POST",
-            "/mobile/record/playlog/sendPlaylogDetail/",
-            data=params,
+        async with self._selection_lock:
+            return await self._request_parsed(
+                "parse_detailed_recent_record",
+                "POST",
+                "/mobile/record/playlog/sendPlaylogDetail/",
+                data=params,
+            )
+
+    async def music_record(
+        self,
+        idx: int,
+        *,
+        on_revalidate: Optional[Callable[[list[MusicRecord]], Awaitable[Any]]] = None,
+    ) -> list[MusicRecord]:
+        return await self._cached(
+            "music_record",
+            (idx,),
+            lambda: self._music_record(idx),
+            on_revalidate=on_revalidate,
+            versioned=True,
         )
 
-        return parse_detailed_recent_record(soup)
+    async def music_record_many(
+        self,
+        idxs: Iterable[int],
+        *,
+        concurrency: int = 4,
+        retries: int = 2,
+    ) -> AsyncIterator[tuple[int, list[MusicRecord]]]:
+        """Get records for multiple songs, fetching up to `concurrency` of them at
+        once.
+
+        CHUNITHM-NET shows the song last selected on the session, and a client
+        only has one session, so song pages are still selected and read one at a
+        time, WORLD'S END songs included. Only cache hits and retry backoffs
+        overlap with other songs being fetched. Callers still get every song as
+        soon as it is ready.
 
-    async def music_record(self, idx: int) -> list[MusicRecord]:
+        Parameters
+        ----------
+        idxs: Iterable[int]
+            IDs of the songs to get records for. Duplicates are only fetched once.
+        concurrency: int
+            Maximum number of songs being fetched at the same time.
+        retries: int
+            Number of times a song page is requested again after a transient
+            network error.
+
+        Returns
+        -------
+        AsyncIterator[tuple[int, list[MusicRecord]]]: Song IDs and their records,
+        in the order they finished fetching.
+
+        Exceptions
+        ----------
+        httpx.TransportError:
+            When a song page still can't be fetched after `retries` retries. The
+            remaining songs are not fetched.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_with_retries(idx: int, attempt: int = 0) -> list[MusicRecord]:
+            try:
+                return await self.music_record(idx)
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+
+            await asyncio.sleep(_RETRY_BACKOFF * 2**attempt)
+            return await fetch_with_retries(idx, attempt + 1)
+
+        async def fetch(idx: int) -> tuple[int, list[MusicRecord]]:
+            async with semaphore:
+                return idx, await fetch_with_retries(idx)
+
+        tasks = [asyncio.create_task(fetch(idx)) for idx in dict.fromkeys(idxs)]
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _music_record(self, idx: int) -> list[MusicRecord]:
         if idx >= 8000:
             return await self._worlds_end_music_record(idx)
 
-        soup = await self._request_soup(
-            "POST",
-            "/mobile/record/musicGenre/sendMusicDetail/",
-            data={
-                "idx": idx,
-                "token": self._token,
-            },
-        )
-
-        return parse_music_record(soup, idx)
+        async with self._selection_lock:
+            return await self._request_parsed(
+                "parse_music_record",
+                "POST",
+                "/mobile/record/musicGenre/sendMusicDetail/",
+                parser_args=(idx,),
+                data={
+                    "idx": idx,
+                    "token": self._token,
+                },
+            )
 
     async def _worlds_end_music_record(self, idx: int) -> list[MusicRecord]:
-        soup = await self._request_soup(
-            "POST",
-            "/mobile/record/worldsEndList/sendWorldsEndDetail/",
-            data={
-                "idx": idx,
-                "token": self._token,
-            },
-        )
-
-        return parse_music_record(soup, idx)
+        async with self._selection_lock:
+            return await self._request_parsed(
+                "parse_music_record",
+                "POST",
+                "/mobile/record/worldsEndList/sendWorldsEndDetail/",
+                parser_args=(idx,),
+                data={
+                    "idx": idx,
+                    "token": self._token,
+                },
+            )
 
-    async def best30(self) -> list[Record]:
-        soup = await self._request_soup(
-            "GET", "/mobile/home/playerData/ratingDetailBest/"
+    async def best30(
+        self,
+        *,
+        on_revalidate: Optional[Callable[[list[Record]], Awaitable[Any]]] = None,
+    ) -> list[Record]:
+        return await self._cached(
+            "best30",
+            (),
+            self._best30,
+            on_revalidate=on_revalidate,
+            versioned=True,
         )
 
-        return parse_music_for_rating(soup)
+    async def _best30(self) -> list[Record]:
+        return await self._request_parsed(
+            "parse_music_for_rating",
+            "GET",
+            "/mobile/home/playerData/ratingDetailBest/",
+        )
 
-    async def recent10(self) -> list[Record]:
-        soup = await self._request_soup(
-            "GET", "/mobile/home/playerData/ratingDetailRecent/"
+    async def recent10(
+        self,
+        *,
+        on_revalidate: Optional[Callable[[list[Record]], Awaitable[Any]]] = None,
+    ) -> list[Record]:
+        return await self._cached(
+            "recent10",
+            (),
+            self._recent10,
+            on_revalidate=on_revalidate,
+            versioned=True,
         )
 
-        return parse_music_for_rating(soup)
+    async def _recent10(self) -> list[Record]:
+        return await self._request_parsed(
+            "parse_music_for_rating",
+            "GET",
+            "/mobile/home/playerData/ratingDetailRecent/",
+        )
 
     async def music_record_by_folder(
         self,
@@ -167,8 +399,73 @@ class ChuniNet:
             When genre/rank is specified but difficulty is not set, or when no
             criteria is provided.
         """
+        return await self._cached(
+            "music_record_by_folder",
+            (level, genre, rank, difficulty),
+            lambda: self._music_record_by_folder(
+                level=level, genre=genre, rank=rank, difficulty=difficulty
+            ),
+            versioned=True,
+        )
+
+    async def music_record_batch_by_folder(
+        self,
+        *,
+        level: Optional[str] = None,
+        genre: Optional[Genres] = None,
+        rank: Optional[Rank] = None,
+        difficulty: Optional[Difficulty] = None,
+    ) -> RecordBatch:
+        """Same as `music_record_by_folder`, but returns the records as a
+        `RecordBatch`, which is cheaper to keep around for large folders."""
+
+        async def fetch() -> RecordBatch:
+            return RecordBatch(
+                await self._music_record_by_folder(
+                    level=level, genre=genre, rank=rank, difficulty=difficulty
+                )
+            )
+
+        return await self._cached(
+            "music_record_batch_by_folder",
+            (level, genre, rank, difficulty),
+            fetch,
+            versioned=True,
+        )
+
+    async def personal_bests(self) -> list[Record]:
+        """Get the best records for every chart the player has played.
+
+        Fetches the folder of every difficulty at once. A client only has one
+        session, on which difficulties are still selected one at a time, so only
+        the WORLD'S END folder, which needs no selection, and parsing overlap
+        with the other folders.
+
+        Returns
+        -------
+        list[Record]: Records of every played chart, by difficulty.
+        """
+        folders = await asyncio.gather(
+            *(
+                self.music_record_by_folder(difficulty=difficulty)
+                for difficulty in Difficulty
+            )
+        )
+
+        return list(itertools.chain.from_iterable(folders))
+
+    async def _music_record_by_folder(
+        self,
+        *,
+        level: Optional[str] = None,
+        genre: Optional[Genres] = None,
+        rank: Optional[Rank] = None,
+        difficulty: Optional[Difficulty] = None,
+    ) -> list[Record]:
+        data: Optional[dict[str, str]] = None
+
         if difficulty == Difficulty.WORLDS_END:
-            soup = await self._request_soup("GET", "/mobile/record/worldsEndList")
+            method, path = "GET", "/mobile/record/worldsEndList"
         elif level is not None:
             plus_level = level[-1] == "+"
             level_num = int(level[:-1] if plus_level else level)
@@ -176,27 +473,22 @@ class ChuniNet:
                 level_num - 1 + max(0, level_num - 7) + (1 if plus_level else 0)
             )
 
-            soup = await self._request_soup(
-                "POST",
-                "/mobile/record/musicLevel/sendSearch/",
-                data={
-                    "level": str(level_value),
-                    "token": self._token,
-                },
-            )
+            method, path = "POST", "/mobile/record/musicLevel/sendSearch/"
+            data = {
+                "level": str(level_value),
+                "token": self._token,
+            }
         elif genre is not None:
             if difficulty is None:
                 msg = "Difficulty cannot be None when genre is specified"
                 raise ValueError(msg)
 
-            soup = await self._request_soup(
-                "POST",
-                f"/mobile/record/musicGenre/send{str(difficulty).capitalize()}",
-                data={
-                    "genre": genre.value,
-                    "token": self._token,
-                },
-            )
+            method = "POST"
+            path = f"/mobile/record/musicGenre/send{str(difficulty).capitalize()}"
+            data = {
+                "genre": genre.value,
+                "token": self._token,
+            }
         elif rank is not None:
             if difficulty is None:
                 msg = "Difficulty cannot be None when genre is specified"
@@ -206,28 +498,30 @@ class ChuniNet:
             if value < Rank.S.value:
                 value = 7
 
-            soup = await self._request_soup(
-                "POST",
-                f"/mobile/record/musicRank/send{str(difficulty).capitalize()}",
-                data={
-                    "rank": str(rank.value),
-                    "token": self._token,
-                },
-            )
+            method = "POST"
+            path = f"/mobile/record/musicRank/send{str(difficulty).capitalize()}"
+            data = {
+                "rank": str(rank.value),
+                "token": self._token,
+            }
         elif difficulty is not None:
-            soup = await self._request_soup(
-                "POST",
-                f"/mobile/record/musicGenre/send{str(difficulty).capitalize()}",
-                data={
-                    "genre": "99",
-                    "token": self._token,
-                },
-            )
+            method = "POST"
+            path = f"/mobile/record/musicGenre/send{str(difficulty).capitalize()}"
+            data = {
+                "genre": "99",
+                "token": self._token,
+            }
         else:
             msg = "No search criteria specified"
             raise ValueError(msg)
 
-        return parse_music_for_rating(soup)
+        if method == "GET":
+            return await self._request_parsed("parse_music_for_rating", method, path)
+
+        async with self._selection_lock:
+            return await self._request_parsed(
+                "parse_music_for_rating", method, path, data=data
+            )
 
     async def change_player_name(self, new_name: str) -> bool:
         resp = await self._request(
@@ -245,10 +539,11 @@ class ChuniNet:
         )
 
         if resp.url.path == "/mobile/home/userOption/":
+            await resp.aclose()
             return True
 
-        text = "".join([part async for part in resp.aiter_text()])
-        soup = BeautifulSoup(text, BS4_FEATURE)
+        await resp.aread()
+        soup = BeautifulSoup(resp.content, BS4_FEATURE)
 
         if (error_message := soup.select_one(".text_red")) is not None:
             msg = error_message.get_text(strip=True)
@@ -259,28 +554,158 @@ class ChuniNet:
 
     async def logout(self) -> bool:
         resp = await self._request("GET", "mobile/home/userOption/logout/")
+        await resp.aclose()
+
         return resp.url.host == _AUTHENTICATION_URL.host
 
     @property
     def _token(self):
         return self.session.cookies.get("_t", domain=_BASE_URL.host)
 
-    async def _request_soup(
+    @property
+    def session_expires_in(self) -> Optional[float]:
+        """Estimated number of seconds until the session expires, or None if the
+        session hasn't been validated yet."""
+        if self.last_validated is None:
+            return None
+
+        return self.last_validated + self.session_lifetime - time.monotonic()
+
+    def session_expires_soon(self, margin: float) -> bool:
+        expires_in = self.session_expires_in
+        return expires_in is not None and expires_in <= margin
+
+    async def refresh_session(self) -> None:
+        """Re-authenticates the session before CHUNITHM-NET expires it."""
+        await self._reauthenticate()
+
+    async def _wait_for_rate_limit(self, _: httpx.Request) -> None:
+        # Runs for every request sent, including redirects and re-authentication.
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(self.user_key)
+
+    async def _cached(
+        self,
+        endpoint: str,
+        params: tuple,
+        fetch: Callable[[], Awaitable[T]],
+        *,
+        on_revalidate: Optional[Callable[[T], Awaitable[Any]]] = None,
+        data_version: Optional[Callable[[T], DataVersion]] = None,
+        versioned: bool = False,
+    ) -> T:
+        """Fetches a page through the response cache, if there is one.
+
+        Pages that are `versioned` only change when the player plays, so once
+        they expire they are revalidated by checking the player's data version on
+        the home page instead of being fetched again.
+        """
+        if self.cache is None:
+            return await fetch()
+
+        async def fetch_for_cache() -> T:
+            token = _fetching_for_cache.set(True)  # noqa: FBT003
+
+            try:
+                return await fetch()
+            finally:
+                _fetching_for_cache.reset(token)
+
+        return await self.cache.get_or_fetch(
+            self.user_key,
+            endpoint,
+            params,
+            fetch_for_cache,
+            on_revalidate=on_revalidate,
+            data_version=data_version,
+            check_version=self.authenticate if versioned else None,
+        )
+
+    async def _request_parsed(
         self,
+        parser: str,
         method: str,
         path: str,
+        *,
+        parser_args: tuple = (),
         **kwargs,
-    ) -> BeautifulSoup:
+    ) -> Any:
+        """Requests a page and parses it with the parser engine function named
+        `parser`, on the parser pool if there is one.
+
+        Without a parse memo, pages are parsed as they arrive, unless they turn
+        out to be large enough to be handed off to the parser pool, in which case
+        the whole page is received first. With one, the page is received and
+        hashed first, and only parsed if its digest isn't in the memo.
+        """
         resp = await self._request(method, path, **kwargs)
-        text = "".join([part async for part in resp.aiter_text()])
+        encoding = resp.charset_encoding or "utf-8"
+        pool = self.parser_pool
+        memo = self.parse_memo
+        hasher = ParseMemo.hasher() if memo is not None else None
+
+        # Building the document while the page streams in would be wasted on a
+        # memo hit, so it's only done without a memo.
+        builder: Optional[Any] = (
+            _engine.DocumentBuilder(encoding) if memo is None else None
+        )
+        content = bytearray()
 
-        return BeautifulSoup(text, BS4_FEATURE)
+        try:
+            async for chunk in resp.aiter_bytes():
+                if hasher is not None:
+                    hasher.update(chunk)
+
+                if pool is not None or memo is not None:
+                    content += chunk
+
+                # Too large to parse inline after all, so the page is handed off
+                # to the pool once all of it has been received.
+                if pool is not None and len(content) >= pool.inline_threshold:
+                    builder = None
+
+                if builder is not None:
+                    builder.feed(chunk)
+        finally:
+            await resp.aclose()
+
+        async def parse() -> Any:
+            if builder is not None:
+                return getattr(_engine, parser)(builder.close(), *parser_args)
+
+            if pool is not None and len(content) >= pool.inline_threshold:
+                return await pool.parse(
+                    _engine, parser, bytes(content), encoding, *parser_args
+                )
+
+            return parse_document(
+                _engine.__name__, parser, bytes(content), encoding, *parser_args
+            )
+
+        if memo is None or hasher is None:
+            return await parse()
+
+        return await memo.get_or_parse(
+            _engine.__name__,
+            parser,
+            hasher.digest(),
+            encoding,
+            parser_args,
+            parse,
+            shared=_fetching_for_cache.get(),
+        )
 
     async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
         url = _BASE_URL.join(path)
 
+        # Known to be expired, so skip the request that would fail anyways.
+        if self.session_expires_soon(0) and (
+            auth_response := await self._reauthenticate(method, url)
+        ):
+            return auth_response
+
         try:
-            response = await self.session.request(method, url, **kwargs)
+            response = await self._send(method, url, **kwargs)
 
             if response.url.path == "/mobile/":
                 await response.aclose()
@@ -293,16 +718,55 @@ class ChuniNet:
             }:
                 raise
         else:
+            self.last_validated = time.monotonic()
             return response
 
+        if auth_response := await self._reauthenticate(method, url):
+            return auth_response
+
+        return await self._send(method, url, **kwargs)
+
+    async def _send(self, method: str, url: httpx.URL, **kwargs) -> httpx.Response:
+        # The body is left unread, so the caller can process it as it arrives.
+        # Callers must read or close the response.
+        request = self.session.build_request(method, url, **kwargs)
+        return await self.session.send(request, stream=True)
+
+    async def _reauthenticate(
+        self, method: Optional[str] = None, url: Optional[httpx.URL] = None
+    ) -> Optional[httpx.Response]:
+        """Re-authenticates the session. Concurrent callers share the same attempt.
+
+        The authentication flow ends on a CHUNITHM-NET page. If that page is the
+        one requested with `method` and `url`, its response is returned to the
+        caller that started the attempt so it doesn't have to be requested again.
+        """
+        if (task := self._reauthentication) is not None:
+            await asyncio.shield(task)
+            return None
+
+        task = self._reauthentication = asyncio.create_task(
+            self._authentication_flow()
+        )
+        task.add_done_callback(self._reauthentication_done)
+
+        auth_response = await asyncio.shield(task)
+
+        if method == "GET" and str(url) == str(auth_response.url):
+            return auth_response
+
+        await auth_response.aclose()
+        return None
+
+    def _reauthentication_done(self, _: asyncio.Task) -> None:
+        self._reauthentication = None
+
+    async def _authentication_flow(self) -> httpx.Response:
         auth_response = await self.session.get(_AUTHENTICATION_URL)
 
         if auth_response.url.host == _AUTHENTICATION_URL.host:
             await auth_response.aclose()
             raise InvalidTokenException
 
-        if str(url) == str(auth_response.url):
-            return auth_response
-
-        await auth_response.aclose()
-        return await self.session.request(method, url, **kwargs)
+        self.last_validated = time.monotonic()
+        return auth_response
@@ -1,3 +1,63 @@
 import importlib.util
 
+from bs4 import BeautifulSoup
+
 BS4_FEATURE = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+class IncrementalSoup:
+    """
+    Builds a `BeautifulSoup` tree from a document received in chunks of bytes.
+
+    With lxml, every chunk is parsed as soon as it is fed, so parsing overlaps
+    with the transfer and the document is never held in memory as a whole.
+    html.parser can't be fed bytes, so the chunks are buffered and parsed when
+    the document is complete.
+    """
+
+    def __init__(self, encoding: str = "utf-8") -> None:
+        self.encoding = encoding
+
+        self._buffer = bytearray()
+        self._soup = None
+        self._parser = None
+
+        if BS4_FEATURE != "lxml":
+            return
+
+        # Mirrors what `BeautifulSoup.__init__` does, minus reading the whole
+        # document upfront.
+        soup = BeautifulSoup(b"", BS4_FEATURE, from_encoding=encoding)
+        soup.builder.initialize_soup(soup)
+        soup.reset()
+        soup.builder.reset()
+
+        self._soup = soup
+        self._parser = soup.builder.parser_for(encoding)  # type: ignore[reportAttributeAccessIssue]
+
+    def feed(self, data: bytes) -> None:
+        if self._parser is None:
+            self._buffer += data
+        else:
+            self._parser.feed(data)
+
+    def close(self) -> BeautifulSoup:
+        if self._parser is None or self._soup is None:
+            return BeautifulSoup(
+                bytes(self._buffer), BS4_FEATURE, from_encoding=self.encoding
+            )
+
+        soup = self._soup
+        self._parser.close()
+
+        # Close out any unfinished strings and tags, then drop the builder's
+        # circular reference to the tree.
+        soup.endData()
+        while (
+            soup.currentTag is not None
+            and soup.currentTag.name != soup.ROOT_TAG_NAME
+        ):
+            soup.popTag()
+        soup.builder.soup = None
+
+        return soup
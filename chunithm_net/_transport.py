@@ -0,0 +1,58 @@
+import asyncio
+from typing import ClassVar
+from weakref import WeakKeyDictionary
+
+import httpx
+
+# CHUNITHM-NET keeps idle connections open for a while, so we hold on to them
+# between commands instead of paying DNS + TCP + TLS for every request.
+_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=120,
+)
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """
+    A transport that forwards every request to a process-wide connection pool.
+
+    Each `httpx.AsyncClient` keeps its own cookie jar, so sessions of different
+    users stay isolated, while the underlying TCP/TLS connections are reused.
+    Closing a client does not close the pool; use `close_connection_pool` when
+    the process is shutting down.
+
+    Connections are bound to the event loop they were opened in, so one pool is
+    kept per running loop.
+    """
+
+    _pools: ClassVar[
+        "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]"
+    ] = WeakKeyDictionary()
+
+    @classmethod
+    def pool(cls) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+
+        if (pool := cls._pools.get(loop)) is None:
+            pool = cls._pools[loop] = httpx.AsyncHTTPTransport(limits=_POOL_LIMITS)
+
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # The pool outlives the clients using it.
+        pass
+
+
+async def close_connection_pool() -> None:
+    """Closes the connection pool of the running event loop, if there is one."""
+    loop = asyncio.get_running_loop()
+
+    if (pool := SharedTransport._pools.pop(loop, None)) is not None:
+        await pool.aclose()
+
+
+SHARED_TRANSPORT = SharedTransport()
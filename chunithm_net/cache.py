@@ -0,0 +1,362 @@
+import asyncio
+import copy
+import dataclasses
+import logging
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Mapping
+from datetime import datetime
+from enum import Enum
+from typing import Any, Generic, NamedTuple, Optional, TypeVar
+
+__all__ = ["DEFAULT_TTLS", "DataVersion", "ResponseCache"]
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# How long, in seconds, a parsed page is served without asking CHUNITHM-NET
+# again. Everything is also dropped as soon as the player is seen to have played
+# a new credit, so these only bound staleness caused by something else, like
+# the rating pages being recalculated with a newer chart constant.
+DEFAULT_TTLS: Mapping[str, float] = {
+    "authenticate": 60,
+    "player_data": 60,
+    "best30": 5 * 60,
+    "recent10": 5 * 60,
+    "music_record": 5 * 60,
+    "music_record_by_folder": 5 * 60,
+    "music_record_batch_by_folder": 5 * 60,
+}
+
+
+class DataVersion(NamedTuple):
+    """
+    Identifies the state of a player's data on CHUNITHM-NET. Scores only change by
+    playing, which moves both the last play date and the play count.
+
+    The home page doesn't show the play count, so it can be unknown, in which case
+    only the last play date is compared.
+    """
+
+    last_play_date: datetime
+    playcount: Optional[int] = None
+
+    def matches(self, other: "DataVersion") -> bool:
+        if self.last_play_date != other.last_play_date:
+            return False
+
+        return (
+            self.playcount is None
+            or other.playcount is None
+            or self.playcount == other.playcount
+        )
+
+
+_CacheKey = tuple[Hashable, str, tuple]
+
+
+@dataclasses.dataclass
+class _CacheEntry(Generic[T]):
+    value: T
+    size: int
+    expires_at: float
+
+    # Data version of the player when the page was fetched, if it was known.
+    version: Optional[DataVersion] = None
+
+
+class ResponseCache:
+    """
+    An in-memory cache of parsed CHUNITHM-NET pages, keyed by user, endpoint and
+    request parameters.
+
+    Entries are fresh for the TTL of their endpoint, after which they are stale.
+    Stale entries can still be served to callers that opt into
+    stale-while-revalidate by passing `on_revalidate`: they get the stale value
+    immediately, the page is fetched again in the background, and `on_revalidate`
+    is called with the new value if it differs. Entries that have been stale for
+    longer than `max_stale` seconds are never served.
+
+    Pages that only change when the player plays can also be revalidated against
+    the player's data version: once they expire, callers passing `check_version`
+    make the cheap request that reports the current data version, and the cached
+    page keeps being served for as long as that version hasn't moved.
+
+    The cache is bounded by the estimated memory used by the cached values, and
+    evicts the least recently used entries first. Callers always receive a copy
+    of the cached value, so they are free to modify it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttls: Optional[Mapping[str, float]] = None,
+        max_stale: float = 60 * 60,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_stale = max_stale
+
+        self.size = 0
+
+        self._entries: OrderedDict[_CacheKey, _CacheEntry] = OrderedDict()
+        self._inflight: dict[_CacheKey, asyncio.Task] = {}
+        # Background revalidations, along with the user they are for.
+        self._revalidations: dict[asyncio.Task, Hashable] = {}
+
+        # Bumped whenever the entries of a user are invalidated, so that fetches
+        # started before the invalidation don't put outdated data back.
+        self._generations: dict[Hashable, int] = {}
+        self._versions: dict[Hashable, DataVersion] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(
+        self,
+        user: Hashable,
+        endpoint: str,
+        params: tuple,
+        fetch: Callable[[], Awaitable[T]],
+        *,
+        on_revalidate: Optional[Callable[[T], Awaitable[Any]]] = None,
+        data_version: Optional[Callable[[T], DataVersion]] = None,
+        check_version: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> T:
+        """Returns the cached value for a request, fetching it if necessary.
+
+        Parameters
+        ----------
+        user: Hashable
+            The user the request is made for.
+        endpoint: str
+            Name of the endpoint, used to look up its TTL.
+        params: tuple
+            Parameters of the request that affect its result.
+        fetch: Callable[[], Awaitable[T]]
+            Fetches and parses the page.
+        on_revalidate: Optional[Callable[[T], Awaitable[Any]]]
+            Opts into stale-while-revalidate. Called with the refreshed value if
+            a stale value was returned and the refreshed one differs from it.
+        data_version: Optional[Callable[[T], DataVersion]]
+            Extracts the data version of the player from a fetched value. If it
+            changed, every other cached page of the user is invalidated.
+        check_version: Optional[Callable[[], Awaitable[Any]]]
+            Marks the page as only changing when the player plays. Makes the
+            request that reports the current data version of the player, which
+            must pass its result through `observe_data_version`.
+        """
+        key = (user, endpoint, params)
+        entry = self._entries.get(key)
+
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self._entries.move_to_end(key)
+            return copy.deepcopy(entry.value)
+
+        if entry is not None and entry.version is not None and check_version:
+            await check_version()
+
+            # Checking the version might have invalidated the entry.
+            entry = self._entries.get(key)
+
+            if entry is not None and self._is_current(user, entry):
+                entry.expires_at = time.monotonic() + self.ttls.get(endpoint, 0)
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry.value)
+
+        if (
+            entry is not None
+            and on_revalidate is not None
+            and time.monotonic() < entry.expires_at + self.max_stale
+        ):
+            self._entries.move_to_end(key)
+            self._revalidate(
+                key, entry.value, fetch, on_revalidate, data_version, check_version
+            )
+            return copy.deepcopy(entry.value)
+
+        value = await asyncio.shield(
+            self._fetch(key, fetch, data_version, check_version)
+        )
+        return copy.deepcopy(value)
+
+    def observe_data_version(self, user: Hashable, version: DataVersion) -> bool:
+        """Records the data version of a user, invalidating their cached pages if
+        it changed. Returns whether the pages were invalidated."""
+        previous = self._versions.get(user)
+
+        if (
+            previous is not None
+            and version.playcount is None
+            and previous.last_play_date == version.last_play_date
+        ):
+            version = previous
+
+        self._versions[user] = version
+
+        if previous is None or previous.matches(version):
+            return False
+
+        self.invalidate(user)
+        return True
+
+    def revalidations(self, user: Hashable) -> list[asyncio.Task]:
+        """Returns the tasks revalidating pages of a user in the background. They
+        are done once the pages have been fetched again, and their
+        `on_revalidate` callbacks have returned."""
+        return [task for task, owner in self._revalidations.items() if owner == user]
+
+    def invalidate(self, user: Hashable) -> None:
+        """Drops every cached page of a user."""
+        self._generations[user] = self._generations.get(user, 0) + 1
+
+        for key in [key for key in self._entries if key[0] == user]:
+            self._pop(key)
+
+    def clear(self) -> None:
+        for user in {key[0] for key in self._entries}:
+            self._generations[user] = self._generations.get(user, 0) + 1
+
+        self._entries.clear()
+        self.size = 0
+
+    def _is_current(self, user: Hashable, entry: _CacheEntry) -> bool:
+        current = self._versions.get(user)
+
+        return (
+            entry.version is not None
+            and current is not None
+            and entry.version.matches(current)
+        )
+
+    def _fetch(
+        self,
+        key: _CacheKey,
+        fetch: Callable[[], Awaitable[T]],
+        data_version: Optional[Callable[[T], DataVersion]],
+        check_version: Optional[Callable[[], Awaitable[Any]]],
+    ) -> "asyncio.Task[T]":
+        # Concurrent requests for the same page share a single fetch.
+        if (task := self._inflight.get(key)) is not None:
+            return task
+
+        task = self._inflight[key] = asyncio.create_task(
+            self._fetch_and_store(key, fetch, data_version, check_version)
+        )
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return task
+
+    async def _fetch_and_store(
+        self,
+        key: _CacheKey,
+        fetch: Callable[[], Awaitable[T]],
+        data_version: Optional[Callable[[T], DataVersion]],
+        check_version: Optional[Callable[[], Awaitable[Any]]],
+    ) -> T:
+        user, endpoint, _ = key
+
+        # The version has to be known before the page is fetched: if the player
+        # plays in between, the page is tagged with the older version and simply
+        # fetched again next time.
+        if check_version is not None and user not in self._versions:
+            await check_version()
+
+        generation = self._generations.get(user, 0)
+        version = self._versions.get(user) if check_version is not None else None
+
+        value = await fetch()
+
+        # The page we just fetched is the proof that the player has played, so
+        # it's the only one that survives the invalidation.
+        if data_version is not None and self.observe_data_version(
+            user, data_version(value)
+        ):
+            generation = self._generations[user]
+
+        if generation == self._generations.get(user, 0):
+            self._store(key, value, self.ttls.get(endpoint, 0), version)
+
+        return value
+
+    def _revalidate(
+        self,
+        key: _CacheKey,
+        stale_value: T,
+        fetch: Callable[[], Awaitable[T]],
+        on_revalidate: Callable[[T], Awaitable[Any]],
+        data_version: Optional[Callable[[T], DataVersion]],
+        check_version: Optional[Callable[[], Awaitable[Any]]],
+    ) -> None:
+        async def revalidate() -> None:
+            try:
+                value = await self._fetch(key, fetch, data_version, check_version)
+
+                if value != stale_value:
+                    await on_revalidate(copy.deepcopy(value))
+            except Exception:
+                logger.exception(f"Failed to revalidate {key[1]}{key[2]!r}")
+
+        # Keep a reference to the task so it isn't garbage collected midway.
+        task = asyncio.create_task(revalidate())
+        self._revalidations[task] = key[0]
+        task.add_done_callback(self._revalidations.pop)
+
+    def _store(
+        self,
+        key: _CacheKey,
+        value: Any,
+        ttl: float,
+        version: Optional[DataVersion] = None,
+    ) -> None:
+        if ttl <= 0:
+            return
+
+        size = _deep_sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        self._pop(key)
+        self._entries[key] = _CacheEntry(
+            value, size, time.monotonic() + ttl, version
+        )
+        self.size += size
+
+        while self.size > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: _CacheKey) -> None:
+        if (entry := self._entries.pop(key, None)) is not None:
+            self.size -= entry.size
+
+
+def _deep_sizeof(obj: Any, seen: Optional[set[int]] = None) -> int:
+    """A rough estimate of the memory used by a parsed page."""
+    if seen is None:
+        seen = set()
+
+    # Enum members are singletons that aren't owned by the page.
+    if id(obj) in seen or isinstance(obj, Enum):
+        return 0
+
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        size += sum(
+            _deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif dataclasses.is_dataclass(obj):
+        size += sum(
+            _deep_sizeof(getattr(obj, field.name), seen)
+            for field in dataclasses.fields(obj)
+        )
+    elif slots := getattr(type(obj), "__slots__", None):
+        size += sum(_deep_sizeof(getattr(obj, slot, None), seen) for slot in slots)
+
+    return size
@@ -0,0 +1,110 @@
+import copy
+import hashlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from .cache import _deep_sizeof
+
+__all__ = ["ParseMemo"]
+
+T = TypeVar("T")
+
+# Parser engine, parser function, encoding, extra parser arguments, body digest.
+_MemoKey = tuple[str, str, str, tuple, bytes]
+
+
+class ParseMemo:
+    """
+    Remembers what CHUNITHM-NET pages parsed into, keyed by a digest of the page
+    body and the parser that ran on it.
+
+    A lot of pages come back byte-for-byte identical between requests, like the
+    rating pages of a player who hasn't played since. Those are served from the
+    memo without being parsed again. Since the key is the content of the page,
+    entries never go stale, and can be shared between users. Only the digest and
+    the parsed result are kept, never the page itself. The page still has to be
+    received in full to compute its digest, before deciding whether to parse it.
+
+    The memo is bounded by the estimated memory used by the parsed results, and
+    evicts the least recently used entries first. Callers receive a copy of the
+    memoized result unless they ask for the shared one, so they are free to
+    modify it.
+    """
+
+    def __init__(self, *, max_bytes: int = 8 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[_MemoKey, tuple[Any, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+
+        if lookups == 0:
+            return 0
+
+        return self.hits / lookups
+
+    @staticmethod
+    def hasher() -> "hashlib.blake2b":
+        """Returns a hash object to compute the digest of a page with, chunk by
+        chunk."""
+        return hashlib.blake2b(digest_size=16)
+
+    async def get_or_parse(
+        self,
+        engine: str,
+        parser: str,
+        digest: bytes,
+        encoding: str,
+        args: tuple,
+        parse: Callable[[], Awaitable[T]],
+        *,
+        shared: bool = False,
+    ) -> T:
+        """Returns the memoized result of parsing the page with the given digest,
+        calling `parse` to parse it if it hasn't been seen before.
+
+        With `shared`, the memoized result itself is returned instead of a copy.
+        The caller must never modify it.
+        """
+        key = (engine, parser, encoding, args, digest)
+
+        if (entry := self._entries.get(key)) is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            value = entry[0]
+        else:
+            self.misses += 1
+
+            value = await parse()
+            self._store(key, value)
+
+        return value if shared else copy.deepcopy(value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def _store(self, key: _MemoKey, value: Any) -> None:
+        size = _deep_sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        if (entry := self._entries.pop(key, None)) is not None:
+            self.size -= entry[1]
+
+        self._entries[key] = (value, size)
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
@@ -0,0 +1,205 @@
+import itertools
+import math
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from decimal import Decimal
+from typing import Optional, overload
+
+from .enums import ClearType, ComboType, Difficulty, Rank
+from .record import Record
+
+__all__ = ["RecordBatch"]
+
+# Columns holding plain numbers, and their array type codes.
+_ARRAY_COLUMNS = {
+    "song_ids": "l",
+    "difficulties": "b",
+    "scores": "l",
+    "ranks": "b",
+    "clear_lamps": "b",
+    "combo_lamps": "b",
+    "internal_levels": "d",
+    "total_combos": "l",
+}
+_LIST_COLUMNS = (
+    "titles",
+    "jackets",
+    "levels",
+    "play_ratings",
+    "overpower_bases",
+    "overpower_maxes",
+)
+
+# Stored for unknown song IDs and total combos, and unknown internal levels.
+_MISSING = -1
+_MISSING_LEVEL = math.nan
+
+_LOWEST_RATING = Decimal("-Infinity")
+
+
+class RecordBatch(Sequence[Record]):
+    """
+    A list of records, stored column by column.
+
+    Numeric columns are `array`s, so a batch of a few thousand records is a
+    handful of objects instead of a few thousand, and operations over a whole
+    column like sorting or filtering don't have to touch every record. Indexing
+    a batch materializes `Record`s, so views can create them only for the page
+    they display.
+
+    Only the fields of `Record` are stored. Extras without a slot are dropped.
+    """
+
+    __slots__ = (*_ARRAY_COLUMNS, *_LIST_COLUMNS)
+
+    song_ids: array
+    difficulties: array
+    scores: array
+    ranks: array
+    clear_lamps: array
+    combo_lamps: array
+    internal_levels: array
+    total_combos: array
+
+    titles: list[str]
+    jackets: list[Optional[str]]
+    levels: list[Optional[str]]
+    play_ratings: list[Optional[Decimal]]
+    overpower_bases: list[Optional[Decimal]]
+    overpower_maxes: list[Optional[Decimal]]
+
+    def __init__(self, records: Iterable[Record] = ()) -> None:
+        for name, typecode in _ARRAY_COLUMNS.items():
+            setattr(self, name, array(typecode))
+
+        for name in _LIST_COLUMNS:
+            setattr(self, name, [])
+
+        for record in records:
+            self.append(record)
+
+    def append(self, record: Record) -> None:
+        self.song_ids.append(_or_missing(record.song_id))
+        self.difficulties.append(record.difficulty.value)
+        self.scores.append(record.score)
+        self.ranks.append(record.rank.value)
+        self.clear_lamps.append(record.clear_lamp.value)
+        self.combo_lamps.append(record.combo_lamp.value)
+        self.internal_levels.append(
+            _MISSING_LEVEL if record.internal_level is None else record.internal_level
+        )
+        self.total_combos.append(_or_missing(record.total_combo))
+
+        self.titles.append(record.title)
+        self.jackets.append(record.jacket)
+        self.levels.append(record.level)
+        self.play_ratings.append(record.play_rating)
+        self.overpower_bases.append(record.overpower_base)
+        self.overpower_maxes.append(record.overpower_max)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    @overload
+    def __getitem__(self, index: int) -> Record:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Record]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> Record | list[Record]:
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = "RecordBatch index out of range"
+            raise IndexError(msg)
+
+        return self._record(index)
+
+    def __iter__(self) -> Iterator[Record]:
+        return (self._record(i) for i in range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RecordBatch):
+            return NotImplemented
+
+        return all(
+            getattr(self, name) == getattr(other, name)
+            for name in (*_ARRAY_COLUMNS, *_LIST_COLUMNS)
+            if name != "internal_levels"
+        ) and all(
+            a == b or (math.isnan(a) and math.isnan(b))
+            for a, b in zip(self.internal_levels, other.internal_levels)
+        )
+
+    def __repr__(self) -> str:
+        return f"<RecordBatch of {len(self)} records>"
+
+    def argsort(self, *, reverse: bool = True) -> list[int]:
+        """Returns the indices that sort the batch by play rating, then score.
+        Records without a play rating sort as the lowest."""
+        keys = list(
+            zip(
+                [
+                    _LOWEST_RATING if rating is None else rating
+                    for rating in self.play_ratings
+                ],
+                self.scores,
+            )
+        )
+
+        return sorted(range(len(self)), key=keys.__getitem__, reverse=reverse)
+
+    def take(self, indices: Sequence[int]) -> "RecordBatch":
+        """Returns a batch of the records at `indices`, in that order."""
+        batch = RecordBatch.__new__(RecordBatch)
+
+        for name, typecode in _ARRAY_COLUMNS.items():
+            column = getattr(self, name)
+            setattr(batch, name, array(typecode, [column[i] for i in indices]))
+
+        for name in _LIST_COLUMNS:
+            column = getattr(self, name)
+            setattr(batch, name, [column[i] for i in indices])
+
+        return batch
+
+    def filter(self, mask: Iterable[bool]) -> "RecordBatch":
+        """Returns a batch of the records for which `mask` is true."""
+        return self.take(list(itertools.compress(range(len(self)), mask)))
+
+    def sorted(self, *, reverse: bool = True) -> "RecordBatch":
+        """Returns the batch sorted by play rating, then score."""
+        return self.take(self.argsort(reverse=reverse))
+
+    def _record(self, i: int) -> Record:
+        internal_level = self.internal_levels[i]
+
+        return Record(
+            title=self.titles[i],
+            difficulty=Difficulty(self.difficulties[i]),
+            score=self.scores[i],
+            rank=Rank(self.ranks[i]),
+            clear_lamp=ClearType(self.clear_lamps[i]),
+            combo_lamp=ComboType(self.combo_lamps[i]),
+            jacket=self.jackets[i],
+            song_id=_or_none(self.song_ids[i]),
+            level=self.levels[i],
+            internal_level=None if math.isnan(internal_level) else internal_level,
+            play_rating=self.play_ratings[i],
+            overpower_base=self.overpower_bases[i],
+            overpower_max=self.overpower_maxes[i],
+            total_combo=_or_none(self.total_combos[i]),
+        )
+
+
+def _or_missing(value: Optional[int]) -> int:
+    return _MISSING if value is None else value
+
+
+def _or_none(value: int) -> Optional[int]:
+    return None if value == _MISSING else value
@@ -1,9 +1,14 @@
+import dataclasses
+from collections.abc import Iterator, MutableMapping
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from decimal import Decimal
+from typing import Any, Optional, TypeVar
 
 from .enums import ClearType, ComboType, Difficulty, Rank
-from .type_paired_dict import TypePairedDict
+from .type_paired_dict import TypePairedDict, TypePairedDictKey
+
+T = TypeVar("T")
 
 
 @dataclass
@@ -35,7 +40,100 @@ class DetailedParams:
     token: str
 
 
-@dataclass(kw_only=True)
+# Re-exported from `chunithm_net.consts`.
+_KEY_DETAILED_PARAMS = TypePairedDictKey[DetailedParams]("_detailed_params")
+KEY_SONG_ID = TypePairedDictKey[int]("song_id")
+KEY_LEVEL = TypePairedDictKey[str]("level")
+KEY_INTERNAL_LEVEL = TypePairedDictKey[float]("internal_level")
+KEY_PLAY_RATING = TypePairedDictKey[Decimal]("play_rating")
+KEY_OVERPOWER_BASE = TypePairedDictKey[Decimal]("overpower_base")
+KEY_OVERPOWER_MAX = TypePairedDictKey[Decimal]("overpower_max")
+KEY_TOTAL_COMBO = TypePairedDictKey[int]("total_combo")
+
+# Extras that have their own slot on a record, and the name of the slot.
+_EXTRA_SLOTS: dict[TypePairedDictKey, str] = {
+    KEY_SONG_ID: "song_id",
+    KEY_LEVEL: "level",
+    KEY_INTERNAL_LEVEL: "internal_level",
+    KEY_PLAY_RATING: "play_rating",
+    KEY_OVERPOWER_BASE: "overpower_base",
+    KEY_OVERPOWER_MAX: "overpower_max",
+    KEY_TOTAL_COMBO: "total_combo",
+}
+
+
+class RecordExtras(MutableMapping):
+    """
+    The extras of a record, with the same API as a `TypePairedDict`.
+
+    Extras that are set on most records, like the ones filled in by hydration,
+    are stored in slots of the record. Anything else goes into a dict, which is
+    only allocated once it's needed.
+    """
+
+    __slots__ = ("_record",)
+
+    def __init__(self, record: "Record") -> None:
+        self._record = record
+
+    def __getitem__(self, __key: TypePairedDictKey[T]) -> T:
+        if (slot := _EXTRA_SLOTS.get(__key)) is not None:
+            value = getattr(self._record, slot)
+        elif self._record._extras is not None:
+            value = self._record._extras.get(__key)
+        else:
+            value = None
+
+        if value is None:
+            raise KeyError(__key)
+
+        return value
+
+    def __setitem__(self, __key: TypePairedDictKey[T], __value: T) -> None:
+        if (slot := _EXTRA_SLOTS.get(__key)) is not None:
+            setattr(self._record, slot, __value)
+            return
+
+        if self._record._extras is None:
+            self._record._extras = TypePairedDict()
+
+        self._record._extras[__key] = __value
+
+    def __delitem__(self, __key: TypePairedDictKey) -> None:
+        if __key not in self:
+            raise KeyError(__key)
+
+        if (slot := _EXTRA_SLOTS.get(__key)) is not None:
+            setattr(self._record, slot, None)
+        elif self._record._extras is not None:
+            del self._record._extras[__key]
+
+    def __iter__(self) -> Iterator[TypePairedDictKey]:
+        for key, slot in _EXTRA_SLOTS.items():
+            if getattr(self._record, slot) is not None:
+                yield key
+
+        if self._record._extras is not None:
+            yield from self._record._extras
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def get(self, __key: TypePairedDictKey[T]) -> T | None:  # type: ignore[reportIncompatibleMethodOverride]
+        try:
+            return self[__key]
+        except KeyError:
+            return None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+def _fields(record: Any) -> dict[str, Any]:
+    return {f.name: getattr(record, f.name) for f in dataclasses.fields(record)}
+
+
+@dataclass(kw_only=True, slots=True)
 class Record:
     title: str
     difficulty: Difficulty
@@ -47,27 +145,41 @@ class Record:
 
     jacket: Optional[str] = None
 
-    extras: TypePairedDict = field(default_factory=TypePairedDict)
+    # Filled in by the parsers, or when hydrating records with song data.
+    song_id: Optional[int] = None
+    level: Optional[str] = None
+    internal_level: Optional[float] = None
+    play_rating: Optional[Decimal] = None
+    overpower_base: Optional[Decimal] = None
+    overpower_max: Optional[Decimal] = None
+    total_combo: Optional[int] = None
+
+    # Extras without a slot. See `extras`.
+    _extras: Optional[TypePairedDict] = field(default=None, repr=False)
+
+    @property
+    def extras(self) -> RecordExtras:
+        return RecordExtras(self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class MusicRecord(Record):
     play_count: Optional[int] = None
     ajc_count: Optional[int] = None
 
     @staticmethod
     def from_record(record: Record) -> "MusicRecord":
-        return MusicRecord(**record.__dict__, jacket="")
+        return MusicRecord(**{**_fields(record), "jacket": ""})
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class RecentRecord(MusicRecord):
     track: int
     date: datetime
     new_record: bool
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DetailedRecentRecord(RecentRecord):
     character: str
     skill: Skill
@@ -81,7 +193,7 @@ class DetailedRecentRecord(RecentRecord):
     @staticmethod
     def from_basic(record: RecentRecord) -> "DetailedRecentRecord":
         return DetailedRecentRecord(
-            **record.__dict__,
+            **_fields(record),
             character="",
             skill=Skill("", 0),
             skill_result=0,
@@ -1,11 +1,48 @@
-from typing import Generic, TypeVar
+from typing import Generic, Optional, TypeVar
 
 T = TypeVar("T")
 VT = TypeVar("VT")
 
+_NAMED_KEYS: dict[str, "TypePairedDictKey"] = {}
+
+
+def _named_key(name: str) -> "TypePairedDictKey":
+    return _NAMED_KEYS[name]
+
 
 class TypePairedDictKey(Generic[T]):
-    pass
+    """
+    A key of a `TypePairedDict`. Keys are compared by identity.
+
+    Named keys are pickled by name, so that a dict sent to another process (or
+    read back from disk) is still keyed by the same key objects once unpickled.
+    """
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        self.name = name
+
+        if name is not None:
+            _NAMED_KEYS[name] = self
+
+    def __repr__(self) -> str:
+        if self.name is None:
+            return super().__repr__()
+
+        return f"TypePairedDictKey({self.name!r})"
+
+    def __reduce__(self):
+        if self.name is None:
+            msg = "Only named TypePairedDictKeys can be pickled"
+            raise TypeError(msg)
+
+        return (_named_key, (self.name,))
+
+    # Keys are compared by identity, so copies of a dict must share them.
+    def __copy__(self) -> "TypePairedDictKey[T]":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "TypePairedDictKey[T]":
+        return self
 
 
 class TypePairedDict(dict):
@@ -15,8 +52,8 @@ class TypePairedDict(dict):
 
     ```python
     # Keep the key as a constant, and optionally export it so consumers can also
-    # get the stored value.
-    KEY_SOMETHING = TypePairedDictKey[int]()
+    # get the stored value. Name it if the dict will be pickled.
+    KEY_SOMETHING = TypePairedDictKey[int]("something")
 
     data = TypePairedDict()
     reveal_type(data[KEY_SOMETHING])  # should be int
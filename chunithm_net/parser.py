@@ -1,9 +1,11 @@
 # pyright: reportOptionalMemberAccess=false, reportOptionalSubscript=false
-from typing import cast
+from typing import Optional, cast
 
 from bs4 import BeautifulSoup, Tag
 
-from .consts import _KEY_DETAILED_PARAMS, KEY_SONG_ID
+# Only used through the engine module, as `_engine.DocumentBuilder`.
+from ._bs4 import IncrementalSoup as DocumentBuilder  # noqa: F401
+from .consts import _KEY_DETAILED_PARAMS
 from .models.enums import ClearType, ComboType, Possession, Rank, SkillClass
 from .models.player_data import (
     Currency,
@@ -31,6 +33,7 @@ from .utils import (
     get_rank_and_lamps,
     parse_player_rating,
     parse_time,
+    rank_and_lamps_from_sources,
 )
 
 
@@ -150,6 +153,12 @@ def parse_player_data(soup: BeautifulSoup) -> PlayerData:
     return data
 
 
+def parse_recent_records(soup: BeautifulSoup) -> list[RecentRecord]:
+    return [
+        parse_basic_recent_record(record) for record in soup.select(".frame02.w400")
+    ]
+
+
 def parse_basic_recent_record(record: Tag) -> RecentRecord:
     idx_elem = record.select_one("form input[name=idx]")
 
@@ -246,38 +255,81 @@ def parse_music_record(soup: BeautifulSoup, song_id: int) -> list[MusicRecord]:
             if (elem := block.select_one(".musicdata_score_theory_num")) is not None
             else None,
         )
-        score.extras[KEY_SONG_ID] = song_id
+        score.song_id = song_id
 
         records.append(score)
     return records
 
 
-def parse_music_for_rating(soup: BeautifulSoup) -> list[Record]:
-    records = []
-    for x in soup.select("form:has(.w388.musiclist_box)"):
-        if (score_elem := x.select_one(".play_musicdata_highscore .text_b")) is None:
-            continue
+def _parse_rating_form(form: Tag) -> Optional[Record]:
+    # Walks the form's subtree once, in document order, picking up the first of
+    # every element we're interested in. The icons' URLs are collected along
+    # the way, instead of searching the subtree again for every lamp.
+    box = title = score_elem = icon = idx = None
+    icon_sources: list[str] = []
+
+    # (tag, whether it's inside the high score block, inside the icon block)
+    stack = [
+        (child, False, False)
+        for child in reversed(form.contents)
+        if isinstance(child, Tag)
+    ]
+    while stack:
+        tag, in_highscore, in_icon = stack.pop()
+        classes = tag.get("class") or ()
+
+        if box is None and "w388" in classes and "musiclist_box" in classes:
+            box = tag
+        if title is None and (
+            "music_title" in classes or "musiclist_worldsend_title" in classes
+        ):
+            title = tag
+        if score_elem is None and in_highscore and "text_b" in classes:
+            score_elem = tag
+
+        if tag.name == "img" and in_icon and (src := tag.get("src")) is not None:
+            icon_sources.append(cast(str, src))
+        elif tag.name == "input" and idx is None and tag.get("name") == "idx":
+            idx = tag.get("value")
+
+        in_highscore = in_highscore or "play_musicdata_highscore" in classes
+        if icon is None and "play_musicdata_icon" in classes:
+            icon = tag
+            in_icon = True
+
+        stack.extend(
+            (child, in_highscore, in_icon)
+            for child in reversed(tag.contents)
+            if isinstance(child, Tag)
+        )
 
-        if (musicdata := x.select_one(".play_musicdata_icon")) is not None:
-            rank, clear_lamp, combo_lamp = get_rank_and_lamps(musicdata)
-        else:
-            rank, clear_lamp, combo_lamp = Rank.D, ClearType.FAILED, ComboType.NONE
+    if box is None or score_elem is None:
+        return None
 
-        div = x.select_one(".w388.musiclist_box")
-        score = Record(
-            title=x.select_one(".music_title, .musiclist_worldsend_title").get_text(),
-            difficulty=difficulty_from_imgurl(" ".join(div["class"])),
-            score=chuni_int(score_elem.get_text()),
-            rank=rank,
-            clear_lamp=clear_lamp,
-            combo_lamp=combo_lamp,
-        )
-        score.extras[KEY_SONG_ID] = int(
-            str(x.select_one("form input[name=idx]")["value"])
-        )
+    if icon is not None:
+        rank, clear_lamp, combo_lamp = rank_and_lamps_from_sources(icon_sources)
+    else:
+        rank, clear_lamp, combo_lamp = Rank.D, ClearType.FAILED, ComboType.NONE
 
-        records.append(score)
-    return records
+    score = Record(
+        title=title.get_text(),
+        difficulty=difficulty_from_imgurl(" ".join(box["class"])),
+        score=chuni_int(score_elem.get_text()),
+        rank=rank,
+        clear_lamp=clear_lamp,
+        combo_lamp=combo_lamp,
+    )
+    score.song_id = int(str(idx))
+
+    return score
+
+
+def parse_music_for_rating(soup: BeautifulSoup) -> list[Record]:
+    return [
+        record
+        for form in soup.find_all("form")
+        if (record := _parse_rating_form(form)) is not None
+    ]
 
 
 def parse_detailed_recent_record(soup: BeautifulSoup) -> DetailedRecentRecord:
@@ -317,7 +369,7 @@ def parse_detailed_recent_record(soup: BeautifulSoup) -> DetailedRecentRecord:
     record.skill_result = chuni_int(
         soup.select_one(".play_musicdata_skilleffect_text").get_text().replace("+", "")
     )
-    record.extras[KEY_SONG_ID] = int(
+    record.song_id = int(
         str(soup.select_one("form input[name=idx]")["value"])
     )
     return record
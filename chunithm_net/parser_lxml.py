@@ -0,0 +1,463 @@
+# pyright: reportOptionalMemberAccess=false, reportOptionalSubscript=false
+"""
+The same parsers as `chunithm_net.parser`, implemented on raw lxml trees.
+
+Every query is an XPath expression compiled once when this module is imported,
+instead of a CSS selector evaluated by soupsieve on every call. The parsers
+return the exact same objects as their BeautifulSoup counterparts.
+"""
+from collections.abc import Iterable
+from typing import Optional
+
+from lxml import etree
+
+from .consts import _KEY_DETAILED_PARAMS
+from .models.enums import ClearType, ComboType, Possession, Rank, SkillClass
+from .models.player_data import (
+    Currency,
+    Nameplate,
+    Overpower,
+    PlayerData,
+    Rating,
+    Team,
+    UserAvatar,
+)
+from .models.record import (
+    DetailedParams,
+    DetailedRecentRecord,
+    Judgements,
+    MusicRecord,
+    NoteType,
+    RecentRecord,
+    Record,
+    Skill,
+)
+from .utils import (
+    chuni_int,
+    difficulty_from_imgurl,
+    extract_last_part,
+    parse_time,
+    rank_and_lamps_from_sources,
+)
+
+Element = etree._Element
+
+
+def _has_class(*names: str) -> str:
+    """XPath predicate equivalent to the CSS selector `.name1.name2...`."""
+    return " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+        for name in names
+    )
+
+
+def _descendant(*names: str, tag: str = "*") -> str:
+    return f"descendant::{tag}[{_has_class(*names)}]"
+
+
+def _xpath(expression: str) -> etree.XPath:
+    return etree.XPath(expression, smart_strings=False)
+
+
+def _first(xpath: etree.XPath, element: Element) -> Optional[Element]:
+    return result[0] if (result := xpath(element)) else None
+
+
+_TEXT = _xpath("string()")
+_TEXT_NODES = _xpath("descendant::text()")
+
+
+def _text(element: Element) -> str:
+    """Equivalent to BeautifulSoup's `get_text()`."""
+    return _TEXT(element)
+
+
+def _stripped_text(element: Element) -> str:
+    """Equivalent to BeautifulSoup's `get_text(strip=True)`."""
+    return "".join(text.strip() for text in _TEXT_NODES(element))
+
+
+def _classes(element: Element) -> str:
+    """Equivalent to BeautifulSoup's `" ".join(element["class"])`."""
+    return " ".join(element.get("class", "").split())
+
+
+class DocumentBuilder:
+    """Builds an lxml tree from a document received in chunks of bytes."""
+
+    def __init__(self, encoding: str = "utf-8") -> None:
+        self.encoding = encoding
+        self._parser = etree.HTMLParser(encoding=encoding)
+
+    def feed(self, data: bytes) -> None:
+        self._parser.feed(data)
+
+    def close(self) -> Element:
+        return self._parser.close()
+
+
+_IMAGE_SOURCES = _xpath("descendant::img/@src")
+
+
+def get_rank_and_lamps(element: Element) -> tuple[Rank, ClearType, ComboType]:
+    return rank_and_lamps_from_sources(_IMAGE_SOURCES(element))
+
+
+def _parse_player_rating(sources: Iterable[str]) -> float:
+    rating = ""
+    for src in sources:
+        digit = extract_last_part(src)
+        if digit == "comma":
+            rating += "."
+        else:
+            rating += digit[1]
+    return float(rating)
+
+
+_PLAYER_CHARA = _xpath(f"{_descendant('player_chara')}/descendant::img/@src")
+_PLAYER_NAME = _xpath(_descendant("player_name_in"))
+_PLAYER_LV = _xpath(_descendant("player_lv"))
+_PLAYER_TEAM_NAME = _xpath(_descendant("player_team_name"))
+_PLAYER_HONOR_TEXT = _xpath(_descendant("player_honor_text"))
+_PLAYER_HONOR_SHORT = _xpath(f"{_descendant('player_honor_short')}/@style")
+_PLAYER_RATING_DIGITS = _xpath(
+    f"{_descendant('player_rating_num_block')}/descendant::img/@src"
+)
+_PLAYER_RATING_MAX = _xpath(_descendant("player_rating_max"))
+_PLAYER_OVERPOWER = _xpath(_descendant("player_overpower_text"))
+_PLAYER_LAST_PLAY_DATE = _xpath(_descendant("player_lastplaydate_text"))
+_PLAYER_REBORN = _xpath(_descendant("player_reborn"))
+_PLAYER_PROFILE_STYLE = _xpath(f"({_descendant('box_playerprofile')})[1]/@style")
+_PLAYER_EMBLEM = _xpath(
+    f"{_descendant('player_classemblem_base')}/descendant::img/@src"
+)
+_PLAYER_MEDAL = _xpath(f"{_descendant('player_classemblem_top')}/descendant::img/@src")
+_AVATAR_GROUP = _xpath(_descendant("avatar_group"))
+_AVATAR_PARTS = {
+    part: _xpath(f"{_descendant(f'avatar_{name}')}/descendant::img/@src")
+    for part, name in [
+        ("back", "back"),
+        ("skinfoot_r", "skinfoot_r"),
+        ("skinfoot_l", "skinfoot_l"),
+        ("skin", "skin"),
+        ("wear", "wear"),
+        ("face", "face"),
+        ("face_cover", "faceCover"),
+        ("head", "head"),
+        ("hand_r", "hand_r"),
+        ("hand_l", "hand_l"),
+        ("item_r", "item_r"),
+        ("item_l", "item_l"),
+    ]
+}
+
+
+def parse_player_card_and_avatar(root: Element) -> PlayerData:
+    character = _first(_PLAYER_CHARA, root)
+
+    name = _text(_first(_PLAYER_NAME, root))
+    lv = chuni_int(_text(_first(_PLAYER_LV, root)))
+
+    team_name_elem = _first(_PLAYER_TEAM_NAME, root)
+    team_name = _text(team_name_elem) if team_name_elem is not None else None
+
+    nameplate_content = _text(_first(_PLAYER_HONOR_TEXT, root))
+    nameplate_rarity = _first(_PLAYER_HONOR_SHORT, root).split("_")[-1].split(".")[0]
+
+    rating = _parse_player_rating(_PLAYER_RATING_DIGITS(root))
+    max_rating = float(_text(_first(_PLAYER_RATING_MAX, root)))
+
+    overpower = _text(_first(_PLAYER_OVERPOWER, root)).split(" ")
+    overpower_value = float(overpower[0])
+    overpower_progress = (
+        float(overpower[1].replace("(", "").replace(")", "").replace("%", "")) / 100
+    )
+
+    last_play_date_str = _text(_first(_PLAYER_LAST_PLAY_DATE, root))
+    last_play_date = parse_time(last_play_date_str)
+
+    reborn_elem = _first(_PLAYER_REBORN, root)
+    reborn = chuni_int(_text(reborn_elem)) if reborn_elem is not None else 0
+
+    possession_style = _first(_PLAYER_PROFILE_STYLE, root)
+    possession = (
+        Possession.from_str(extract_last_part(possession_style))
+        if possession_style is not None
+        else Possession.NONE
+    )
+
+    emblem_src = _first(_PLAYER_EMBLEM, root)
+    emblem = (
+        SkillClass(chuni_int(extract_last_part(emblem_src)))
+        if emblem_src is not None
+        else None
+    )
+
+    medal_src = _first(_PLAYER_MEDAL, root)
+    medal = (
+        SkillClass(chuni_int(extract_last_part(medal_src)))
+        if medal_src is not None
+        else None
+    )
+
+    avatar_group = _first(_AVATAR_GROUP, root)
+    avatar = UserAvatar(
+        base="https://new.chunithm-net.com/chuni-mobile/html/mobile/images/avatar_base.png",
+        **{
+            part: _first(xpath, avatar_group)
+            for part, xpath in _AVATAR_PARTS.items()
+        },
+    )
+
+    return PlayerData(
+        character=character,
+        avatar=avatar,
+        name=name,
+        lv=lv,
+        reborn=reborn,
+        possession=possession,
+        team=Team(name=team_name) if team_name else None,
+        nameplate=Nameplate(content=nameplate_content, rarity=nameplate_rarity),
+        rating=Rating(rating, max_rating),
+        overpower=Overpower(overpower_value, overpower_progress),
+        last_play_date=last_play_date,
+        emblem=emblem,
+        medal=medal,
+    )
+
+
+_USER_DATA_POINT = _xpath(
+    f"{_descendant('user_data_point')}/{_descendant('user_data_text')}"
+)
+_USER_DATA_TOTAL_POINT = _xpath(
+    f"{_descendant('user_data_total_point')}/{_descendant('user_data_text')}"
+)
+_USER_DATA_PLAY_COUNT = _xpath(
+    f"{_descendant('user_data_play_count')}/{_descendant('user_data_text')}"
+)
+_USER_DATA_FRIEND_CODE = _xpath(
+    f"{_descendant('user_data_friend_code')}/{_descendant('user_data_text')}"
+    f"/descendant::span[not({_has_class('font_90')})]"
+)
+
+
+def parse_player_data(root: Element) -> PlayerData:
+    data = parse_player_card_and_avatar(root)
+
+    owned_currency = chuni_int(_text(_first(_USER_DATA_POINT, root)))
+    total_currency = chuni_int(_text(_first(_USER_DATA_TOTAL_POINT, root)))
+    data.currency = Currency(owned_currency, total_currency)
+
+    data.playcount = chuni_int(_text(_first(_USER_DATA_PLAY_COUNT, root)))
+
+    data.friend_code = _text(_first(_USER_DATA_FRIEND_CODE, root))
+
+    return data
+
+
+_RECENT_RECORDS = _xpath(_descendant("frame02", "w400"))
+_FORM_INPUT_IDX = _xpath("descendant::input[@name='idx'][ancestor::form]/@value")
+_FORM_INPUT_TOKEN = _xpath("descendant::input[@name='token'][ancestor::form]/@value")
+_RECENT_DATE = _xpath(
+    f"({_descendant('play_datalist_date')} | {_descendant('box_inner01')})[1]"
+)
+_JACKET_IMG = _xpath(f"{_descendant('play_jacket_img')}/descendant::img")
+_TRACK = _xpath(_descendant("play_track_text"))
+_RECENT_TITLE = _xpath(_descendant("play_musicdata_title"))
+_RECENT_SCORE = _xpath(_descendant("play_musicdata_score_text"))
+_NEW_RECORD = _xpath(f"boolean({_descendant('play_musicdata_score_img')})")
+_MUSICDATA_ICON = _xpath(_descendant("play_musicdata_icon"))
+_TRACK_RESULT_IMG = _xpath(
+    f"{_descendant('play_track_result')}/descendant::img/@src"
+)
+
+
+def parse_recent_records(root: Element) -> list[RecentRecord]:
+    return [parse_basic_recent_record(record) for record in _RECENT_RECORDS(root)]
+
+
+def parse_basic_recent_record(record: Element) -> RecentRecord:
+    idx = int(_first(_FORM_INPUT_IDX, record))
+    token = _first(_FORM_INPUT_TOKEN, record)
+    detailed = DetailedParams(idx, token)
+
+    date = parse_time(_text(_first(_RECENT_DATE, record)))
+    jacket_elem = _first(_JACKET_IMG, record)
+    if (jacket := jacket_elem.get("data-original")) is None:
+        jacket = jacket_elem.get("src")
+    track = int(_text(_first(_TRACK, record)).split(" ")[1])
+    title = _text(_first(_RECENT_TITLE, record))
+
+    score = int(_text(_first(_RECENT_SCORE, record)).replace(",", ""))
+    new_record = _NEW_RECORD(record)
+
+    if (rank_elem := _first(_MUSICDATA_ICON, record)) is not None:
+        rank, clear_lamp, combo_lamp = get_rank_and_lamps(rank_elem)
+    else:
+        rank = Rank.D
+        clear_lamp = ClearType.FAILED
+        combo_lamp = ComboType.NONE
+
+    score = RecentRecord(
+        track=track,
+        date=date,
+        title=title,
+        jacket=jacket,
+        difficulty=difficulty_from_imgurl(_first(_TRACK_RESULT_IMG, record)),
+        score=score,
+        rank=rank,
+        clear_lamp=clear_lamp,
+        combo_lamp=combo_lamp,
+        new_record=new_record,
+    )
+    score.extras[_KEY_DETAILED_PARAMS] = detailed
+
+    return score
+
+
+_JACKET_SRC = _xpath(f"{_descendant('play_jacket_img')}/descendant::img/@src")
+_MUSIC_TITLE = _xpath(
+    f"({_descendant('play_musicdata_title')}"
+    f" | {_descendant('play_musicdata_worldsend_title')})[1]"
+)
+_MUSIC_BOXES = _xpath(_descendant("music_box"))
+_MUSIC_SCORE = _xpath(f"{_descendant('musicdata_score_num')}/{_descendant('text_b')}")
+_MUSIC_PLAY_COUNT = _xpath(
+    f"({_descendant('musicdata_score_num')}/{_descendant('text_b')}"
+    "[contains(string(), 'times')]"
+    f" | descendant-or-self::*[{_has_class('music_box')}]"
+    f"/{_descendant('block_icon_text')}/descendant::span[not(@class)])[1]"
+)
+_MUSIC_AJC_COUNT = _xpath(_descendant("musicdata_score_theory_num"))
+
+
+def parse_music_record(root: Element, song_id: int) -> list[MusicRecord]:
+    jacket = src if (src := _first(_JACKET_SRC, root)) is not None else ""
+    title = (
+        _stripped_text(elem) if (elem := _first(_MUSIC_TITLE, root)) is not None else ""
+    )
+    records = []
+    for block in _MUSIC_BOXES(root):
+        if (musicdata := _first(_MUSICDATA_ICON, block)) is not None:
+            rank, clear_lamp, combo_lamp = get_rank_and_lamps(musicdata)
+        else:
+            rank, clear_lamp, combo_lamp = Rank.D, ClearType.FAILED, ComboType.NONE
+
+        score = MusicRecord(
+            title=title,
+            jacket=jacket,
+            difficulty=difficulty_from_imgurl(_classes(block)),
+            score=chuni_int(
+                _text(elem)
+                if (elem := _first(_MUSIC_SCORE, block)) is not None
+                else "0"
+            ),
+            rank=rank,
+            clear_lamp=clear_lamp,
+            combo_lamp=combo_lamp,
+            play_count=chuni_int(
+                _text(elem).replace("times", "")
+                if (elem := _first(_MUSIC_PLAY_COUNT, block)) is not None
+                else "0"
+            ),
+            ajc_count=chuni_int(_text(elem))
+            if (elem := _first(_MUSIC_AJC_COUNT, block)) is not None
+            else None,
+        )
+        score.song_id = song_id
+
+        records.append(score)
+    return records
+
+
+_RATING_FORMS = _xpath(f"descendant::form[{_descendant('w388', 'musiclist_box')}]")
+_HIGHSCORE = _xpath(
+    f"{_descendant('play_musicdata_highscore')}/{_descendant('text_b')}"
+)
+_MUSICLIST_BOX = _xpath(_descendant("w388", "musiclist_box"))
+_RATING_TITLE = _xpath(
+    f"({_descendant('music_title')} | {_descendant('musiclist_worldsend_title')})[1]"
+)
+
+
+def parse_music_for_rating(root: Element) -> list[Record]:
+    records = []
+    for x in _RATING_FORMS(root):
+        if (score_elem := _first(_HIGHSCORE, x)) is None:
+            continue
+
+        if (musicdata := _first(_MUSICDATA_ICON, x)) is not None:
+            rank, clear_lamp, combo_lamp = get_rank_and_lamps(musicdata)
+        else:
+            rank, clear_lamp, combo_lamp = Rank.D, ClearType.FAILED, ComboType.NONE
+
+        div = _first(_MUSICLIST_BOX, x)
+        score = Record(
+            title=_text(_first(_RATING_TITLE, x)),
+            difficulty=difficulty_from_imgurl(_classes(div)),
+            score=chuni_int(_text(score_elem)),
+            rank=rank,
+            clear_lamp=clear_lamp,
+            combo_lamp=combo_lamp,
+        )
+        score.song_id = int(_first(_FORM_INPUT_IDX, x))
+
+        records.append(score)
+    return records
+
+
+_DETAIL_FRAME = _xpath(_descendant("frame01_inside"))
+_DETAIL_MAX_COMBO = _xpath(_descendant("play_data_detail_maxcombo_block"))
+_DETAIL_JUDGEMENTS = {
+    judgement: _xpath(_descendant(f"text_{judgement}", "play_data_detail_judge_text"))
+    for judgement in ("critical", "justice", "attack", "miss")
+}
+_DETAIL_NOTES = {
+    note: _xpath(_descendant(f"text_{note}", "play_data_detail_notes_text"))
+    for note in ("tap_red", "hold_yellow", "slide_blue", "air_green", "flick_skyblue")
+}
+_DETAIL_CHARACTER = _xpath(_descendant("play_data_chara_name"))
+_DETAIL_SKILL_NAME = _xpath(_descendant("play_data_skill_name"))
+_DETAIL_SKILL_GRADE = _xpath(_descendant("play_data_skill_grade"))
+_DETAIL_SKILL_RESULT = _xpath(_descendant("play_musicdata_skilleffect_text"))
+
+
+def parse_detailed_recent_record(root: Element) -> DetailedRecentRecord:
+    def get_judgement_count(judgement):
+        elem = _first(_DETAIL_JUDGEMENTS[judgement], root)
+        return chuni_int(_text(elem).replace(",", ""))
+
+    def get_note_percentage(note):
+        elem = _first(_DETAIL_NOTES[note], root)
+        return float(_text(elem).replace("%", "")) / 100
+
+    record = DetailedRecentRecord.from_basic(
+        parse_basic_recent_record(_first(_DETAIL_FRAME, root))
+    )
+
+    record.max_combo = chuni_int(_text(_first(_DETAIL_MAX_COMBO, root)))
+
+    jcrit = get_judgement_count("critical")
+    justice = get_judgement_count("justice")
+    attack = get_judgement_count("attack")
+    miss = get_judgement_count("miss")
+    record.judgements = Judgements(jcrit, justice, attack, miss)
+
+    tap = get_note_percentage("tap_red")
+    hold = get_note_percentage("hold_yellow")
+    slide = get_note_percentage("slide_blue")
+    air = get_note_percentage("air_green")
+    flick = get_note_percentage("flick_skyblue")
+    record.note_type = NoteType(tap, hold, slide, air, flick)
+
+    record.character = _text(_first(_DETAIL_CHARACTER, root))
+
+    skill_name = _text(_first(_DETAIL_SKILL_NAME, root))
+    skill_grade = chuni_int(_text(_first(_DETAIL_SKILL_GRADE, root)))
+    record.skill = Skill(skill_name, skill_grade)
+
+    record.skill_result = chuni_int(
+        _text(_first(_DETAIL_SKILL_RESULT, root)).replace("+", "")
+    )
+    record.song_id = int(_first(_FORM_INPUT_IDX, root))
+    return record
@@ -0,0 +1,88 @@
+import asyncio
+import importlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from types import ModuleType
+from typing import Any, Literal, Optional
+
+__all__ = ["ParserPool", "parse_document"]
+
+
+def parse_document(
+    engine: str, parser: str, content: bytes, encoding: str, *args: Any
+) -> Any:
+    """Parses a page with the function named `parser` of the parser engine
+    module named `engine`.
+
+    Only takes and returns picklable values, so it can run in another process.
+    """
+    module = importlib.import_module(engine)
+
+    builder = module.DocumentBuilder(encoding)
+    builder.feed(content)
+
+    return getattr(module, parser)(builder.close(), *args)
+
+
+class ParserPool:
+    """
+    Parses CHUNITHM-NET pages outside of the event loop.
+
+    Parsing the larger pages takes long enough to hold up everything else running
+    on the event loop, so pages of at least `inline_threshold` bytes are parsed
+    by a pool of workers:
+    - `thread`: a thread pool. Cheap to hand work to, but parsing still competes
+      with the event loop for the GIL.
+    - `process`: a process pool. Parsing runs truly in parallel, at the cost of
+      pickling the page and the parsed records across the process boundary.
+
+    Smaller pages are parsed inline, since handing them off would cost more than
+    parsing them.
+    """
+
+    def __init__(
+        self,
+        mode: Literal["thread", "process"] = "thread",
+        *,
+        max_workers: Optional[int] = None,
+        inline_threshold: int = 64 * 1024,
+    ) -> None:
+        self._executor: Executor
+
+        if mode == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers, thread_name_prefix="chunithm-net-parser"
+            )
+        elif mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers)
+        else:
+            msg = f"Unknown parser pool mode: {mode}"
+            raise ValueError(msg)
+
+        self.mode = mode
+        self.inline_threshold = inline_threshold
+
+    async def parse(
+        self,
+        engine: ModuleType,
+        parser: str,
+        content: bytes,
+        encoding: str,
+        *args: Any,
+    ) -> Any:
+        """Parses a page with the function named `parser` of a parser engine."""
+        if len(content) < self.inline_threshold:
+            return parse_document(engine.__name__, parser, content, encoding, *args)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            parse_document,
+            engine.__name__,
+            parser,
+            content,
+            encoding,
+            *args,
+        )
+
+    def close(self, *, wait: bool = True) -> None:
+        """Shuts the workers down. Pages waiting to be parsed are dropped."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
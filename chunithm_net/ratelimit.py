@@ -0,0 +1,167 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Optional
+
+__all__ = ["RateLimiter", "RateLimiterMetrics"]
+
+
+@dataclass
+class RateLimiterMetrics:
+    """Counters describing the traffic that went through a `RateLimiter`."""
+
+    # Requests currently waiting for a token, and the most that ever waited at
+    # the same time.
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    # Users with requests currently waiting.
+    queued_users: int = 0
+
+    requests: int = 0
+    # Requests that had to wait for a token.
+    delayed_requests: int = 0
+
+    total_wait_time: float = 0
+    max_wait_time: float = 0
+
+    @property
+    def average_wait_time(self) -> float:
+        if self.requests == 0:
+            return 0
+
+        return self.total_wait_time / self.requests
+
+
+class RateLimiter:
+    """
+    A token bucket limiting the rate of requests sent to CHUNITHM-NET.
+
+    The bucket holds up to `burst` tokens and is refilled at `rate` tokens per
+    second. Every request takes one token. When the bucket is empty, requests are
+    queued per user and the queues are served in weighted round-robin order: a
+    user with weight `n` gets up to `n` requests through per round. That way, a
+    user making hundreds of requests only delays everyone else by a few requests,
+    instead of making them wait behind the whole batch.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        *,
+        weights: Optional[dict[Hashable, int]] = None,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            msg = "rate must be positive and burst must be at least 1"
+            raise ValueError(msg)
+
+        self.rate = rate
+        self.burst = burst
+        self.weights = weights if weights is not None else {}
+
+        self.metrics = RateLimiterMetrics()
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+        # Users with waiting requests, in the order they will be served.
+        self._queues: OrderedDict[Hashable, deque[asyncio.Future[None]]] = (
+            OrderedDict()
+        )
+        # Requests the user at the head of the round-robin may still send in the
+        # current round.
+        self._quantum = 0
+
+        self._dispatcher: Optional[asyncio.Task[None]] = None
+
+    async def acquire(self, user: Optional[Hashable] = None) -> None:
+        """Waits until a request on behalf of `user` may be sent."""
+        self.metrics.requests += 1
+
+        if not self._queues and self._take_token():
+            return
+
+        started_at = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+
+        if (queue := self._queues.get(user)) is None:
+            queue = self._queues[user] = deque()
+
+        queue.append(future)
+        self._update_queue_depth(1)
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        try:
+            await future
+        finally:
+            if not future.done():
+                # Cancelled while waiting, so give up the spot in the queue.
+                future.cancel()
+
+            wait_time = time.monotonic() - started_at
+
+            self.metrics.delayed_requests += 1
+            self.metrics.total_wait_time += wait_time
+            self.metrics.max_wait_time = max(self.metrics.max_wait_time, wait_time)
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+    def _update_queue_depth(self, delta: int) -> None:
+        self.metrics.queue_depth += delta
+        self.metrics.queued_users = len(self._queues)
+        self.metrics.max_queue_depth = max(
+            self.metrics.max_queue_depth, self.metrics.queue_depth
+        )
+
+    def _next_waiter(self) -> Optional[asyncio.Future[None]]:
+        while self._queues:
+            user, queue = next(iter(self._queues.items()))
+
+            if self._quantum <= 0:
+                self._quantum = max(1, self.weights.get(user, 1))
+
+            future = queue.popleft()
+            self._update_queue_depth(-1)
+            self._quantum -= 1
+
+            if not queue:
+                del self._queues[user]
+                self._quantum = 0
+            elif self._quantum <= 0:
+                self._queues.move_to_end(user)
+
+            self.metrics.queued_users = len(self._queues)
+
+            if not future.done():
+                return future
+
+        return None
+
+    async def _dispatch(self) -> None:
+        while self._queues:
+            if not self._take_token():
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+
+            if (future := self._next_waiter()) is None:
+                # Everyone gave up waiting, so put the token back.
+                self._tokens += 1
+                return
+
+            future.set_result(None)
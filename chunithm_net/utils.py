@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from datetime import datetime
 from typing import cast
 from zoneinfo import ZoneInfo
@@ -52,34 +53,50 @@ def difficulty_from_imgurl(url: str) -> Difficulty:
             raise ValueError(msg)
 
 
+# Lamps are identified by a part of their icon's URL. When several icons are
+# present, the first matching entry in these lists wins.
+_CLEAR_TYPES = [
+    ("clear", ClearType.CLEAR),
+    ("hard", ClearType.HARD),
+    ("absolutep", ClearType.ABSOLUTE_PLUS),
+    ("absolute", ClearType.ABSOLUTE),
+    ("catastrophy", ClearType.CATASTROPHY),
+]
+# FC and AJ should override all other lamps.
+_COMBO_TYPES = [
+    ("fullcombo", ComboType.FULL_COMBO),
+    ("alljusticecritical", ComboType.ALL_JUSTICE_CRITICAL),
+    ("alljustice", ComboType.ALL_JUSTICE),
+]
+_LAMP_KEYWORDS = [keyword for keyword, _ in _CLEAR_TYPES + _COMBO_TYPES]
+
+
+def rank_and_lamps_from_sources(
+    sources: Iterable[str],
+) -> tuple[Rank, ClearType, ComboType]:
+    """Classifies the icons of a record, given their URLs, in a single pass."""
+    rank = None
+    found = set()
+
+    for src in sources:
+        if rank is None and "_rank_" in src:
+            rank = Rank(int(extract_last_part(src)))
+
+        found.update(keyword for keyword in _LAMP_KEYWORDS if keyword in src)
+
+    clear_type = next(
+        (value for keyword, value in _CLEAR_TYPES if keyword in found),
+        ClearType.FAILED,
+    )
+    combo_type = next(
+        (value for keyword, value in _COMBO_TYPES if keyword in found),
+        ComboType.NONE,
+    )
+
+    return rank if rank is not None else Rank.D, clear_type, combo_type
+
+
 def get_rank_and_lamps(soup: Tag) -> tuple[Rank, ClearType, ComboType]:
-    if (rank_img_elem := soup.select_one("img[src*=_rank_]")) is not None:
-        rank_img_url = cast(str, rank_img_elem["src"])
-        rank = Rank(int(extract_last_part(rank_img_url)))
-    else:
-        rank = Rank.D
-
-    if soup.select_one("img[src*=clear]") is not None:
-        clear_type = ClearType.CLEAR
-    elif soup.select_one("img[src*=hard]") is not None:
-        clear_type = ClearType.HARD
-    elif soup.select_one("img[src*=absolutep]") is not None:
-        clear_type = ClearType.ABSOLUTE_PLUS
-    elif soup.select_one("img[src*=absolute]") is not None:
-        clear_type = ClearType.ABSOLUTE
-    elif soup.select_one("img[src*=catastrophy]") is not None:
-        clear_type = ClearType.CATASTROPHY
-    else:
-        clear_type = ClearType.FAILED
-
-    # FC and AJ should override all other lamps.
-    if soup.select_one("img[src*=fullcombo]") is not None:
-        combo_type = ComboType.FULL_COMBO
-    elif soup.select_one("img[src*=alljusticecritical]") is not None:
-        combo_type = ComboType.ALL_JUSTICE_CRITICAL
-    elif soup.select_one("img[src*=alljustice]") is not None:
-        combo_type = ComboType.ALL_JUSTICE
-    else:
-        combo_type = ComboType.NONE
-
-    return rank, clear_type, combo_type
+    return rank_and_lamps_from_sources(
+        cast(str, img["src"]) for img in soup.find_all("img", src=True)
+    )
@@ -3,12 +3,10 @@ from typing import TYPE_CHECKING
 import discord
 from discord import app_commands
 from discord.ext import commands
-from sqlalchemy import func, select
-
-from database.models import Alias, Song
 
 if TYPE_CHECKING:
     from bot import ChuniBot
+    from cogs.botutils import UtilsCog
 
 
 class AutocompletersCog(commands.Cog, name="Autocompleters"):
@@ -23,40 +21,14 @@ class AutocompletersCog(commands.Cog, name="Autocompleters"):
         if len(current) < 3:
             return []
 
-        condition = Alias.guild_id == -1
-        if interaction.guild is not None:
-            condition |= Alias.guild_id == interaction.guild.id
-
-        song_query = select(Song.title, Song.title.label("alias")).where(Song.id < 8000)
-        aliases_query = (
-            select(
-                Song.title,
-                Alias.alias,
-            )
-            .join(Song)
-            .where(condition)
-        )
-
-        subquery = song_query.union_all(aliases_query).subquery()
-
-        sim_col = func.fuzz_qratio(func.lower(subquery.c.alias), current.lower()).label(
-            "sim"
-        )
-        stmt = (
-            select(
-                subquery.c.title,
-                func.max(sim_col),
-            )
-            .where(sim_col > 70)
-            .group_by(subquery.c.title)
-            .order_by(sim_col.desc())
-            .limit(25)
+        # The Utils cog is loaded after this one, so it's looked up when needed.
+        utils: "UtilsCog" = self.bot.get_cog("Utils")  # type: ignore[reportGeneralTypeIssues]
+        titles = utils.alias_index.complete(
+            current,
+            guild_id=interaction.guild.id if interaction.guild is not None else None,
         )
 
-        async with self.bot.begin_db_session() as session:
-            rows = (await session.execute(stmt)).scalars().all()
-
-        return [app_commands.Choice(name=row, value=row) for row in rows]
+        return [app_commands.Choice(name=title, value=title) for title in titles]
 
 
 async def setup(bot: "ChuniBot"):
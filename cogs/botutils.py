@@ -1,72 +1,153 @@
+import asyncio
 import contextlib
 from http.cookiejar import LWPCookieJar
 import io
-from typing import TYPE_CHECKING, Optional, Sequence, TypeVar
+from datetime import datetime
+from typing import TYPE_CHECKING, NamedTuple, Optional, Sequence, TypeVar, cast
 
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ext.commands import Context
-from rapidfuzz import fuzz, process
-from sqlalchemy import select, update
+from sqlalchemy import and_, delete, insert, select, update
 from sqlalchemy.orm import joinedload
 
-from chunithm_net import ChuniNet
-from chunithm_net.consts import (
-    KEY_INTERNAL_LEVEL,
-    KEY_LEVEL,
-    KEY_OVERPOWER_BASE,
-    KEY_OVERPOWER_MAX,
-    KEY_PLAY_RATING,
-    KEY_SONG_ID,
-    KEY_TOTAL_COMBO,
+from chunithm_net import (
+    ChuniNet,
+    ParseMemo,
+    ParserPool,
+    RateLimiter,
+    ResponseCache,
+)
+from chunithm_net.exceptions import ChuniNetException
+from chunithm_net.models.batch import RecordBatch
+from chunithm_net.models.enums import (
+    ClearType,
+    ComboType,
+    Difficulty,
+    Genres,
+    Rank,
+)
+from chunithm_net.models.record import MusicRecord, Record
+from database.models import (
+    Alias,
+    Chart,
+    Cookie,
+    PersonalBest,
+    PersonalBestSnapshot,
+    Song,
 )
-from chunithm_net.models.enums import Rank
-from chunithm_net.models.record import Record
-from database.models import Alias, Cookie, Song
 from utils import get_jacket_url
-from utils.calculation.overpower import (
-    calculate_overpower_base,
-    calculate_overpower_max,
+from utils.aliases import AliasIndex, CachedAlias
+from utils.calculation.breakdown import (
+    OverPowerBreakdown,
+    calculate_overpower_breakdown,
+)
+from utils.calculation.fixed_point import (
+    calculate_overpower_bases,
+    calculate_overpower_maxes,
+    calculate_ratings,
 )
-from utils.calculation.rating import calculate_rating
+from utils.calculation.optimizer import RatingImprovement, rank_rating_improvements
 from utils.config import config
 from utils.logging import logger
+from utils.references import ReferenceIndex
+from utils.sampling import ChartSampler
+from utils.sessions import CachedSession, SessionCache, serialize_cookies
 from utils.types import MissingDetailedParams
 
 if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
     from bot import ChuniBot
+    from chunithm_net.models.player_data import PlayerData
 
 T = TypeVar("T", bound=Record)
 
+# Twice the refresh interval, so a session is never left to expire between runs.
+_SESSION_REFRESH_MARGIN = 2 * 60
 
-class CachedAlias:
-    id: Optional[int] = None
-    alias: str
-    title: str
-    song_id: int
-    guild_id: Optional[int] = None
 
-    def __init__(
-        self,
-        id: Optional[int],
-        alias: str,
-        title: str,
-        song_id: int,
-        guild_id: Optional[int],
-    ) -> None:
-        self.id = id
-        self.alias = alias
-        self.title = title
-        self.song_id = song_id
-        self.guild_id = guild_id
+def _naive(date: datetime) -> datetime:
+    # CHUNITHM-NET times are in JST, and SQLite doesn't store time zones.
+    return date.replace(tzinfo=None)
+
+
+def _internal_level(chart: Chart) -> float:
+    # Charts without a known chart constant are rated at their level.
+    if chart.const is not None:
+        return chart.const
+
+    try:
+        return float(chart.level.replace("+", ".5"))
+    except ValueError:
+        return 0
+
+
+class ChartColumns(NamedTuple):
+    charts: list[tuple[int, Difficulty]]
+    internal_levels: list[float]
+    genres: list[str]
+    versions: list[str]
 
 
 class UtilsCog(commands.Cog, name="Utils"):
     def __init__(self, bot: "ChuniBot") -> None:
         self.bot = bot
-        self.alias_cache: list[CachedAlias] = []
+        self.alias_index = AliasIndex()
+        self.references = ReferenceIndex.empty()
+        self.sampler = ChartSampler(self.references)
+        self.personal_best_refreshes: dict[int, asyncio.Task[None]] = {}
+        # Sessions held while their pages are revalidated in the background.
+        self.revalidating_sessions: set[asyncio.Task[None]] = set()
+        self.sessions = SessionCache()
+        self.responses = ResponseCache()
+        self.parse_memo = ParseMemo()
+        self.rate_limiter = RateLimiter(
+            config.bot.chunithm_net_rate_limit, config.bot.chunithm_net_burst
+        )
+        self.parser_pool = (
+            ParserPool(
+                config.bot.chunithm_net_parser_pool,  # type: ignore[reportGeneralTypeIssues]
+                max_workers=config.bot.chunithm_net_parser_workers,
+                inline_threshold=config.bot.chunithm_net_parser_inline_threshold,
+            )
+            if config.bot.chunithm_net_parser_pool is not None
+            else None
+        )
 
     async def cog_load(self) -> None:
-        return await self._reload_alias_cache()
+        self.evict_idle_sessions.start()
+        self.refresh_sessions.start()
+        await self.reload_references()
+        await self._reload_alias_cache()
+        self.reload_tables.start()
+
+    async def cog_unload(self) -> None:
+        self.evict_idle_sessions.cancel()
+        self.refresh_sessions.cancel()
+        self.reload_tables.cancel()
+
+        for task in self.personal_best_refreshes.values():
+            task.cancel()
+
+        for task in self.revalidating_sessions:
+            task.cancel()
+
+        for session in self.sessions.clear():
+            await self._close_session(session)
+
+        if self.parser_pool is not None:
+            self.parser_pool.close(wait=False)
+
+    async def reload_references(self) -> None:
+        """Reloads the in-memory index of songs and charts from the database,
+        along with the random sampler built from it."""
+        async with self.bot.begin_db_session() as session:
+            references = await ReferenceIndex.load(session)
+        sampler = ChartSampler(references)
+
+        # Commands that already got the old index keep using it until they're done.
+        self.references = references
+        self.sampler = sampler
 
     async def _reload_alias_cache(self) -> None:
         async with self.bot.begin_db_session() as session:
@@ -77,23 +158,23 @@ class UtilsCog(commands.Cog, name="Utils"):
             )
             songs = (await session.execute(stmt)).scalars().unique()
 
-        self.alias_cache.clear()
+        aliases: list[CachedAlias] = []
 
         for song in songs:
-            self.alias_cache.append(
-                CachedAlias(None, song.title, song.title, song.id, -1)
+            aliases.append(CachedAlias(None, song.title, song.title, song.id, -1))
+
+            aliases.extend(
+                CachedAlias(
+                    alias.rowid,
+                    alias.alias,
+                    song.title,
+                    alias.song_id,
+                    alias.guild_id,
+                )
+                for alias in song.aliases
             )
 
-            for alias in song.aliases:
-                self.alias_cache.append(
-                    CachedAlias(
-                        alias.rowid,
-                        alias.alias,
-                        song.title,
-                        alias.song_id,
-                        alias.guild_id,
-                    )
-                )
+        self.alias_index = AliasIndex(aliases)
 
     async def guild_prefix(self, ctx: Context) -> str:
         default_prefix: str = config.bot.default_prefix
@@ -128,119 +209,526 @@ class UtilsCog(commands.Cog, name="Utils"):
     @contextlib.asynccontextmanager
     async def chuninet(self, ctx_or_id: Context | int):
         id = ctx_or_id if isinstance(ctx_or_id, int) else ctx_or_id.author.id
-        jar = await self.login_check(ctx_or_id)
+        session = await self._acquire_session(id)
 
-        session = ChuniNet(jar)
         try:
-            yield session
+            yield session.client
         finally:
-            async with self.bot.begin_db_session() as db_session:
-                await db_session.execute(
-                    update(Cookie)
-                    .where(Cookie.discord_id == id)
-                    .values(cookie=f"#LWP-Cookies-2.0\n{jar.as_lwp_str()}")
-                )
-                await db_session.commit()
+            if revalidations := self.responses.revalidations(id):
+                self._hold_session(session, revalidations)
+            else:
+                await self._release_session(session)
 
-            await session.close()
+    def _hold_session(
+        self, session: CachedSession, revalidations: list[asyncio.Task]
+    ) -> None:
+        """Releases a session once the pages served stale from it have been fetched
+        again in the background, since they are fetched with its client."""
+        async def hold() -> None:
+            try:
+                await asyncio.wait(revalidations)
+            finally:
+                await self._release_session(session)
+
+        task = asyncio.create_task(hold())
+        self.revalidating_sessions.add(task)
+        task.add_done_callback(self.revalidating_sessions.discard)
+
+    async def _acquire_session(self, id: int) -> CachedSession:
+        if (session := self.sessions.acquire(id)) is not None:
+            return session
+
+        jar = await self.login_check(id)
+
+        # Another command from the same user might have created a session while
+        # we were loading the cookies.
+        if (session := self.sessions.acquire(id)) is not None:
+            return session
+
+        client = ChuniNet(
+            jar,
+            cache=self.responses,
+            rate_limiter=self.rate_limiter,
+            parser_pool=self.parser_pool,
+            parse_memo=self.parse_memo,
+            user_key=id,
+        )
+        session = CachedSession(id, client, jar)
+        for evicted in self.sessions.add(session):
+            await self._close_session(evicted)
 
-    async def hydrate_records(self, records: Sequence[T]) -> list[T]:
-        song_ids = set()
-        jackets = set()
+        return session
 
-        for record in records:
-            song_id = record.extras.get(KEY_SONG_ID)
+    async def _release_session(self, session: CachedSession) -> None:
+        self.sessions.release(session)
 
-            if song_id is not None:
-                song_ids.add(song_id)
-            elif record.jacket is not None:
-                jackets.add(record.jacket.split("/")[-1])
-            else:
-                raise MissingDetailedParams
+        if session.invalidated and session.refs <= 0:
+            await session.client.close()
+            return
 
-        async with self.bot.begin_db_session() as session:
-            stmt = (
-                select(Song)
-                .where(Song.id.in_(song_ids) | Song.jacket.in_(jackets))
-                .options(joinedload(Song.charts))
-            )
-            songs = (await session.execute(stmt)).scalars().unique()
+        await self._save_cookies(session)
 
-        song_lookup: dict[int | str, Song] = {}
+    async def _save_cookies(self, session: CachedSession) -> None:
+        if session.invalidated or not session.cookies_changed:
+            return
 
-        for song in songs:
-            song_lookup[song.id] = song
-            song_lookup[song.jacket] = song
+        cookies = serialize_cookies(session.jar)
 
-        hydrated_records = []
+        async with self.bot.begin_db_session() as db_session:
+            await db_session.execute(
+                update(Cookie)
+                .where(Cookie.discord_id == session.discord_id)
+                .values(cookie=cookies)
+            )
+            await db_session.commit()
 
-        for record in records[:]:
-            song_id = record.extras.get(KEY_SONG_ID)
+        session.saved_cookies = cookies
 
-            if song_id is not None:
-                song = song_lookup.get(song_id)
-            elif record.jacket is not None:
-                song = song_lookup.get(record.jacket.split("/")[-1])
-            else:
-                raise MissingDetailedParams
+    async def _close_session(self, session: CachedSession) -> None:
+        await self._save_cookies(session)
+        await session.client.close()
 
-            if song is None:
-                logger.warn(f"Missing song data for song title {record.title}")
-                hydrated_records.append(record)
-                continue
+    async def invalidate_session(self, id: int) -> None:
+        """Drops the cached CHUNITHM-NET session and the personal best snapshot of
+        a user, without saving its cookies. Must be called whenever the stored
+        cookie of a user changes, since it may now be for another account."""
+        self.responses.invalidate(id)
 
-            if record.jacket is None:
-                record.jacket = get_jacket_url(song)
+        if (session := self.sessions.pop(id)) is not None:
+            session.invalidated = True
 
-            chart = next(
-                (
-                    c
-                    for c in song.charts
-                    if c.difficulty == record.difficulty.short_form()
-                ),
-                None,
-            )
+            if session.refs <= 0:
+                await session.client.close()
 
-            if chart is None:
-                logger.warn(
-                    f"Missing chart data for song ID {song.id}, difficulty {record.difficulty}"
+        # A refresh still running would write the old account's records back.
+        if (refresh := self.personal_best_refreshes.get(id)) is not None:
+            refresh.cancel()
+            await asyncio.gather(refresh, return_exceptions=True)
+
+        async with self.bot.begin_db_session() as db_session, db_session.begin():
+            await db_session.execute(
+                delete(PersonalBest).where(PersonalBest.discord_id == id)
+            )
+            await db_session.execute(
+                delete(PersonalBestSnapshot).where(
+                    PersonalBestSnapshot.discord_id == id
                 )
-                hydrated_records.append(record)
-                continue
+            )
 
-            record.extras[KEY_LEVEL] = chart.level
+    @tasks.loop(minutes=1)
+    async def evict_idle_sessions(self):
+        for session in self.sessions.evict_idle():
+            await self._close_session(session)
+
+    # The song, chart and alias tables are updated by dbutils.py, outside of the
+    # bot, so the in-memory indexes built from them are reloaded every so often.
+    @tasks.loop(hours=1)
+    async def reload_tables(self):
+        # cog_load has just loaded them.
+        if self.reload_tables.current_loop == 0:
+            return
+
+        await self.reload_references()
+        await self._reload_alias_cache()
+
+    # Cached sessions belong to recently active users, who are likely to send
+    # another command soon. Re-authenticating them before CHUNITHM-NET expires
+    # their session keeps the re-authentication round trips off the command.
+    @tasks.loop(minutes=1)
+    async def refresh_sessions(self):
+        expiring = [
+            session
+            for session in self.sessions
+            if not session.invalidated
+            and session.client.session_expires_soon(_SESSION_REFRESH_MARGIN)
+        ]
 
-            if chart.const is None:
-                try:
-                    internal_level = record.extras[KEY_INTERNAL_LEVEL] = float(
-                        chart.level.replace("+", ".5")
-                    )
-                except ValueError:
-                    internal_level = record.extras[KEY_INTERNAL_LEVEL] = 0
+        results = await asyncio.gather(
+            *[session.client.refresh_session() for session in expiring],
+            return_exceptions=True,
+        )
+
+        for session, result in zip(expiring, results):
+            if isinstance(result, ChuniNetException):
+                logger.debug(
+                    f"Could not refresh session of user {session.discord_id}: {result!r}"
+                )
+            elif isinstance(result, BaseException):
+                logger.error(
+                    f"Failed to refresh session of user {session.discord_id}",
+                    exc_info=result,
+                )
             else:
-                internal_level = record.extras[KEY_INTERNAL_LEVEL] = chart.const
+                await self._save_cookies(session)
 
-            record.extras[KEY_PLAY_RATING] = calculate_rating(
-                record.score, internal_level
+    def find_chart(
+        self,
+        title: str,
+        song_id: Optional[int],
+        jacket: Optional[str],
+        difficulty: str,
+    ) -> tuple[Optional[Song], Optional[Chart]]:
+        """Looks up the song and chart of a record, by its song ID or its jacket,
+        and the short form of its difficulty. Either is None if it is missing from
+        the database."""
+        references = self.references
+
+        if song_id is not None:
+            song = references.songs.get(song_id)
+        elif jacket is not None:
+            song = references.songs_by_jacket.get(jacket.split("/")[-1])
+        else:
+            raise MissingDetailedParams
+
+        if song is None:
+            logger.warn(f"Missing song data for song title {title}")
+            return None, None
+
+        chart = references.charts.get((song.id, difficulty))
+
+        if chart is None:
+            logger.warn(
+                f"Missing chart data for song ID {song.id}, difficulty {difficulty}"
             )
-            record.extras[KEY_OVERPOWER_BASE] = calculate_overpower_base(
-                record.score, internal_level
+
+        return song, chart
+
+    async def hydrate_records(self, records: Sequence[T]) -> list[T]:
+        hydrated_records = []
+        # Records with chart data, whose rating and OVER POWER are calculated
+        # together once every record has been looked up.
+        charted_records: list[T] = []
+
+        for record in records[:]:
+            song, chart = self.find_chart(
+                record.title,
+                record.song_id,
+                record.jacket,
+                record.difficulty.short_form(),
             )
-            record.extras[KEY_OVERPOWER_MAX] = calculate_overpower_max(internal_level)
+            hydrated_records.append(record)
+
+            if song is not None and record.jacket is None:
+                record.jacket = get_jacket_url(song)
+
+            if chart is None:
+                continue
+
+            record.level = chart.level
+            record.internal_level = _internal_level(chart)
 
             if chart.maxcombo is not None:
-                record.extras[KEY_TOTAL_COMBO] = chart.maxcombo
+                record.total_combo = chart.maxcombo
 
             if record.rank == Rank.D:
                 record.rank = Rank.from_score(record.score)
 
-            hydrated_records.append(record)
+            charted_records.append(record)
+
+        scores = [record.score for record in charted_records]
+        internal_levels = [record.internal_level or 0 for record in charted_records]
+
+        for record, play_rating, overpower_base, overpower_max in zip(
+            charted_records,
+            calculate_ratings(scores, internal_levels),
+            calculate_overpower_bases(scores, internal_levels),
+            calculate_overpower_maxes(internal_levels),
+        ):
+            record.play_rating = play_rating
+            record.overpower_base = overpower_base
+            record.overpower_max = overpower_max
 
         return hydrated_records
 
     async def hydrate_record(self, record: T) -> T:
         return (await self.hydrate_records([record]))[0]
 
+    async def hydrate_batch(self, batch: RecordBatch) -> RecordBatch:
+        """Hydrates a batch of records in place, like `hydrate_records`."""
+        short_forms = {
+            difficulty.value: difficulty.short_form() for difficulty in Difficulty
+        }
+        charted: list[int] = []
+
+        for i in range(len(batch)):
+            song_id, jacket = batch.song_ids[i], batch.jackets[i]
+            song, chart = self.find_chart(
+                batch.titles[i],
+                song_id if song_id != -1 else None,
+                jacket,
+                short_forms[batch.difficulties[i]],
+            )
+
+            if song is not None and jacket is None:
+                batch.jackets[i] = get_jacket_url(song)
+
+            if chart is None:
+                continue
+
+            batch.levels[i] = chart.level
+            batch.internal_levels[i] = _internal_level(chart)
+            charted.append(i)
+
+            if chart.maxcombo is not None:
+                batch.total_combos[i] = chart.maxcombo
+
+            if batch.ranks[i] == Rank.D.value:
+                batch.ranks[i] = Rank.from_score(batch.scores[i]).value
+
+        scores = [batch.scores[i] for i in charted]
+        internal_levels = [batch.internal_levels[i] for i in charted]
+
+        for i, play_rating, overpower_base, overpower_max in zip(
+            charted,
+            calculate_ratings(scores, internal_levels),
+            calculate_overpower_bases(scores, internal_levels),
+            calculate_overpower_maxes(internal_levels),
+        ):
+            batch.play_ratings[i] = play_rating
+            batch.overpower_bases[i] = overpower_base
+            batch.overpower_maxes[i] = overpower_max
+
+        return batch
+
+    async def personal_bests(
+        self,
+        client: ChuniNet,
+        *,
+        level: Optional[str] = None,
+        genre: Optional[Genres] = None,
+        rank: Optional[Rank] = None,
+        difficulty: Optional[Difficulty] = None,
+        player_data: Optional["PlayerData"] = None,
+        refresh: bool = False,
+    ) -> Optional[list[MusicRecord]]:
+        """Looks up the best records of the client's user in their snapshot.
+
+        The criteria are the same as `ChuniNet.music_record_by_folder`, with the
+        same precedence. `player_data` is fetched if not given, to check whether
+        the snapshot is up to date.
+
+        Returns None if the snapshot is missing or out of date, in which case the
+        records must be fetched from CHUNITHM-NET instead. With `refresh`, the
+        snapshot is then refreshed in the background, so the next lookup can use
+        it.
+        """
+        discord_id = cast(int, client.user_key)
+        if player_data is None:
+            player_data = await client.authenticate()
+
+        async with self.bot.begin_db_session() as session:
+            if not await self._personal_bests_are_current(
+                session, discord_id, player_data
+            ):
+                if refresh:
+                    self.schedule_personal_best_refresh(discord_id)
+                return None
+
+            stmt = select(PersonalBest).where(PersonalBest.discord_id == discord_id)
+
+            if difficulty == Difficulty.WORLDS_END:
+                stmt = stmt.where(PersonalBest.difficulty == difficulty.short_form())
+            elif level is not None:
+                stmt = stmt.join(
+                    Chart,
+                    and_(
+                        Chart.song_id == PersonalBest.song_id,
+                        Chart.difficulty == PersonalBest.difficulty,
+                    ),
+                ).where(
+                    Chart.level == level,
+                    PersonalBest.difficulty != Difficulty.WORLDS_END.short_form(),
+                )
+            elif difficulty is not None:
+                stmt = stmt.where(PersonalBest.difficulty == difficulty.short_form())
+
+                if genre is not None and genre != Genres.ALL:
+                    stmt = stmt.join(Song, Song.id == PersonalBest.song_id).where(
+                        Song.chunithm_catcode == genre.value
+                    )
+                elif rank is not None:
+                    stmt = stmt.where(PersonalBest.rank >= rank.value)
+
+            personal_bests = (
+                (await session.execute(stmt.order_by(PersonalBest.score.desc())))
+                .scalars()
+                .all()
+            )
+
+        return [
+            MusicRecord(
+                title=personal_best.title,
+                difficulty=Difficulty.from_short_form(personal_best.difficulty),
+                score=personal_best.score,
+                rank=Rank(personal_best.rank),
+                clear_lamp=ClearType(personal_best.clear_lamp),
+                combo_lamp=ComboType(personal_best.combo_lamp),
+                song_id=personal_best.song_id,
+            )
+            for personal_best in personal_bests
+        ]
+
+    def chart_columns(self) -> ChartColumns:
+        """Lists every available chart, except WORLD'S END charts, as columns."""
+        columns = ChartColumns([], [], [], [])
+
+        for song_id in sorted(self.references.songs):
+            song = self.references.songs[song_id]
+            if not song.available or song.removed:
+                continue
+
+            for chart in song.charts:
+                if chart.difficulty == Difficulty.WORLDS_END.short_form():
+                    continue
+
+                columns.charts.append(
+                    (song_id, Difficulty.from_short_form(chart.difficulty))
+                )
+                columns.internal_levels.append(_internal_level(chart))
+                columns.genres.append(song.genre)
+                columns.versions.append(song.version)
+
+        return columns
+
+    async def overpower_breakdown(
+        self,
+        client: ChuniNet,
+        *,
+        player_data: Optional["PlayerData"] = None,
+        refresh: bool = False,
+    ) -> Optional[OverPowerBreakdown]:
+        """Breaks down the OVER POWER of the client's user over every chart, from
+        their personal best snapshot. Returns None if the snapshot is missing or
+        out of date, and refreshes it if asked to, like `personal_bests`."""
+        records = await self.personal_bests(
+            client, player_data=player_data, refresh=refresh
+        )
+        if records is None:
+            return None
+
+        columns = self.chart_columns()
+
+        return calculate_overpower_breakdown(
+            columns.charts,
+            columns.internal_levels,
+            columns.genres,
+            columns.versions,
+            records,
+        )
+
+    async def rating_improvements(
+        self, client: ChuniNet, *, count: int = 5
+    ) -> Optional[list[RatingImprovement]]:
+        """Finds the charts where a better score raises the best 30 average of the
+        client's user the most, from their personal best snapshot. Returns None
+        if the snapshot is missing or out of date, and refreshes it, like
+        `personal_bests`."""
+        best30 = await self.hydrate_records(await client.best30())
+        records = await self.personal_bests(client, refresh=True)
+        if records is None:
+            return None
+
+        columns = self.chart_columns()
+
+        return rank_rating_improvements(
+            columns.charts, columns.internal_levels, best30, records, count=count
+        )
+
+    async def refresh_personal_bests_if_stale(
+        self, client: ChuniNet, player_data: "PlayerData"
+    ) -> None:
+        """Refreshes the personal best snapshot of the client's user in the
+        background if it is missing or out of date. For commands that fetch
+        their records from CHUNITHM-NET anyways, so the next lookups in the
+        snapshot don't have to."""
+        discord_id = cast(int, client.user_key)
+
+        async with self.bot.begin_db_session() as session:
+            if await self._personal_bests_are_current(
+                session, discord_id, player_data
+            ):
+                return
+
+        self.schedule_personal_best_refresh(discord_id)
+
+    async def _personal_bests_are_current(
+        self, session: "AsyncSession", discord_id: int, player_data: "PlayerData"
+    ) -> bool:
+        snapshot = await session.get(PersonalBestSnapshot, discord_id)
+
+        return snapshot is not None and snapshot.last_play_date >= _naive(
+            player_data.last_play_date
+        )
+
+    def schedule_personal_best_refresh(self, discord_id: int) -> None:
+        """Refreshes the personal best snapshot of a user in the background,
+        unless it is already being refreshed."""
+        if discord_id in self.personal_best_refreshes:
+            return
+
+        task = asyncio.create_task(self.refresh_personal_bests(discord_id))
+        self.personal_best_refreshes[discord_id] = task
+
+        def done(task: asyncio.Task[None]) -> None:
+            del self.personal_best_refreshes[discord_id]
+
+            if task.cancelled() or (exc := task.exception()) is None:
+                return
+
+            if isinstance(exc, ChuniNetException):
+                logger.debug(
+                    f"Could not refresh personal bests of user {discord_id}: {exc!r}"
+                )
+            else:
+                logger.error(
+                    f"Failed to refresh personal bests of user {discord_id}",
+                    exc_info=exc,
+                )
+
+        task.add_done_callback(done)
+
+    async def refresh_personal_bests(self, discord_id: int) -> None:
+        """Replaces the personal best snapshot of a user with their current
+        records on CHUNITHM-NET."""
+        async with self.chuninet(discord_id) as client:
+            player_data = await client.authenticate()
+            records = await client.personal_bests()
+
+        rows: dict[tuple[int, str], dict] = {}
+        for record in records:
+            if record.song_id is None:
+                continue
+
+            key = (record.song_id, record.difficulty.short_form())
+            if key in rows and rows[key]["score"] >= record.score:
+                continue
+
+            rows[key] = {
+                "discord_id": discord_id,
+                "song_id": record.song_id,
+                "difficulty": record.difficulty.short_form(),
+                "title": record.title,
+                "score": record.score,
+                "rank": Rank.from_score(record.score).value,
+                "clear_lamp": record.clear_lamp.value,
+                "combo_lamp": record.combo_lamp.value,
+            }
+
+        async with self.bot.begin_db_session() as session:
+            await session.execute(
+                delete(PersonalBest).where(PersonalBest.discord_id == discord_id)
+            )
+            if rows:
+                await session.execute(insert(PersonalBest), list(rows.values()))
+
+            await session.merge(
+                PersonalBestSnapshot(
+                    discord_id=discord_id,
+                    last_play_date=_naive(player_data.last_play_date),
+                )
+            )
+            await session.commit()
+
     async def find_song(
         self,
         query: str,
@@ -264,33 +752,22 @@ class UtilsCog(commands.Cog, name="Utils"):
         tuple[Song, Alias | None, float]
             The third item is the similarity of the matched song.
         """
-        aliases = [
-            x for x in self.alias_cache if x.guild_id == -1 or x.guild_id == guild_id
-        ]
-        (_, similarity, index) = process.extractOne(
-            query,
-            [x.alias for x in aliases],
-            scorer=fuzz.QRatio,
-            processor=str.lower,
-        )
-        matching_alias = aliases[index]
+        result = self.alias_index.search(query, guild_id=guild_id)
+        if result is None:
+            return None, None, 0
 
-        async with self.bot.begin_db_session() as session:
-            condition = Song.id == matching_alias.song_id
-
-            if worlds_end:
-                condition = (Song.title == matching_alias.title) & (
-                    Song.genre == "WORLD'S END"
-                )
+        matching_alias, similarity = result
 
-            stmt = select(Song).where(condition)
-            song = (await session.execute(stmt)).scalar_one_or_none()
+        if worlds_end:
+            song = self.references.worlds_end_songs.get(matching_alias.title)
+        else:
+            song = self.references.songs.get(matching_alias.song_id)
 
-            if matching_alias.id is not None:
+        alias = None
+        if matching_alias.id is not None:
+            async with self.bot.begin_db_session() as session:
                 stmt = select(Alias).where(Alias.rowid == matching_alias.id)
                 alias = (await session.execute(stmt)).scalar_one_or_none()
-            else:
-                alias = None
 
         return song, alias, similarity
 
@@ -303,6 +780,8 @@ class UtilsCog(commands.Cog, name="Utils"):
         for cmd in self.bot.walk_commands():
             cmd.enabled = False
         # await update_db(self.bot.db)
+        await self.reload_references()
+        await self._reload_alias_cache()
         # Re-enable all commands
         for cmd in self.bot.walk_commands():
             cmd.enabled = True
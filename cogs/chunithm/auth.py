@@ -12,6 +12,7 @@ from chunithm_net import ChuniNet
 from chunithm_net.exceptions import ChuniNetException, InvalidTokenException
 from database.models import Cookie
 from utils import asuppress
+from utils.sessions import serialize_cookies
 from utils.views.login import LoginFlowView
 
 if TYPE_CHECKING:
@@ -49,6 +50,8 @@ class AuthCog(commands.Cog, name="Auth"):
         async with ctx.typing(), self.bot.begin_db_session() as session:
             stmt = delete(Cookie).where(Cookie.discord_id == ctx.author.id)
             await session.execute(stmt)
+
+        await self.utils.invalidate_session(ctx.author.id)
         await ctx.reply(msg, mention_author=False)
 
     async def _verify_and_login(self, id: int, clal: str) -> Optional[Exception]:
@@ -76,17 +79,23 @@ class AuthCog(commands.Cog, name="Auth"):
         jar = LWPCookieJar()
         jar.set_cookie(cookie)
 
-        async with ChuniNet(jar) as client:
+        async with ChuniNet(
+            jar,
+            rate_limiter=self.utils.rate_limiter,
+            parser_pool=self.utils.parser_pool,
+            parse_memo=self.utils.parse_memo,
+            user_key=id,
+        ) as client:
             try:
                 await client.authenticate()
             except ChuniNetException as e:
                 return e
 
         async with self.bot.begin_db_session() as session, session.begin():
-            await session.merge(
-                Cookie(discord_id=id, cookie=f"#LWP-Cookies-2.0\n{jar.as_lwp_str()}")
-            )
-            return None
+            await session.merge(Cookie(discord_id=id, cookie=serialize_cookies(jar)))
+
+        await self.utils.invalidate_session(id)
+        return None
 
     @commands.hybrid_command("login")
     async def login(self, ctx: Context, clal: Optional[str] = None):
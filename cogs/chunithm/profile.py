@@ -15,6 +15,7 @@ from utils.views.profile import ProfileView
 if TYPE_CHECKING:
     from bot import ChuniBot
     from cogs.botutils import UtilsCog
+    from utils.calculation.breakdown import OverPowerTotal
 
 
 @dataclass
@@ -117,6 +118,13 @@ def render_avatar(items: dict[str, bytes]) -> BytesIO:
     return buffer
 
 
+def _format_totals(totals: dict[str, "OverPowerTotal"]) -> str:
+    return "\n".join(
+        f"{name}: {total.value:.2f} ({total.progress * 100:.2f}%)"
+        for name, total in totals.items()
+    )
+
+
 class ProfileCog(commands.Cog, name="Profile"):
     def __init__(self, bot: "ChuniBot") -> None:
         self.bot = bot
@@ -205,6 +213,21 @@ class ProfileCog(commands.Cog, name="Profile"):
                 .set_thumbnail(url=player_data.character)
             )
 
+            breakdown = await self.utils.overpower_breakdown(
+                client, player_data=player_data
+            )
+            if breakdown is not None:
+                embed.add_field(
+                    name="OVER POWER by difficulty",
+                    value=_format_totals(
+                        {
+                            f"{difficulty.emoji()} {difficulty}": total
+                            for difficulty, total in breakdown.difficulties.items()
+                        }
+                    ),
+                    inline=False,
+                )
+
             view = ProfileView(ctx, player_data)
             view.message = await ctx.reply(
                 embed=embed,
@@ -212,6 +235,55 @@ class ProfileCog(commands.Cog, name="Profile"):
                 mention_author=False,
             )
 
+    @commands.hybrid_command(name="overpower", aliases=["op"])
+    async def overpower(
+        self, ctx: Context, *, user: Optional[discord.User | discord.Member] = None
+    ):
+        """View your OVER POWER by genre, version and difficulty.
+
+        Parameters
+        ----------
+        user: Optional[discord.User | discord.Member]
+            The user to view OVER POWER for. Defaults to the author.
+        """
+
+        async with ctx.typing(), self.utils.chuninet(
+            ctx if user is None else user.id
+        ) as client:
+            player_data = await client.authenticate()
+            breakdown = await self.utils.overpower_breakdown(
+                client, player_data=player_data, refresh=True
+            )
+
+        if breakdown is None:
+            msg = "Scores are still being collected. Please try again in a minute."
+            raise commands.BadArgument(msg)
+
+        total = breakdown.total
+        embed = discord.Embed(
+            title=f"OVER POWER of {player_data.name}",
+            description=f"▸ **Total**: {total.value:.2f} / {total.max:.2f} ({total.progress * 100:.2f}%)",
+            color=player_data.possession.color(),
+        )
+        embed.add_field(
+            name="Difficulty",
+            value=_format_totals(
+                {
+                    str(difficulty): total
+                    for difficulty, total in breakdown.difficulties.items()
+                }
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name="Genre", value=_format_totals(breakdown.genres), inline=False
+        )
+        embed.add_field(
+            name="Version", value=_format_totals(breakdown.versions), inline=False
+        )
+
+        await ctx.reply(embed=embed, mention_author=False)
+
     @commands.hybrid_command(name="rename")
     async def rename(self, ctx: Context, *, new_name: str):
         """Use magical powers to change your IGN.
@@ -1,6 +1,8 @@
+import asyncio
 import contextlib
 import itertools
 from argparse import ArgumentError
+from collections.abc import Awaitable, Callable
 from types import SimpleNamespace
 from typing import TYPE_CHECKING, Optional, cast
 
@@ -8,12 +10,12 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import Context
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
 
-from chunithm_net.consts import INTERNATIONAL_JACKET_BASE, JACKET_BASE, KEY_PLAY_RATING
+from chunithm_net import ChuniNet
+from chunithm_net.consts import INTERNATIONAL_JACKET_BASE, JACKET_BASE
+from chunithm_net.models.batch import RecordBatch
 from chunithm_net.models.enums import Difficulty, Genres, Rank
-from database.models import SongJacket
+from chunithm_net.models.record import Record
 from utils import did_you_mean_text, shlex_split
 from utils.argparse import DiscordArguments
 from utils.components import ScoreCardEmbed
@@ -32,6 +34,30 @@ class RecordsCog(commands.Cog, name="Records"):
         self.utils: "UtilsCog" = self.bot.get_cog("Utils")  # type: ignore[reportGeneralTypeIssues]
         self.autocompleters: "AutocompletersCog" = self.bot.get_cog("Autocompleters")  # type: ignore[reportGeneralTypeIssues]
 
+    async def _top_records(
+        self,
+        client: ChuniNet,
+        *,
+        level: Optional[str] = None,
+        genre: Optional[Genres] = None,
+        rank: Optional[Rank] = None,
+        difficulty: Optional[Difficulty] = None,
+    ) -> RecordBatch:
+        records = await self.utils.personal_bests(
+            client,
+            level=level,
+            genre=genre,
+            rank=rank,
+            difficulty=difficulty,
+            refresh=True,
+        )
+        if records is not None:
+            return RecordBatch(records)
+
+        return await client.music_record_batch_by_folder(
+            level=level, genre=genre, rank=rank, difficulty=difficulty
+        )
+
     @commands.hybrid_command(name="recent", aliases=["rs"])
     async def recent(
         self, ctx: Context, *, user: Optional[discord.User | discord.Member] = None
@@ -77,7 +103,7 @@ class RecordsCog(commands.Cog, name="Records"):
             The user to compare with. Defaults to the author.
         """
 
-        async with ctx.typing(), self.bot.begin_db_session() as session, self.utils.chuninet(
+        async with ctx.typing(), self.utils.chuninet(
             ctx if user is None else user.id
         ) as client:
             if ctx.message.reference is not None:
@@ -111,12 +137,13 @@ class RecordsCog(commands.Cog, name="Records"):
                 msg = "The message replied to does not contain any charts/scores."
                 raise commands.BadArgument(msg)
 
-            sql = (
-                select(SongJacket)
-                .where(SongJacket.jacket_url.in_(thumbnail_urls))
-                .options(joinedload(SongJacket.song))
-            )
-            jackets = (await session.execute(sql)).scalars().all()
+            songs_by_jacket_url = self.utils.references.songs_by_jacket_url
+            # Pairs of jacket URL and song, in the order of the embeds.
+            jackets = [
+                (url, songs_by_jacket_url[url])
+                for url in dict.fromkeys(thumbnail_urls)
+                if url in songs_by_jacket_url
+            ]
 
             if len(jackets) == 0:
                 await ctx.reply("No song found.", mention_author=False)
@@ -124,7 +151,7 @@ class RecordsCog(commands.Cog, name="Records"):
 
             if len(jackets) > 1:
                 view = SelectToCompareView(
-                    [(x.song.title, i) for i, x in enumerate(jackets)]
+                    [(song.title, i) for i, (_, song) in enumerate(jackets)]
                 )
                 compare_message = await ctx.reply(
                     "Select a score to compare with:", view=view, mention_author=False
@@ -138,22 +165,21 @@ class RecordsCog(commands.Cog, name="Records"):
                     )
                     return
 
-                jacket = jackets[int(view.value)]
-                song = jacket.song
+                jacket_url, song = jackets[int(view.value)]
             else:
                 compare_message = None
-                jacket = jackets[0]
-                song = jacket.song
+                jacket_url, song = jackets[0]
 
             song.raise_if_not_available()
 
             embed = next(
                 x
                 for x in message.embeds
-                if jacket.jacket_url in {x.thumbnail.url, x.image.url}
+                if jacket_url in {x.thumbnail.url, x.image.url}
             )
             userinfo = await client.authenticate()
             records = await client.music_record(song.id)
+            await self.utils.refresh_personal_bests_if_stale(client, userinfo)
 
             if len(records) == 0:
                 await ctx.reply(
@@ -279,6 +305,7 @@ class RecordsCog(commands.Cog, name="Records"):
             userinfo = await client.authenticate()
 
             records = await client.music_record(song.id)
+            await self.utils.refresh_personal_bests_if_stale(client, userinfo)
 
             if len(records) == 0:
                 await ctx.reply(
@@ -297,6 +324,56 @@ class RecordsCog(commands.Cog, name="Records"):
             )
             return None
 
+    async def _reply_records_view(
+        self,
+        ctx: Context,
+        user: Optional[discord.User | discord.Member],
+        fetch: Callable[..., Awaitable[list[Record]]],
+    ):
+        sent = asyncio.Event()
+        view: Optional[B30View] = None
+
+        # A cached page might be served, in which case the message is updated
+        # once the page has been fetched again.
+        async def refresh(records: list[Record]):
+            nonlocal view
+            await sent.wait()
+
+            # Nothing to update if the reply was never sent.
+            if view is None:
+                return
+
+            records = await self.utils.hydrate_records(records)
+            message = view.message
+            view.stop()
+
+            view = B30View(ctx, records)
+            view.message = await message.edit(
+                content=view.format_content(),
+                embeds=view.format_page(view.items[: view.per_page]),
+                view=view,
+            )
+
+        async with ctx.typing(), self.utils.chuninet(
+            ctx if user is None else user.id
+        ) as client:
+            try:
+                records = await fetch(client, on_revalidate=refresh)
+                records = await self.utils.hydrate_records(records)
+
+                reply_view = B30View(ctx, records)
+                reply_view.message = await ctx.reply(
+                    content=reply_view.format_content(),
+                    embeds=reply_view.format_page(
+                        reply_view.items[: reply_view.per_page]
+                    ),
+                    view=reply_view,
+                    mention_author=False,
+                )
+                view = reply_view
+            finally:
+                sent.set()
+
     @commands.hybrid_command("best30", aliases=["b30"])
     async def best30(
         self, ctx: Context, *, user: Optional[discord.User | discord.Member] = None
@@ -309,19 +386,7 @@ class RecordsCog(commands.Cog, name="Records"):
             The user to get scores for.
         """
 
-        async with ctx.typing(), self.utils.chuninet(
-            ctx if user is None else user.id
-        ) as client:
-            best30 = await client.best30()
-            best30 = await self.utils.hydrate_records(best30)
-
-            view = B30View(ctx, best30)
-            view.message = await ctx.reply(
-                content=view.format_content(),
-                embeds=view.format_page(view.items[: view.per_page]),
-                view=view,
-                mention_author=False,
-            )
+        await self._reply_records_view(ctx, user, ChuniNet.best30)
 
     @commands.hybrid_command("recent10", aliases=["r10"])
     async def recent10(
@@ -335,19 +400,7 @@ class RecordsCog(commands.Cog, name="Records"):
             The user to get scores for.
         """
 
-        async with ctx.typing(), self.utils.chuninet(
-            ctx if user is None else user.id
-        ) as client:
-            recent10 = await client.recent10()
-            recent10 = await self.utils.hydrate_records(recent10)
-
-            view = B30View(ctx, recent10)
-            view.message = await ctx.reply(
-                content=view.format_content(),
-                embeds=view.format_page(view.items[: view.per_page]),
-                view=view,
-                mention_author=False,
-            )
+        await self._reply_records_view(ctx, user, ChuniNet.recent10)
 
     @app_commands.command(name="top", description="View your best scores for a level.")
     @app_commands.describe(
@@ -403,18 +456,14 @@ class RecordsCog(commands.Cog, name="Records"):
         async with self.utils.chuninet(
             interaction.user.id if user is None else user.id
         ) as client:
-            records = await client.music_record_by_folder(
-                level=level, genre=genre, difficulty=difficulty, rank=rank
+            records = await self._top_records(
+                client, level=level, genre=genre, difficulty=difficulty, rank=rank
             )
-            assert records is not None
 
             if len(records) == 0:
                 return await interaction.followup.send("No scores found.")
 
-            records = await self.utils.hydrate_records(records)
-            records.sort(
-                key=lambda x: (x.extras.get(KEY_PLAY_RATING), x.score), reverse=True
-            )
+            records = (await self.utils.hydrate_batch(records)).sorted()
 
             ctx = await Context.from_interaction(interaction)
             view = B30View(ctx, records, show_average=False)
@@ -538,21 +587,18 @@ class RecordsCog(commands.Cog, name="Records"):
         async with ctx.typing(), self.utils.chuninet(
             ctx if user is None else user.id
         ) as client:
-            records = await client.music_record_by_folder(
+            records = await self._top_records(
+                client,
                 level=level,
                 genre=args.genre,
                 difficulty=args.difficulty,
                 rank=args.rank,
             )
-            assert records is not None
 
             if len(records) == 0:
                 return await ctx.reply("No scores found.", mention_author=False)
 
-            records = await self.utils.hydrate_records(records)
-            records.sort(
-                key=lambda x: (x.extras.get(KEY_PLAY_RATING), x.score), reverse=True
-            )
+            records = (await self.utils.hydrate_batch(records)).sorted()
 
             view = B30View(ctx, records, show_average=False)
             view.message = await ctx.reply(
@@ -7,17 +7,18 @@ from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import Context
 from discord.utils import escape_markdown as emd
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 
 from chunithm_net.models.enums import Difficulty
-from database.models import Alias, Chart, Song
+from database.models import Alias, Chart, Song, alias_equals, song_title_equals
 from utils import (
     did_you_mean_text,
     get_jacket_url,
     shlex_split,
     yt_search_link,
 )
+from utils.aliases import CachedAlias
 from utils.config import config
 from utils.constants import SIMILARITY_THRESHOLD
 from utils.views.songlist import SonglistView
@@ -120,11 +121,7 @@ class SearchCog(commands.Cog, name="Search"):
             raise RuntimeError(msg)
 
         async with ctx.typing(), self.bot.begin_db_session() as session, session.begin():
-            stmt = (
-                select(Song)
-                .where(func.lower(Song.title) == func.lower(added_alias))
-                .limit(1)
-            )
+            stmt = select(Song).where(song_title_equals(added_alias)).limit(1)
             song = (await session.execute(stmt)).scalar_one_or_none()
 
             if song is not None:
@@ -134,7 +131,7 @@ class SearchCog(commands.Cog, name="Search"):
             if global_alias:
                 stmt = (
                     select(Alias)
-                    .where(func.lower(Alias.alias) == func.lower(added_alias))
+                    .where(alias_equals(added_alias))
                     .options(joinedload(Alias.song))
                 )
                 aliases = (await session.execute(stmt)).scalars().all()
@@ -151,6 +148,18 @@ class SearchCog(commands.Cog, name="Search"):
                     for x in aliases[1:]:
                         await session.delete(x)
 
+                    for x in aliases:
+                        self.utils.alias_index.remove(x.rowid)
+                    self.utils.alias_index.add(
+                        CachedAlias(
+                            aliases[0].rowid,
+                            aliases[0].alias,
+                            aliases[0].song.title,
+                            aliases[0].song_id,
+                            -1,
+                        )
+                    )
+
                     return await ctx.reply(
                         f"**{emd(added_alias)}** already exists as a guild-only alias. Promoting to global alias.",
                         mention_author=False,
@@ -159,7 +168,7 @@ class SearchCog(commands.Cog, name="Search"):
                 stmt = (
                     select(Alias)
                     .where(
-                        (func.lower(Alias.alias) == func.lower(added_alias))
+                        alias_equals(added_alias)
                         & ((Alias.guild_id == -1) | (Alias.guild_id == guild_id))
                     )
                     .options(joinedload(Alias.song))
@@ -176,13 +185,13 @@ class SearchCog(commands.Cog, name="Search"):
             stmt = select(Song).where(
                 # Limit to non-WE entries. WE entries are redirected to
                 # their non-WE respectives when song-searching anyways.
-                (func.lower(Song.title) == func.lower(song_title_or_alias))
+                song_title_equals(song_title_or_alias)
                 & (Song.id < 8000)
             )
             song = (await session.execute(stmt)).scalar_one_or_none()
 
             if song is None:
-                condition = func.lower(Alias.alias) == func.lower(song_title_or_alias)
+                condition = alias_equals(song_title_or_alias)
 
                 if not global_alias:
                     condition = condition & (
@@ -198,16 +207,17 @@ class SearchCog(commands.Cog, name="Search"):
 
                 song = alias.song
 
-            session.add(
-                Alias(
-                    alias=added_alias,
-                    guild_id=guild_id,
-                    song_id=song.id,
-                    owner_id=None if global_alias else ctx.author.id,
-                )
+            new_alias = Alias(
+                alias=added_alias,
+                guild_id=guild_id,
+                song_id=song.id,
+                owner_id=None if global_alias else ctx.author.id,
             )
+            session.add(new_alias)
 
-        await self.utils._reload_alias_cache()
+        self.utils.alias_index.add(
+            CachedAlias(new_alias.rowid, added_alias, song.title, song.id, guild_id)
+        )
 
         alias = "an alias"
         if global_alias:
@@ -235,7 +245,7 @@ class SearchCog(commands.Cog, name="Search"):
             raise commands.NoPrivateMessage
 
         async with ctx.typing(), self.bot.begin_db_session() as session, session.begin():
-            condition = func.lower(Alias.alias) == func.lower(removed_alias)
+            condition = alias_equals(removed_alias)
 
             if not is_alias_manager and ctx.guild is not None:
                 condition = condition & (Alias.guild_id == ctx.guild.id)
@@ -267,7 +277,7 @@ class SearchCog(commands.Cog, name="Search"):
 
             await session.delete(alias)
 
-        await self.utils._reload_alias_cache()
+        self.utils.alias_index.remove(alias.rowid)
         await ctx.reply(
             f"Removed {'global ' if alias.guild_id == -1 else ''}alias **{emd(removed_alias)}**.",
             mention_author=False,
@@ -1,23 +1,24 @@
 import itertools
 from decimal import Decimal
-from typing import TYPE_CHECKING, Literal, Optional, Sequence
+from typing import TYPE_CHECKING, Literal, Optional
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import Context, Range
 from discord.utils import escape_markdown
-from sqlalchemy import select, text
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import joinedload
 
 from chunithm_net.models.enums import Rank
 from database.models import Chart
 from utils import did_you_mean_text, floor_to_ndp, round_to_nearest
-from utils.calculation.overpower import (
+from utils.calculation.tables import (
     calculate_overpower_base,
     calculate_overpower_max,
+    calculate_rating,
+    calculate_score_for_rating,
 )
-from utils.calculation.rating import calculate_rating, calculate_score_for_rating
 from utils.components import ChartCardEmbed
 from utils.constants import SIMILARITY_THRESHOLD
 
@@ -33,6 +34,20 @@ class ToolsCog(commands.Cog, name="Tools"):
         self.utils: "UtilsCog" = self.bot.get_cog("Utils")  # type: ignore[reportGeneralTypeIssues]
         self.autocompleters: "AutocompletersCog" = self.bot.get_cog("Autocompleters")  # type: ignore[reportGeneralTypeIssues]
 
+    async def _load_charts(self, chart_ids: list[int]) -> list[Chart]:
+        # Keeps the random order the charts were picked in.
+        async with self.bot.begin_db_session() as session:
+            stmt = (
+                select(Chart)
+                .where(Chart.id.in_(chart_ids))
+                .options(joinedload(Chart.song), joinedload(Chart.sdvxin_chart_view))
+            )
+            charts = {
+                chart.id: chart for chart in (await session.execute(stmt)).scalars()
+            }
+
+        return [charts[chart_id] for chart_id in chart_ids if chart_id in charts]
+
     @commands.hybrid_command("calculate", aliases=["calc"])
     async def calculate(
         self,
@@ -124,12 +139,12 @@ class ToolsCog(commands.Cog, name="Tools"):
             )
         overpower_max = calculate_overpower_max(chart_constant)
         if mode == "aj":
-            rating = calculate_rating(1010000, chart_constant)
             res += f"\n1010000 | {overpower_max:>5.2f} = 100.00%"
 
         for score in scores:
             rating = calculate_rating(score, chart_constant)
             overpower_base = calculate_overpower_base(score, chart_constant)
+
             if score >= Rank.SS.min_score:
                 overpower = overpower_base + Decimal(1)
                 overpower_aj = f"{floor_to_ndp(overpower / overpower_max * 100, 2)}%"
@@ -171,7 +186,10 @@ class ToolsCog(commands.Cog, name="Tools"):
         if chart_constant < 1:
             chart_constant = 1
         while chart_constant <= rating and chart_constant <= 15.4:
-            required_score = calculate_score_for_rating(rating, chart_constant)
+            # Adding 0.1 repeatedly drifts off the table's chart constants.
+            required_score = calculate_score_for_rating(
+                rating, round(chart_constant, 1)
+            )
             if required_score is not None and required_score >= Rank.S.min_score:
                 res += (
                     f"\n {chart_constant:>4.1f} | {floor_to_ndp(required_score, 0):>7}"
@@ -198,25 +216,21 @@ class ToolsCog(commands.Cog, name="Tools"):
             Number of charts to return. Must be between 1 and 4.
         """
 
-        async with ctx.typing(), self.bot.begin_db_session() as session:
+        async with ctx.typing():
             # Check whether input is level or constant
-            stmt = (
-                select(Chart)
-                .order_by(text("RANDOM()"))
-                .limit(count)
-                .options(joinedload(Chart.song), joinedload(Chart.sdvxin_chart_view))
-            )
             try:
                 if "." in level:
                     query_level = float(level)
-                    stmt = stmt.where(Chart.const == query_level)
+                    chart_ids = self.utils.sampler.charts_by_const(
+                        query_level, query_level, count
+                    )
                 else:
-                    stmt = stmt.where(Chart.level == level)
+                    chart_ids = self.utils.sampler.charts_by_level(level, count)
             except ValueError:
                 msg = "Please enter a valid level or chart constant."
                 raise commands.BadArgument(msg) from None
 
-            charts: Sequence[Chart] = (await session.execute(stmt)).scalars().all()
+            charts = await self._load_charts(chart_ids)
 
             if len(charts) == 0:
                 await ctx.reply("No charts found.", mention_author=False)
@@ -255,7 +269,7 @@ class ToolsCog(commands.Cog, name="Tools"):
             assuming you're logged in.
         """
 
-        async with ctx.typing(), self.bot.begin_db_session() as session:
+        async with ctx.typing():
             if max_rating is None:
                 async with self.utils.chuninet(ctx) as client:
                     basic_player_data = await client.authenticate()
@@ -275,15 +289,9 @@ class ToolsCog(commands.Cog, name="Tools"):
             if max_level < min_level + 1:
                 max_level = min_level + 1
 
-            stmt = (
-                select(Chart)
-                .where((Chart.const >= min_level) & (Chart.const <= max_level))
-                .order_by(text("RANDOM()"))
-                .limit(count)
-                .options(joinedload(Chart.song), joinedload(Chart.sdvxin_chart_view))
+            charts = await self._load_charts(
+                self.utils.sampler.charts_by_const(min_level, max_level, count)
             )
-
-            charts: Sequence[Chart] = (await session.execute(stmt)).scalars().all()
             if len(charts) == 0:
                 await ctx.reply("No charts found.", mention_author=False)
                 return
@@ -307,6 +315,67 @@ class ToolsCog(commands.Cog, name="Tools"):
                 embeds.append(ChartCardEmbed(chart, target_score=target_score))
             await ctx.reply(embeds=embeds, mention_author=False)
 
+    @commands.hybrid_command("optimize", aliases=["improve"])
+    async def optimize(self, ctx: Context, count: Range[int, 1, 4] = 3):
+        """Find the charts where a better score raises your rating the most.
+
+        Charts are ranked by how much your best 30 average goes up per point of score
+        you need to gain, up to the next rank border.
+
+        Parameters
+        ----------
+        count: int
+            Number of charts to return. Must be between 1 and 4.
+        """
+
+        async with ctx.typing():
+            async with self.utils.chuninet(ctx) as client:
+                improvements = await self.utils.rating_improvements(
+                    client, count=count
+                )
+
+            if improvements is None:
+                msg = "Your scores are still being collected. Please try again in a minute."
+                raise commands.BadArgument(msg)
+
+            if len(improvements) == 0:
+                await ctx.reply("No charts found.", mention_author=False)
+                return
+
+            async with self.bot.begin_db_session() as session:
+                stmt = (
+                    select(Chart)
+                    .where(
+                        tuple_(Chart.song_id, Chart.difficulty).in_(
+                            [
+                                (x.song_id, x.difficulty.short_form())
+                                for x in improvements
+                            ]
+                        )
+                    )
+                    .options(
+                        joinedload(Chart.song), joinedload(Chart.sdvxin_chart_view)
+                    )
+                )
+                charts = {
+                    (chart.song_id, chart.difficulty): chart
+                    for chart in (await session.execute(stmt)).scalars()
+                }
+
+            embeds: list[discord.Embed] = []
+            for improvement in improvements:
+                chart = charts[
+                    (improvement.song_id, improvement.difficulty.short_form())
+                ]
+
+                embed = ChartCardEmbed(chart, target_score=improvement.target_score)
+                embed.set_footer(
+                    text=f"Current score: {improvement.score} ▸ Rating +{floor_to_ndp(improvement.rating_gain, 3)}"
+                )
+                embeds.append(embed)
+
+            await ctx.reply(embeds=embeds, mention_author=False)
+
     async def song_title_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
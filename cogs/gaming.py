@@ -11,9 +11,9 @@ from discord.ext import commands
 from discord.ext.commands import Context
 from PIL import Image
 from rapidfuzz import fuzz
-from sqlalchemy import delete, select, text
+from sqlalchemy import delete, select
 
-from database.models import Alias, GuessScore, Song
+from database.models import Alias, GuessScore
 from utils import get_jacket_url
 from utils.views import NextGameButtonView, SkipButtonView
 
@@ -42,13 +42,11 @@ class GamingCog(commands.Cog, name="Games"):
         async with ctx.typing(), self.bot.begin_db_session() as session:
             prefix = await self.utils.guild_prefix(ctx)
 
-            stmt = (
-                select(Song)
-                .where(Song.genre != "WORLD'S END")
-                .order_by(text("RANDOM()"))
-                .limit(1)
+            sampler = self.utils.sampler
+            (song_id,) = sampler.songs(
+                1, genres=[x for x in sampler.genres if x != "WORLD'S END"]
             )
-            song = (await session.execute(stmt)).scalar_one()
+            song = self.utils.references.songs[song_id]
 
             stmt = select(Alias).where(
                 (Alias.song_id == song.id)
@@ -66,6 +66,29 @@ class MiscCog(commands.Cog, name="Miscellaneous"):
 
         await ctx.send(f"Synced the tree to {ret}/{len(guilds)}.")
 
+    @commands.command("netstats", hidden=True)
+    @commands.is_owner()
+    async def netstats(self, ctx: Context):
+        limiter = self.utils.rate_limiter
+        metrics = limiter.metrics
+
+        await ctx.reply(
+            (
+                f"Rate limit: {limiter.rate}/s, burst {limiter.burst}\n"
+                f"Queued: {metrics.queue_depth} requests from {metrics.queued_users} users "
+                f"(max {metrics.max_queue_depth})\n"
+                f"Requests: {metrics.requests} ({metrics.delayed_requests} delayed)\n"
+                f"Wait time: {metrics.average_wait_time * 1000:.1f}ms average, "
+                f"{metrics.max_wait_time * 1000:.1f}ms max\n"
+                f"Response cache: {len(self.utils.responses)} pages, "
+                f"{self.utils.responses.size / 1024:.0f} KiB\n"
+                f"Parse memo: {len(self.utils.parse_memo)} pages, "
+                f"{self.utils.parse_memo.size / 1024:.0f} KiB, "
+                f"{self.utils.parse_memo.hit_rate:.0%} hit rate"
+            ),
+            mention_author=False,
+        )
+
     @commands.hybrid_command("source", aliases=["src"])
     async def source(self, ctx: Context):
         """Get the source code for this bot."""
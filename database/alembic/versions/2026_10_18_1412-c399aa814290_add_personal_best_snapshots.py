@@ -0,0 +1,53 @@
+"""Add personal best snapshots
+
+Revision ID: c399aa814290
+Revises: 4d22bfbbe8a9
+Create Date: 2026-10-18 14:12:37.104815
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c399aa814290"
+down_revision: Union[str, None] = "4d22bfbbe8a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "personal_bests",
+        sa.Column("discord_id", sa.BigInteger(), nullable=False),
+        sa.Column("song_id", sa.Integer(), nullable=False),
+        sa.Column("difficulty", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("clear_lamp", sa.Integer(), nullable=False),
+        sa.Column("combo_lamp", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("discord_id", "song_id", "difficulty"),
+    )
+
+    with op.batch_alter_table("personal_bests", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_personal_bests_discord_id_score", ["discord_id", "score"]
+        )
+
+    op.create_table(
+        "personal_best_snapshots",
+        sa.Column("discord_id", sa.BigInteger(), nullable=False),
+        sa.Column("last_play_date", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("discord_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("personal_best_snapshots")
+
+    with op.batch_alter_table("personal_bests", schema=None) as batch_op:
+        batch_op.drop_index("ix_personal_bests_discord_id_score")
+
+    op.drop_table("personal_bests")
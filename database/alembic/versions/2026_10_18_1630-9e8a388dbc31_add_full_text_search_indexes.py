@@ -0,0 +1,40 @@
+"""Add full-text search indexes
+
+Revision ID: 9e8a388dbc31
+Revises: c399aa814290
+Create Date: 2026-10-18 16:30:12.481203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from database.models import fts_ddl
+
+# revision identifiers, used by Alembic.
+revision: str = "9e8a388dbc31"
+down_revision: Union[str, None] = "c399aa814290"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("chunirec_songs_fts", "chunirec_songs", "id", ["title", "artist"]),
+    ("aliases_fts", "aliases", "rowid", ["alias"]),
+]
+
+
+def upgrade() -> None:
+    for name, source, rowid, columns in INDEXES:
+        for statement in fts_ddl(name, source, rowid, columns):
+            op.execute(statement)
+
+        # Index the rows that are already there.
+        op.execute(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    for name, _, _, _ in reversed(INDEXES):
+        for suffix in ("au", "ad", "ai"):
+            op.execute(f"DROP TRIGGER {name}_{suffix}")
+
+        op.execute(f"DROP TABLE {name}")
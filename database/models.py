@@ -1,15 +1,23 @@
+from datetime import datetime
 from typing import Optional
 
 from discord.ext import commands
 from rapidfuzz import fuzz
 from sqlalchemy import (
+    DDL,
     BigInteger,
     ColumnElement,
+    DateTime,
     Float,
     ForeignKey,
+    Index,
     String,
     UniqueConstraint,
+    column,
+    event,
     func,
+    select,
+    table,
     type_coerce,
 )
 from sqlalchemy.ext.asyncio import AsyncAttrs
@@ -188,3 +196,106 @@ class GuessScore(Base):
 
     discord_id: Mapped[int] = mapped_column(BigInteger(), primary_key=True)
     score: Mapped[int] = mapped_column(nullable=False)
+
+
+class PersonalBest(Base):
+    __tablename__ = "personal_bests"
+    __table_args__ = (
+        Index("ix_personal_bests_discord_id_score", "discord_id", "score"),
+    )
+
+    discord_id: Mapped[int] = mapped_column(BigInteger(), primary_key=True)
+    song_id: Mapped[int] = mapped_column(primary_key=True)
+    # Short form, same as `Chart.difficulty`.
+    difficulty: Mapped[str] = mapped_column(primary_key=True)
+
+    title: Mapped[str] = mapped_column(nullable=False)
+    score: Mapped[int] = mapped_column(nullable=False)
+    rank: Mapped[int] = mapped_column(nullable=False)
+    clear_lamp: Mapped[int] = mapped_column(nullable=False)
+    combo_lamp: Mapped[int] = mapped_column(nullable=False)
+
+
+class PersonalBestSnapshot(Base):
+    __tablename__ = "personal_best_snapshots"
+
+    discord_id: Mapped[int] = mapped_column(BigInteger(), primary_key=True)
+    # Last play date of the player when the snapshot was taken. The snapshot is
+    # out of date once the player has played again.
+    last_play_date: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
+
+
+# Full-text indexes over the text of songs and aliases, using the trigram
+# tokenizer so that any substring of 3 or more characters can be looked up. The
+# indexes don't store the text themselves, and are kept in sync with their tables
+# by triggers.
+songs_fts = table(
+    "chunirec_songs_fts", column("rowid"), column("title"), column("artist")
+)
+aliases_fts = table("aliases_fts", column("rowid"), column("alias"))
+
+# The trigram tokenizer can't match anything shorter.
+_FTS_MIN_LENGTH = 3
+
+
+def fts_ddl(name: str, source: str, rowid: str, columns: list[str]) -> list[str]:
+    """Statements creating the full-text index `name` over `columns` of the
+    table `source`, and the triggers keeping it in sync. Also used by the
+    migration adding the indexes, so both create the same schema."""
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{x}" for x in columns)
+    old_values = ", ".join(f"old.{x}" for x in columns)
+    delete = (
+        f"INSERT INTO {name}({name}, rowid, {names}) "
+        f"VALUES ('delete', old.{rowid}, {old_values});"
+    )
+    insert = f"INSERT INTO {name}(rowid, {names}) VALUES (new.{rowid}, {new_values});"
+
+    return [
+        f"CREATE VIRTUAL TABLE {name} USING fts5({names}, content='{source}', "
+        f"content_rowid='{rowid}', tokenize='trigram')",
+        f"CREATE TRIGGER {name}_ai AFTER INSERT ON {source} BEGIN {insert} END",
+        f"CREATE TRIGGER {name}_ad AFTER DELETE ON {source} BEGIN {delete} END",
+        f"CREATE TRIGGER {name}_au AFTER UPDATE OF {names} ON {source} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+for _statement in [
+    *fts_ddl("chunirec_songs_fts", "chunirec_songs", "id", ["title", "artist"]),
+    *fts_ddl("aliases_fts", "aliases", "rowid", ["alias"]),
+]:
+    event.listen(
+        Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
+
+
+def fts_phrase(text: str) -> str:
+    """Quotes text as a single FTS5 phrase, so none of it is read as syntax."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def song_title_equals(text: str) -> ColumnElement[bool]:
+    """Case-insensitive comparison of `Song.title` with `text`, looking up
+    candidates in the full-text index instead of lowercasing every title."""
+    condition = func.lower(Song.title) == func.lower(text)
+    if len(text) < _FTS_MIN_LENGTH:
+        return condition
+
+    candidates = select(songs_fts.c.rowid).where(
+        songs_fts.c.title.match(fts_phrase(text))
+    )
+    return Song.id.in_(candidates) & condition
+
+
+def alias_equals(text: str) -> ColumnElement[bool]:
+    """Case-insensitive comparison of `Alias.alias` with `text`, like
+    `song_title_equals`."""
+    condition = func.lower(Alias.alias) == func.lower(text)
+    if len(text) < _FTS_MIN_LENGTH:
+        return condition
+
+    candidates = select(aliases_fts.c.rowid).where(
+        aliases_fts.c.alias.match(fts_phrase(text))
+    )
+    return Alias.rowid.in_(candidates) & condition
@@ -0,0 +1,15 @@
+from types import ModuleType
+
+import pytest
+
+import chunithm_net
+from chunithm_net import load_parser_engine
+
+
+@pytest.fixture(params=["bs4", "lxml"])
+def parser_engine(request, monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    """Runs a test against every parser engine."""
+    engine = load_parser_engine(request.param)
+    monkeypatch.setattr(chunithm_net, "_engine", engine)
+
+    return engine
@@ -0,0 +1,54 @@
+import copy
+from decimal import Decimal
+from pathlib import Path
+from types import ModuleType
+
+from chunithm_net.models.batch import RecordBatch
+from chunithm_net.models.enums import Difficulty
+from chunithm_net.models.record import Record
+
+BASE_DIR = Path(__file__).parent
+
+
+def parse(engine: ModuleType, name: str, parser: str):
+    builder = engine.DocumentBuilder("utf-8")
+    builder.feed((BASE_DIR / "assets" / name).read_bytes())
+
+    return getattr(engine, parser)(builder.close())
+
+
+def test_batch_round_trips_records(parser_engine: ModuleType):
+    records = parse(
+        parser_engine, "music_record_by_level_folder.html", "parse_music_for_rating"
+    )
+    batch = RecordBatch(records)
+
+    assert len(batch) == len(records)
+    assert list(batch) == records
+    assert batch[-1] == records[-1]
+    assert batch[3:6] == records[3:6]
+    assert copy.deepcopy(batch) == batch
+
+
+def test_batch_sorts_and_filters():
+    batch = RecordBatch(
+        Record(
+            title=title,
+            difficulty=Difficulty.MASTER,
+            score=score,
+            play_rating=None if rating is None else Decimal(rating),
+        )
+        for title, score, rating in [
+            ("a", 1000000, "15.00"),
+            ("b", 1005000, "16.00"),
+            ("c", 990000, None),
+            ("d", 1007500, "16.00"),
+        ]
+    )
+
+    assert batch.argsort() == [3, 1, 0, 2]
+    assert [record.title for record in batch.sorted()] == ["d", "b", "a", "c"]
+
+    high_scores = batch.filter(score >= 1000000 for score in batch.scores)
+    assert high_scores.titles == ["a", "b", "d"]
+    assert high_scores[2].play_rating == Decimal("16.00")
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from chunithm_net._bs4 import BS4_FEATURE, IncrementalSoup
+
+BASE_DIR = Path(__file__).parent
+
+
+@pytest.mark.parametrize(
+    "asset", sorted(path.name for path in (BASE_DIR / "assets").glob("*.html"))
+)
+def test_incremental_soup_matches_full_parse(asset: str):
+    content = (BASE_DIR / "assets" / asset).read_bytes()
+
+    # An odd chunk size, so multi-byte characters are split between chunks.
+    soup = IncrementalSoup("utf-8")
+    for start in range(0, len(content), 777):
+        soup.feed(content[start : start + 777])
+
+    assert str(soup.close()) == str(BeautifulSoup(content, BS4_FEATURE))
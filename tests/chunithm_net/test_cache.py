@@ -0,0 +1,154 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from chunithm_net import DataVersion, ResponseCache
+
+
+class Fetcher:
+    def __init__(self, *values) -> None:
+        self.values = list(values)
+        self.calls = 0
+
+    async def __call__(self):
+        value = self.values[min(self.calls, len(self.values) - 1)]
+        self.calls += 1
+        return value
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_fresh_copies():
+    cache = ResponseCache()
+    fetch = Fetcher([{"score": 1010000}])
+
+    first = await cache.get_or_fetch(1, "best30", (), fetch)
+    first[0]["score"] = 0
+    second = await cache.get_or_fetch(1, "best30", (), fetch)
+
+    assert fetch.calls == 1
+    assert second == [{"score": 1010000}]
+
+    # Different users and parameters don't share entries.
+    await cache.get_or_fetch(2, "best30", (), fetch)
+    await cache.get_or_fetch(1, "music_record", (1,), fetch)
+    assert fetch.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_shares_concurrent_fetches():
+    cache = ResponseCache()
+    fetch = Fetcher("page")
+
+    results = await asyncio.gather(
+        *[cache.get_or_fetch(1, "best30", (), fetch) for _ in range(5)]
+    )
+
+    assert results == ["page"] * 5
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_stale_while_revalidate():
+    cache = ResponseCache(ttls={"best30": 0.01})
+    fetch = Fetcher("old", "new")
+    revalidated = asyncio.Queue()
+
+    await cache.get_or_fetch(1, "best30", (), fetch)
+    await asyncio.sleep(0.02)
+
+    # Without opting in, stale entries are fetched again.
+    assert await cache.get_or_fetch(1, "best30", (), fetch) == "new"
+
+    await asyncio.sleep(0.02)
+    fetch.values = ["newer"]
+
+    value = await cache.get_or_fetch(
+        1, "best30", (), fetch, on_revalidate=revalidated.put
+    )
+
+    assert value == "new"
+    assert len(cache.revalidations(1)) == 1
+    assert cache.revalidations(2) == []
+    assert await asyncio.wait_for(revalidated.get(), 1) == "newer"
+    assert await cache.get_or_fetch(1, "best30", (), fetch) == "newer"
+
+    await asyncio.sleep(0)
+    assert cache.revalidations(1) == []
+
+
+def identity(value):
+    return value
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidates_on_new_play():
+    cache = ResponseCache(ttls={"authenticate": 0})
+    played_at = datetime(2024, 1, 1)  # noqa: DTZ001
+
+    home = Fetcher(DataVersion(played_at), DataVersion(played_at + timedelta(hours=1)))
+    best30 = Fetcher(["before"], ["after"])
+
+    await cache.get_or_fetch(1, "authenticate", (), home, data_version=identity)
+    assert await cache.get_or_fetch(1, "best30", (), best30) == ["before"]
+
+    # Not played since, so the user's pages stay cached.
+    assert not cache.observe_data_version(1, DataVersion(played_at, 1000))
+    assert await cache.get_or_fetch(1, "best30", (), best30) == ["before"]
+
+    # The play count moved, so the user has played.
+    assert cache.observe_data_version(1, DataVersion(played_at, 1001))
+    assert await cache.get_or_fetch(1, "best30", (), best30) == ["after"]
+
+    best30.values = ["latest"]
+    await cache.get_or_fetch(1, "authenticate", (), home, data_version=identity)
+    assert await cache.get_or_fetch(1, "best30", (), best30) == "latest"
+
+
+@pytest.mark.asyncio
+async def test_cache_revalidates_versioned_pages():
+    cache = ResponseCache(ttls={"authenticate": 0, "music_record_by_folder": 0.01})
+    played_at = datetime(2024, 1, 1)  # noqa: DTZ001
+
+    home = Fetcher(
+        DataVersion(played_at),
+        DataVersion(played_at),
+        DataVersion(played_at + timedelta(hours=1)),
+    )
+    folder = Fetcher(["before"], ["after"])
+
+    async def check_version():
+        await cache.get_or_fetch(1, "authenticate", (), home, data_version=identity)
+
+    async def top():
+        return await cache.get_or_fetch(
+            1, "music_record_by_folder", ("14+",), folder, check_version=check_version
+        )
+
+    assert await top() == ["before"]
+    assert (home.calls, folder.calls) == (1, 1)
+
+    # Expired, but the player hasn't played since, so only the version is checked.
+    await asyncio.sleep(0.02)
+    assert await top() == ["before"]
+    assert (home.calls, folder.calls) == (2, 1)
+
+    await asyncio.sleep(0.02)
+    assert await top() == ["after"]
+    assert (home.calls, folder.calls) == (3, 2)
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded_in_bytes():
+    cache = ResponseCache(max_bytes=4096)
+
+    for idx in range(10):
+        await cache.get_or_fetch(1, "music_record", (idx,), Fetcher("x" * 1000))
+
+    assert 0 < len(cache) < 10
+    assert cache.size <= cache.max_bytes
+
+    # The most recently used entries are kept.
+    fetch = Fetcher("y")
+    assert await cache.get_or_fetch(1, "music_record", (9,), fetch) == "x" * 1000
+    assert fetch.calls == 0
@@ -1,13 +1,24 @@
+import asyncio
 from http.cookiejar import Cookie, LWPCookieJar
 import string
 from datetime import timedelta
 from pathlib import Path
 from random import choices
+from types import ModuleType
 
+import httpx
 import pytest
 from pytest_httpx import HTTPXMock
 
-from chunithm_net import ChuniNet
+from chunithm_net import (
+    _AUTHENTICATION_URL,
+    ChuniNet,
+    ParseMemo,
+    ParserPool,
+    RateLimiter,
+    ResponseCache,
+)
+from chunithm_net._transport import SharedTransport
 from chunithm_net.consts import _KEY_DETAILED_PARAMS, KEY_SONG_ID
 from chunithm_net.models.enums import (
     ClearType,
@@ -24,6 +35,8 @@ from chunithm_net.exceptions import (
 
 BASE_DIR = Path(__file__).parent
 
+pytestmark = pytest.mark.usefixtures("parser_engine")
+
 
 @pytest.fixture
 def clal():
@@ -776,6 +789,42 @@ async def test_client_parses_music_record_by_folder(
     assert records[0].combo_lamp == ComboType.NONE
 
 
+@pytest.mark.asyncio
+async def test_client_fetches_personal_bests(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+):
+    content = (BASE_DIR / "assets" / "music_record_by_level_folder.html").read_bytes()
+
+    for difficulty in ["Basic", "Advanced", "Expert", "Master", "Ultima"]:
+        httpx_mock.add_response(
+            method="POST",
+            url=f"https://chunithm-net-eng.com/mobile/record/musicGenre/send{difficulty}",
+            status_code=200,
+            content=content,
+        )
+    httpx_mock.add_response(
+        method="GET",
+        url="https://chunithm-net-eng.com/mobile/record/worldsEndList",
+        status_code=200,
+        content=content,
+    )
+
+    async with ChuniNet(jar) as client:
+        records = await client.personal_bests()
+
+    # One folder per difficulty. The WORLD'S END folder needs no selection, so
+    # it can be fetched alongside the others, which are still selected in order.
+    paths = [request.url.path for request in httpx_mock.get_requests()]
+    assert [path for path in paths if path != "/mobile/record/worldsEndList"] == [
+        f"/mobile/record/musicGenre/send{difficulty}"
+        for difficulty in ["Basic", "Advanced", "Expert", "Master", "Ultima"]
+    ]
+    assert paths.count("/mobile/record/worldsEndList") == 1
+    assert len(records) == 34 * 6
+    assert records[0].title == "ENDYMION"
+
+
 @pytest.mark.asyncio
 async def test_client_can_rename(
     httpx_mock: HTTPXMock,
@@ -796,3 +845,376 @@ async def test_client_can_rename(
 
     async with ChuniNet(jar) as client:
         assert await client.change_player_name("new name") is True
+
+
+@pytest.mark.asyncio
+async def test_clients_share_connection_pool(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+):
+    httpx_mock.add_response(
+        method="GET",
+        url="https://chunithm-net-eng.com/mobile/home/userOption/",
+        status_code=200,
+        headers={"Set-Cookie": "_t=abcdef; Path=/"},
+    )
+    httpx_mock.add_response(
+        method="GET",
+        url="https://chunithm-net-eng.com/mobile/home/userOption/",
+        status_code=200,
+    )
+
+    async with ChuniNet(jar) as first:
+        pool = SharedTransport.pool()
+        await first._request("GET", "/mobile/home/userOption/")
+
+    async with ChuniNet(LWPCookieJar()) as second:
+        assert SharedTransport.pool() is pool
+        await second._request("GET", "/mobile/home/userOption/")
+
+        assert first._token == "abcdef"
+        assert second._token is None
+
+
+@pytest.mark.asyncio
+async def test_client_shares_reauthentication(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+    clal: str,
+):
+    httpx_mock.add_response(
+        method="GET",
+        url="https://lng-tgk-aime-gw.am-all.net/common_auth/login?site_id=chuniex&redirect_url=https://chunithm-net-eng.com/mobile/&back_url=https://chunithm.sega.com/",
+        status_code=302,
+        headers={"Location": f"https://chunithm-net-eng.com/mobile/?ssid={clal}"},
+    )
+    httpx_mock.add_response(
+        method="GET",
+        url=f"https://chunithm-net-eng.com/mobile/?ssid={clal}",
+        status_code=302,
+        headers={"Location": "https://chunithm-net-eng.com/mobile/home/"},
+    )
+
+    with (BASE_DIR / "assets" / "logged_in_homepage.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/home/",
+            status_code=200,
+            content=f.read(),
+            headers={"Content-Type": "text/html; charset=UTF-8"},
+        )
+
+    async with ChuniNet(jar) as client:
+        assert client.session_expires_in is None
+
+        await asyncio.gather(*[client.refresh_session() for _ in range(5)])
+
+        assert client.session_expires_in is not None
+        assert not client.session_expires_soon(60)
+
+    assert len(httpx_mock.get_requests(url=_AUTHENTICATION_URL)) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_reauthenticates_expired_session_before_requesting(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+    clal: str,
+):
+    httpx_mock.add_response(
+        method="GET",
+        url="https://lng-tgk-aime-gw.am-all.net/common_auth/login?site_id=chuniex&redirect_url=https://chunithm-net-eng.com/mobile/&back_url=https://chunithm.sega.com/",
+        status_code=302,
+        headers={"Location": f"https://chunithm-net-eng.com/mobile/?ssid={clal}"},
+    )
+    httpx_mock.add_response(
+        method="GET",
+        url=f"https://chunithm-net-eng.com/mobile/?ssid={clal}",
+        status_code=302,
+        headers={"Location": "https://chunithm-net-eng.com/mobile/home/"},
+    )
+
+    with (BASE_DIR / "assets" / "logged_in_homepage.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/home/",
+            status_code=200,
+            content=f.read(),
+            headers={"Content-Type": "text/html; charset=UTF-8"},
+        )
+
+    async with ChuniNet(jar, session_lifetime=0) as client:
+        client.last_validated = 0
+        await client.authenticate()
+
+    # The authentication flow lands on the home page, so it isn't requested twice.
+    assert len(httpx_mock.get_requests()) == 3
+
+
+@pytest.mark.asyncio
+async def test_client_uses_response_cache(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+):
+    with (BASE_DIR / "assets" / "best30.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/home/playerData/ratingDetailBest/",
+            status_code=200,
+            content=f.read(),
+        )
+
+    with (BASE_DIR / "assets" / "logged_in_homepage.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/home/",
+            status_code=200,
+            content=f.read(),
+        )
+
+    cache = ResponseCache()
+
+    async with ChuniNet(jar, cache=cache, user_key=1) as client:
+        first = await client.best30()
+
+    async with ChuniNet(jar, cache=cache, user_key=1) as client:
+        second = await client.best30()
+
+    assert first == second
+
+    # The data version is checked on the home page before the first fetch.
+    assert [request.url.path for request in httpx_mock.get_requests()] == [
+        "/mobile/home/",
+        "/mobile/home/playerData/ratingDetailBest/",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_client_fetches_many_music_records(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+):
+    # A transient error, which should be retried.
+    httpx_mock.add_exception(
+        httpx.ReadTimeout("Timed out"),
+        method="POST",
+        url="https://chunithm-net-eng.com/mobile/record/musicGenre/sendMusicDetail/",
+    )
+    httpx_mock.add_response(
+        method="POST",
+        url="https://chunithm-net-eng.com/mobile/record/musicGenre/sendMusicDetail/",
+        status_code=302,
+        headers={"Location": "https://chunithm-net-eng.com/mobile/record/musicDetail/"},
+    )
+    httpx_mock.add_response(
+        method="POST",
+        url="https://chunithm-net-eng.com/mobile/record/worldsEndList/sendWorldsEndDetail/",
+        status_code=302,
+        headers={
+            "Location": "https://chunithm-net-eng.com/mobile/record/worldsEndDetail/"
+        },
+    )
+
+    with (BASE_DIR / "assets" / "music_record.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/record/musicDetail/",
+            status_code=200,
+            content=f.read(),
+        )
+
+    with (BASE_DIR / "assets" / "worlds_end_music_record.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/record/worldsEndDetail/",
+            status_code=200,
+            content=f.read(),
+        )
+
+    async with ChuniNet(jar) as client:
+        results = {
+            idx: records
+            async for idx, records in client.music_record_many(
+                [428, 8218, 428], concurrency=2
+            )
+        }
+
+    assert results.keys() == {428, 8218}
+
+    assert [record.title for record in results[428]] == ["Aleph-0", "Aleph-0"]
+    assert [record.title for record in results[8218]] == ["BLUE ZONE"]
+    assert results[8218][0].difficulty == Difficulty.WORLDS_END
+
+
+@pytest.mark.asyncio
+async def test_client_selects_songs_one_at_a_time(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+):
+    with (BASE_DIR / "assets" / "music_record.html").open("rb") as f:
+        content = f.read()
+
+    requests: list[str] = []
+
+    async def select_song(request: httpx.Request) -> httpx.Response:
+        requests.append("select")
+        # Give the other request a chance to select its song in the meantime.
+        await asyncio.sleep(0.01)
+        return httpx.Response(
+            status_code=302,
+            headers={"Location": "https://chunithm-net-eng.com/mobile/record/musicDetail/"},
+        )
+
+    async def song_detail(request: httpx.Request) -> httpx.Response:
+        requests.append("detail")
+        return httpx.Response(status_code=200, content=content)
+
+    httpx_mock.add_callback(
+        select_song,
+        method="POST",
+        url="https://chunithm-net-eng.com/mobile/record/musicGenre/sendMusicDetail/",
+    )
+    httpx_mock.add_callback(
+        song_detail,
+        method="GET",
+        url="https://chunithm-net-eng.com/mobile/record/musicDetail/",
+    )
+
+    async with ChuniNet(jar) as client:
+        await asyncio.gather(client.music_record(428), client.music_record(429))
+
+    assert requests == ["select", "detail", "select", "detail"]
+
+
+@pytest.mark.asyncio
+async def test_client_requests_go_through_rate_limiter(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+):
+    httpx_mock.add_response(
+        method="GET",
+        url="https://chunithm-net-eng.com/mobile/home/",
+        status_code=302,
+        headers={"Location": "https://chunithm-net-eng.com/mobile/"},
+    )
+
+    with (BASE_DIR / "assets" / "logged_in_homepage.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/",
+            status_code=200,
+            content=f.read(),
+        )
+
+    limiter = RateLimiter(100, burst=10)
+
+    async with ChuniNet(jar, rate_limiter=limiter, user_key=1) as client:
+        await client.session.get("https://chunithm-net-eng.com/mobile/home/")
+
+    # Redirects count as separate requests.
+    assert limiter.metrics.requests == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["thread", "process"])
+async def test_client_parses_on_parser_pool(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+    mode: str,
+):
+    with (BASE_DIR / "assets" / "best30.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/home/playerData/ratingDetailBest/",
+            status_code=200,
+            content=f.read(),
+        )
+
+    async with ChuniNet(jar) as client:
+        expected = await client.best30()
+
+    pool = ParserPool(mode, max_workers=1, inline_threshold=0)
+
+    try:
+        async with ChuniNet(jar, parser_pool=pool) as client:
+            records = await client.best30()
+    finally:
+        pool.close()
+
+    # Records from another process are still keyed by the same extras keys.
+    assert records == expected
+    assert records[0].extras[KEY_SONG_ID] == expected[0].extras[KEY_SONG_ID]
+
+
+@pytest.mark.asyncio
+async def test_client_memoizes_parsed_pages(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+    parser_engine: ModuleType,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    with (BASE_DIR / "assets" / "best30.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/home/playerData/ratingDetailBest/",
+            status_code=200,
+            content=f.read(),
+        )
+
+    memo = ParseMemo()
+    builders = []
+    document_builder = parser_engine.DocumentBuilder
+
+    def build(encoding: str):
+        builders.append(document_builder(encoding))
+        return builders[-1]
+
+    monkeypatch.setattr(parser_engine, "DocumentBuilder", build)
+
+    async with ChuniNet(jar, parse_memo=memo) as client:
+        first = await client.best30()
+        second = await client.best30()
+
+    # Both requests are sent, but the identical page is only parsed once, and
+    # no document is built for the memo hit.
+    assert len(httpx_mock.get_requests()) == 2
+    assert (memo.hits, memo.misses) == (1, 1)
+    assert len(builders) == 1
+    assert first == second
+
+
+@pytest.mark.asyncio
+async def test_client_streams_small_pages_with_parser_pool(
+    httpx_mock: HTTPXMock,
+    jar: LWPCookieJar,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    with (BASE_DIR / "assets" / "best30.html").open("rb") as f:
+        httpx_mock.add_response(
+            method="GET",
+            url="https://chunithm-net-eng.com/mobile/home/playerData/ratingDetailBest/",
+            status_code=200,
+            content=f.read(),
+        )
+
+    async with ChuniNet(jar) as client:
+        expected = await client.best30()
+
+    pool = ParserPool("thread", max_workers=1, inline_threshold=1024 * 1024)
+    memo = ParseMemo()
+
+    async def parse(*args):
+        msg = "Small pages must not be handed off to the pool"
+        raise AssertionError(msg)
+
+    monkeypatch.setattr(pool, "parse", parse)
+
+    try:
+        async with ChuniNet(jar, parser_pool=pool, parse_memo=memo) as client:
+            first = await client.best30()
+            second = await client.best30()
+    finally:
+        pool.close()
+
+    assert first == second == expected
+    assert (memo.hits, memo.misses) == (1, 1)
@@ -0,0 +1,73 @@
+import pytest
+
+from chunithm_net import ParseMemo
+
+
+class Parser:
+    def __init__(self, value) -> None:
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_memo_skips_parsing_identical_pages():
+    memo = ParseMemo()
+    parse = Parser([{"score": 1010000}])
+
+    first = await memo.get_or_parse("engine", "parse", b"page", "utf-8", (), parse)
+    first[0]["score"] = 0
+    second = await memo.get_or_parse("engine", "parse", b"page", "utf-8", (), parse)
+
+    assert parse.calls == 1
+    assert second == [{"score": 1010000}]
+
+    # Different pages, parsers and parser arguments don't share entries.
+    await memo.get_or_parse("engine", "parse", b"other page", "utf-8", (), parse)
+    await memo.get_or_parse("engine", "parse_other", b"page", "utf-8", (), parse)
+    await memo.get_or_parse("engine", "parse", b"page", "utf-8", (1,), parse)
+
+    assert parse.calls == 4
+    assert (memo.hits, memo.misses) == (1, 4)
+    assert memo.hit_rate == 0.2
+
+
+@pytest.mark.asyncio
+async def test_memo_is_bounded_in_bytes():
+    memo = ParseMemo(max_bytes=4096)
+
+    for idx in range(10):
+        await memo.get_or_parse(
+            "engine", "parse", str(idx).encode(), "utf-8", (), Parser("x" * 1000)
+        )
+
+    assert 0 < len(memo) < 10
+    assert memo.size <= memo.max_bytes
+
+    # The most recently used entries are kept.
+    parse = Parser("y")
+    assert await memo.get_or_parse("engine", "parse", b"9", "utf-8", (), parse) == (
+        "x" * 1000
+    )
+    assert parse.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_memo_shares_results_on_request():
+    memo = ParseMemo()
+    parse = Parser([{"score": 1010000}])
+
+    first = await memo.get_or_parse(
+        "engine", "parse", b"digest", "utf-8", (), parse, shared=True
+    )
+    second = await memo.get_or_parse(
+        "engine", "parse", b"digest", "utf-8", (), parse, shared=True
+    )
+    copied = await memo.get_or_parse("engine", "parse", b"digest", "utf-8", (), parse)
+
+    assert first is second
+    assert copied == first
+    assert copied is not first
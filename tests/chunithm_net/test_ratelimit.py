@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from chunithm_net import RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_allows_bursts():
+    limiter = RateLimiter(1, burst=3)
+
+    await asyncio.wait_for(
+        asyncio.gather(*[limiter.acquire(1) for _ in range(3)]), 0.1
+    )
+
+    assert limiter.metrics.requests == 3
+    assert limiter.metrics.delayed_requests == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_is_fair_between_users():
+    limiter = RateLimiter(200, burst=1)
+    order = []
+
+    async def request(user):
+        await limiter.acquire(user)
+        order.append(user)
+
+    await limiter.acquire("heavy")
+
+    # A user queueing a big batch of requests shouldn't starve the others.
+    await asyncio.gather(
+        *[request("heavy") for _ in range(6)],
+        *[request("light") for _ in range(2)],
+    )
+
+    assert order[:4] == ["heavy", "light", "heavy", "light"]
+    assert limiter.metrics.max_queue_depth == 8
+    assert limiter.metrics.queue_depth == 0
+    assert limiter.metrics.delayed_requests == 8
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_weights():
+    limiter = RateLimiter(200, burst=1, weights={"owner": 2})
+    order = []
+
+    async def request(user):
+        await limiter.acquire(user)
+        order.append(user)
+
+    await limiter.acquire("owner")
+    await asyncio.gather(
+        *[request("owner") for _ in range(4)],
+        *[request("user") for _ in range(2)],
+    )
+
+    assert order == ["owner", "owner", "user", "owner", "owner", "user"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_skips_cancelled_requests():
+    limiter = RateLimiter(50, burst=1)
+    await limiter.acquire(1)
+
+    cancelled = asyncio.create_task(limiter.acquire(1))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await asyncio.wait_for(limiter.acquire(2), 0.1)
+
+    assert cancelled.cancelled()
+    assert limiter.metrics.queue_depth == 0
@@ -0,0 +1,57 @@
+import copy
+import pickle
+from datetime import datetime
+from decimal import Decimal
+
+from chunithm_net.consts import _KEY_DETAILED_PARAMS, KEY_PLAY_RATING, KEY_SONG_ID
+from chunithm_net.models.enums import Difficulty
+from chunithm_net.models.record import (
+    DetailedParams,
+    DetailedRecentRecord,
+    RecentRecord,
+    Record,
+)
+
+
+def test_record_extras_are_stored_in_slots():
+    record = Record(title="Aleph-0", difficulty=Difficulty.MASTER, score=1010000)
+
+    assert not hasattr(record, "__dict__")
+    assert record.extras.get(KEY_SONG_ID) is None
+    assert KEY_SONG_ID not in record.extras
+
+    record.extras[KEY_SONG_ID] = 428
+    record.play_rating = Decimal("17.10")
+
+    assert record.song_id == 428
+    assert record.extras[KEY_PLAY_RATING] == Decimal("17.10")
+    assert dict(record.extras) == {KEY_SONG_ID: 428, KEY_PLAY_RATING: Decimal("17.10")}
+
+    # Extras without a slot are kept on the side.
+    assert record._extras is None
+    record.extras[_KEY_DETAILED_PARAMS] = DetailedParams(1, "token")
+    assert record.extras[_KEY_DETAILED_PARAMS] == DetailedParams(1, "token")
+
+    del record.extras[KEY_SONG_ID]
+    assert record.song_id is None
+    assert len(record.extras) == 2
+
+
+def test_record_copies_keep_extras():
+    record = RecentRecord(
+        title="Aleph-0",
+        difficulty=Difficulty.MASTER,
+        score=1010000,
+        track=1,
+        date=datetime(2024, 1, 1),  # noqa: DTZ001
+        new_record=False,
+        song_id=428,
+    )
+    record.extras[_KEY_DETAILED_PARAMS] = DetailedParams(1, "token")
+
+    assert copy.deepcopy(record) == record
+    assert pickle.loads(pickle.dumps(record)) == record
+
+    detailed = DetailedRecentRecord.from_basic(record)
+    assert detailed.extras[KEY_SONG_ID] == 428
+    assert detailed.extras[_KEY_DETAILED_PARAMS] == DetailedParams(1, "token")
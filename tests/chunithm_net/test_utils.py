@@ -1,10 +1,9 @@
-import importlib.util
+from types import ModuleType
 
 import pytest
-from bs4 import BeautifulSoup
 
 from chunithm_net.models.enums import ClearType, ComboType, Difficulty, Rank
-from chunithm_net.utils import difficulty_from_imgurl, get_rank_and_lamps
+from chunithm_net.utils import difficulty_from_imgurl
 
 
 @pytest.mark.parametrize(
@@ -117,10 +116,10 @@ from chunithm_net.utils import difficulty_from_imgurl, get_rank_and_lamps
         ),
     ],
 )
-def test_get_rank_and_cleartype(html, expected):
-    bs4_features = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
-    soup = BeautifulSoup(html, bs4_features)
-    assert get_rank_and_lamps(soup) == expected
+def test_get_rank_and_cleartype(parser_engine: ModuleType, html, expected):
+    builder = parser_engine.DocumentBuilder("utf-8")
+    builder.feed(html.encode())
+    assert parser_engine.get_rank_and_lamps(builder.close()) == expected
 
 
 @pytest.mark.parametrize(
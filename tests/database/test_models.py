@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.models import Alias, Base, Song, alias_equals, song_title_equals
+
+
+@pytest.mark.asyncio
+async def test_full_text_index_follows_table_changes():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    begin_db_session = async_sessionmaker(engine, expire_on_commit=False)
+    async with begin_db_session() as session, session.begin():
+        session.add_all(
+            [
+                Song(
+                    id=1,
+                    title="Titania",
+                    chunithm_catcode=0,
+                    genre="POPS & ANIME",
+                    artist="artist",
+                    version="CHUNITHM",
+                    jacket="1.webp",
+                    available=True,
+                    removed=False,
+                ),
+                Alias(alias="tritania", guild_id=-1, song_id=1),
+                Alias(alias='"x"', guild_id=-1, song_id=1),
+            ]
+        )
+
+    async def songs(title: str) -> list[int]:
+        stmt = select(Song.id).where(song_title_equals(title))
+        return list((await session.execute(stmt)).scalars())
+
+    async def aliases(alias: str) -> list[str]:
+        stmt = select(Alias.alias).where(alias_equals(alias))
+        return list((await session.execute(stmt)).scalars())
+
+    async with begin_db_session() as session:
+        assert await songs("TITANIA") == [1]
+        # Substrings are only candidates, they don't match.
+        assert await songs("Titan") == []
+        assert await aliases("Tritania") == ["tritania"]
+        # Shorter than a trigram, and full of FTS5 syntax.
+        assert await aliases('"x"') == ['"x"']
+        assert await aliases('"') == []
+
+        song = await session.get(Song, 1)
+        assert song is not None
+        song.title = "Prayer"
+        await session.commit()
+
+        assert await songs("Titania") == []
+        assert await songs("prayer") == [1]
+
+        await session.delete(song)
+        await session.commit()
+        assert await songs("prayer") == []
+
+    await engine.dispose()
@@ -0,0 +1,83 @@
+import random
+from decimal import Decimal
+
+from chunithm_net.models.enums import ComboType, Difficulty
+from chunithm_net.models.record import Record
+from utils.calculation.breakdown import calculate_overpower_breakdown
+from utils.calculation.overpower import (
+    calculate_overpower_base,
+    calculate_overpower_max,
+    calculate_play_overpower,
+)
+
+
+def test_breakdown_matches_per_record_overpower():
+    rng = random.Random(0)
+
+    charts = [
+        (song_id, difficulty)
+        for song_id in range(1_000)
+        for difficulty in (Difficulty.EXPERT, Difficulty.MASTER)
+    ]
+    internal_levels = [rng.randint(70, 155) / 10 for _ in charts]
+    genres = [f"genre {song_id % 7}" for song_id, _ in charts]
+    versions = [f"version {song_id % 13}" for song_id, _ in charts]
+
+    records = []
+    for (song_id, difficulty), internal_level in zip(charts, internal_levels):
+        # Leave some charts unplayed.
+        if rng.random() < 0.3:
+            continue
+
+        score = rng.choice([rng.randint(0, 1_010_000), 1_010_000])
+        record = Record(
+            title=str(song_id),
+            difficulty=difficulty,
+            score=score,
+            combo_lamp=rng.choice(list(ComboType)),
+            song_id=song_id,
+        )
+        record.overpower_base = calculate_overpower_base(score, internal_level)
+        record.overpower_max = calculate_overpower_max(internal_level)
+        records.append(record)
+
+    breakdown = calculate_overpower_breakdown(
+        charts, internal_levels, genres, versions, records
+    )
+
+    assert breakdown.total.value == sum(
+        (calculate_play_overpower(record) for record in records), Decimal(0)
+    )
+    assert breakdown.total.max == sum(
+        calculate_overpower_max(internal_level) for internal_level in internal_levels
+    )
+
+    master = breakdown.difficulties[Difficulty.MASTER]
+    assert master.value == sum(
+        (
+            calculate_play_overpower(record)
+            for record in records
+            if record.difficulty == Difficulty.MASTER
+        ),
+        Decimal(0),
+    )
+    assert sum(total.max for total in breakdown.genres.values()) == (
+        breakdown.total.max
+    )
+    assert len(breakdown.versions) == 13
+
+
+def test_breakdown_counts_unplayed_charts():
+    breakdown = calculate_overpower_breakdown(
+        [(1, Difficulty.MASTER), (2, Difficulty.MASTER)],
+        [14.0, 15.0],
+        ["ORIGINAL", "VARIETY"],
+        ["NEW", "NEW"],
+        [Record(title="", difficulty=Difficulty.MASTER, score=1_010_000, song_id=1)],
+    )
+
+    assert breakdown.total.value == Decimal(85)
+    assert breakdown.total.max == Decimal(85 + 90)
+    assert breakdown.genres["VARIETY"].value == 0
+    assert breakdown.genres["VARIETY"].progress == 0
+    assert breakdown.genres["ORIGINAL"].progress == 1
@@ -0,0 +1,118 @@
+import pytest
+
+from utils.calculation.fixed_point import (
+    calculate_overpower_bases,
+    calculate_overpower_maxes,
+    calculate_ratings,
+    level_to_fixed,
+)
+from utils.calculation.overpower import (
+    calculate_overpower_base,
+    calculate_overpower_max,
+)
+from utils.calculation.rating import calculate_rating
+
+CHART_CONSTANTS = [c / 10 for c in range(161)]
+
+CUTOFFS = [
+    500_000,
+    800_000,
+    900_000,
+    975_000,
+    1_000_000,
+    1_005_000,
+    1_007_500,
+    1_009_000,
+    1_010_000,
+]
+
+# Every branch of the rating curve, sampled, and a few scores around every cutoff.
+SCORES = sorted(
+    {
+        *range(0, 1_010_001, 2_017),
+        *(
+            score
+            for cutoff in CUTOFFS
+            for score in range(cutoff - 5, min(cutoff + 6, 1_010_001))
+        ),
+    }
+)
+
+# The first and last score of every piece of the curves, and the scores just
+# outside of it, where an off-by-one in a piece would show.
+PIECE_BOUNDARIES = sorted(
+    score
+    for cutoff in [0, *CUTOFFS]
+    for score in (cutoff - 1, cutoff, cutoff + 1)
+    if 0 <= score <= 1_010_000
+)
+
+
+def assert_identical(actual, expected):
+    assert actual == expected
+    assert [str(x) for x in actual] == [str(x) for x in expected]
+
+
+# Chart constants with 2 decimal places keep more trailing zeros.
+@pytest.mark.parametrize("chart_constant", [None, 0, *CHART_CONSTANTS, 4.75, 14.25])
+def test_batch_ratings_match_decimal(chart_constant):
+    chart_constants = [chart_constant] * len(SCORES)
+
+    assert_identical(
+        calculate_ratings(SCORES, chart_constants),
+        [calculate_rating(score, chart_constant) for score in SCORES],
+    )
+
+
+@pytest.mark.parametrize("chart_constant", CHART_CONSTANTS[1:])
+def test_batch_overpower_matches_decimal(chart_constant):
+    chart_constants = [chart_constant] * len(SCORES)
+
+    assert_identical(
+        calculate_overpower_bases(SCORES, chart_constants),
+        [calculate_overpower_base(score, chart_constant) for score in SCORES],
+    )
+    assert_identical(
+        calculate_overpower_maxes(chart_constants),
+        [calculate_overpower_max(chart_constant)] * len(SCORES),
+    )
+
+
+# Between 900,000 and 975,000 the Decimal calculation rounds twice. Where the
+# second rounding happens depends on how many digits the level takes up, so check
+# every score there for a level of every length, positive and negative.
+@pytest.mark.parametrize("chart_constant", [0.0, 4.9, 5.0, 15.9])
+def test_batch_ratings_match_decimal_when_rounding_twice(chart_constant):
+    scores = range(900_000, 975_000)
+
+    assert_identical(
+        calculate_ratings(scores, [chart_constant] * len(scores)),
+        [calculate_rating(score, chart_constant) for score in scores],
+    )
+
+
+@pytest.mark.parametrize("chart_constant", CHART_CONSTANTS)
+def test_batch_matches_decimal_at_piece_boundaries(chart_constant):
+    chart_constants = [chart_constant] * len(PIECE_BOUNDARIES)
+
+    assert_identical(
+        calculate_ratings(PIECE_BOUNDARIES, chart_constants),
+        [calculate_rating(score, chart_constant) for score in PIECE_BOUNDARIES],
+    )
+
+    if chart_constant > 0:
+        assert_identical(
+            calculate_overpower_bases(PIECE_BOUNDARIES, chart_constants),
+            [
+                calculate_overpower_base(score, chart_constant)
+                for score in PIECE_BOUNDARIES
+            ],
+        )
+
+
+def test_batch_falls_back_to_decimal():
+    # Too many decimal places to be stored as fixed point.
+    assert level_to_fixed(14.12345) is None
+    assert calculate_ratings([1_005_000], [14.12345]) == [
+        calculate_rating(1_005_000, 14.12345)
+    ]
@@ -0,0 +1,119 @@
+import random
+from decimal import Decimal
+
+from chunithm_net.models.enums import Difficulty, Rank
+from chunithm_net.models.record import Record
+from utils.calculation.optimizer import rank_rating_improvements
+from utils.calculation.rating import calculate_rating
+
+
+def _record(song_id: int, score: int) -> Record:
+    return Record(
+        title=str(song_id),
+        difficulty=Difficulty.MASTER,
+        score=score,
+        song_id=song_id,
+    )
+
+
+def test_improvements_beat_the_rating_they_replace():
+    rng = random.Random(0)
+
+    charts = [(song_id, Difficulty.MASTER) for song_id in range(200)]
+    internal_levels = [rng.randint(100, 155) / 10 for _ in charts]
+
+    personal_bests = [
+        _record(song_id, rng.randint(800_000, 1_009_500))
+        for song_id, _ in charts
+        # Leave some charts unplayed.
+        if rng.random() < 0.8
+    ]
+    ratings = {
+        record.song_id: calculate_rating(record.score, internal_levels[record.song_id])
+        for record in personal_bests
+    }
+    best30 = sorted(
+        personal_bests, key=lambda record: ratings[record.song_id], reverse=True
+    )[:30]
+    lowest = min(ratings[record.song_id] for record in best30)
+    best30_ids = {record.song_id for record in best30}
+    scores = {record.song_id: record.score for record in personal_bests}
+
+    improvements = rank_rating_improvements(
+        charts, internal_levels, best30, personal_bests, count=len(charts)
+    )
+    assert len(improvements) > 0
+
+    efficiencies = []
+    for improvement in improvements:
+        internal_level = internal_levels[improvement.song_id]
+        if improvement.song_id in best30_ids:
+            baseline = ratings[improvement.song_id]
+        else:
+            baseline = lowest
+
+        assert improvement.score == scores.get(improvement.song_id, 0)
+        assert calculate_rating(improvement.minimum_score, internal_level) > baseline
+        assert (
+            calculate_rating(improvement.minimum_score - 1, internal_level)
+            <= baseline
+            or improvement.minimum_score - 1 < improvement.score
+        )
+        assert improvement.target_score >= improvement.minimum_score
+        assert improvement.target_score in {rank.min_score for rank in Rank}
+        assert improvement.rating_gain > 0
+
+        efficiencies.append(
+            improvement.rating_gain / (improvement.target_score - improvement.score)
+        )
+
+    # Rating gains are rounded, so equally efficient charts may differ slightly.
+    for a, b in zip(efficiencies, efficiencies[1:]):
+        assert a >= b - Decimal("1e-20")
+
+
+def test_unplayed_charts_are_improvements_when_best30_is_not_full():
+    charts = [(0, Difficulty.MASTER), (1, Difficulty.MASTER)]
+    internal_levels = [13.0, 14.0]
+    personal_bests = [_record(0, 1_000_000)]
+
+    improvements = rank_rating_improvements(
+        charts, internal_levels, personal_bests, personal_bests
+    )
+
+    unplayed = next(x for x in improvements if x.song_id == 1)
+    assert unplayed.score == 0
+    assert calculate_rating(unplayed.minimum_score, 14.0) > 0
+    assert calculate_rating(unplayed.minimum_score - 1, 14.0) <= 0
+    assert unplayed.target_score == Rank.B.min_score
+
+
+def test_lowest_rating_counts_charts_that_cannot_be_improved():
+    charts = [(song_id, Difficulty.MASTER) for song_id in range(30)]
+    internal_levels = [14.0] * 30
+    personal_bests = [_record(song_id, 1_000_000) for song_id in range(29)]
+
+    # A removed song, which is no longer among the charts, completes the best 30
+    # with its lowest rating.
+    removed = _record(1000, 1_000_000)
+    removed.internal_level = 12.0
+    best30 = [*personal_bests, removed]
+    lowest = calculate_rating(1_000_000, 12.0)
+
+    improvements = rank_rating_improvements(
+        charts, internal_levels, best30, personal_bests, count=len(charts)
+    )
+
+    # The unplayed chart has to beat the removed song to enter the best 30.
+    unplayed = next(x for x in improvements if x.song_id == 29)
+    assert calculate_rating(unplayed.minimum_score, 14.0) > lowest
+    assert calculate_rating(unplayed.minimum_score - 1, 14.0) <= lowest
+
+
+def test_maxed_charts_are_left_out():
+    charts = [(0, Difficulty.MASTER)]
+    personal_bests = [_record(0, 1_010_000)]
+
+    assert (
+        rank_rating_improvements(charts, [14.0], personal_bests, personal_bests) == []
+    )
@@ -0,0 +1,87 @@
+from decimal import Decimal
+
+import pytest
+
+from utils.calculation import overpower, rating
+from utils.calculation.tables import (
+    calculate_overpower_base,
+    calculate_overpower_max,
+    calculate_rating,
+    calculate_score_for_rating,
+)
+
+from .test_fixed_point import CHART_CONSTANTS, PIECE_BOUNDARIES, SCORES
+
+
+@pytest.mark.parametrize("chart_constant", [None, *CHART_CONSTANTS, 14.55])
+def test_table_ratings_match_decimal(chart_constant):
+    assert [str(calculate_rating(score, chart_constant)) for score in SCORES] == [
+        str(rating.calculate_rating(score, chart_constant)) for score in SCORES
+    ]
+
+
+@pytest.mark.parametrize("chart_constant", [*CHART_CONSTANTS[1:], 14.55])
+def test_table_overpower_matches_decimal(chart_constant):
+    assert [
+        str(calculate_overpower_base(score, chart_constant)) for score in SCORES
+    ] == [
+        str(overpower.calculate_overpower_base(score, chart_constant))
+        for score in SCORES
+    ]
+    assert calculate_overpower_max(chart_constant) == (
+        overpower.calculate_overpower_max(chart_constant)
+    )
+
+
+@pytest.mark.parametrize("chart_constant", CHART_CONSTANTS)
+def test_tables_match_decimal_at_piece_boundaries(chart_constant):
+    assert [
+        str(calculate_rating(score, chart_constant)) for score in PIECE_BOUNDARIES
+    ] == [
+        str(rating.calculate_rating(score, chart_constant))
+        for score in PIECE_BOUNDARIES
+    ]
+
+    if chart_constant > 0:
+        assert [
+            str(calculate_overpower_base(score, chart_constant))
+            for score in PIECE_BOUNDARIES
+        ] == [
+            str(overpower.calculate_overpower_base(score, chart_constant))
+            for score in PIECE_BOUNDARIES
+        ]
+
+
+@pytest.mark.parametrize("chart_constant", [1.0, 4.5, 5.0, 10.3, 14.5, 14.55, 16.0])
+def test_score_for_rating_is_lowest_reaching_it(chart_constant):
+    for target in (x / 100 for x in range(1, 1_820, 3)):
+        score = calculate_score_for_rating(target, chart_constant)
+
+        if score is None:
+            assert rating.calculate_rating(1_010_000, chart_constant) < Decimal(
+                str(target)
+            )
+        else:
+            assert rating.calculate_rating(score, chart_constant) >= Decimal(
+                str(target)
+            )
+            assert rating.calculate_rating(score - 1, chart_constant) < Decimal(
+                str(target)
+            )
+
+
+@pytest.mark.parametrize(
+    ("target", "chart_constant", "expected"),
+    [
+        (16.65, 14.5, 1_009_000),
+        (15.5, 14.5, 1_000_000),
+        (14.5, 14.5, 975_000),
+        # Below 975,000.
+        (12.5, 14.5, 945_000),
+        (9.5, 14.5, 900_000),
+        (0, 14.5, 0),
+        (16.66, 14.5, None),
+    ],
+)
+def test_score_for_rating(target, chart_constant, expected):
+    assert calculate_score_for_rating(target, chart_constant) == expected
@@ -0,0 +1,120 @@
+import random
+import string
+
+from rapidfuzz import fuzz, process
+
+from utils.aliases import AliasIndex, CachedAlias
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_letters, k=rng.randint(3, 12)))
+
+
+def linear_search(
+    aliases: list[CachedAlias], query: str, guild_id: int
+) -> tuple[CachedAlias, float]:
+    candidates = [x for x in aliases if x.guild_id in {-1, guild_id}]
+    _, similarity, index = process.extractOne(
+        query,
+        [x.alias for x in candidates],
+        scorer=fuzz.QRatio,
+        processor=str.lower,
+    )
+    return candidates[index], similarity
+
+
+def test_alias_index_matches_linear_search():
+    rng = random.Random(0)
+    aliases = [
+        CachedAlias(
+            None if i % 3 == 0 else i,
+            random_word(rng),
+            f"song {i // 3}",
+            i // 3,
+            rng.choice([-1, -1, 1, 2]),
+        )
+        for i in range(1_000)
+    ]
+    index = AliasIndex(aliases)
+
+    for _ in range(200):
+        query = random_word(rng)
+        guild_id = rng.choice([1, 2, 3])
+
+        result = index.search(query, guild_id=guild_id)
+        assert result is not None
+
+        alias, similarity = result
+        expected_alias, expected_similarity = linear_search(aliases, query, guild_id)
+        assert similarity == expected_similarity
+        assert alias.guild_id in {-1, guild_id}
+        assert fuzz.QRatio(query, alias.alias, processor=str.lower) == similarity
+
+
+def test_alias_index_updates_in_place():
+    index = AliasIndex(
+        [
+            CachedAlias(None, "Titania", "Titania", 1, -1),
+            CachedAlias(1, "tritania", "Titania", 1, 100),
+            CachedAlias(2, "prayer", "祈", 2, 100),
+        ]
+    )
+
+    assert index.search("prayer", guild_id=100)[0].song_id == 2  # type: ignore[index]
+    assert index.search("prayer", guild_id=200)[0].song_id == 1  # type: ignore[index]
+
+    index.add(CachedAlias(3, "prayer", "祈", 2, -1))
+    assert index.search("prayer", guild_id=200)[0].id == 3  # type: ignore[index]
+
+    index.remove(2)
+    index.remove(3)
+    # Removing an alias twice does nothing.
+    index.remove(3)
+    assert len(index) == 2
+    assert index.search("tritania", guild_id=100)[0].id == 1  # type: ignore[index]
+    assert index.search("prayer", guild_id=100)[0].song_id == 1  # type: ignore[index]
+
+
+def test_alias_index_without_aliases():
+    assert AliasIndex().search("anything") is None
+
+
+def test_alias_index_completes_titles():
+    rng = random.Random(1)
+    aliases = [
+        CachedAlias(i, random_word(rng), f"song {i // 3}", i // 3, rng.choice([-1, 1]))
+        for i in range(1_000)
+    ]
+    index = AliasIndex(aliases)
+
+    for _ in range(100):
+        # Queries close to an existing alias, so that there is something to complete.
+        query = rng.choice(aliases).alias[:-1]
+
+        similarities: dict[str, float] = {}
+        for alias in aliases:
+            similarity = fuzz.QRatio(query, alias.alias, processor=str.lower)
+            if alias.guild_id in {-1, 1} and similarity > 70:
+                similarities[alias.title] = max(
+                    similarity, similarities.get(alias.title, 0)
+                )
+
+        titles = index.complete(query, guild_id=1)
+        assert len(titles) == min(25, len(similarities))
+        assert set(titles) <= set(similarities)
+        assert [similarities[title] for title in titles] == sorted(
+            similarities.values(), reverse=True
+        )[: len(titles)]
+
+
+def test_alias_index_completions_follow_edits():
+    index = AliasIndex([CachedAlias(None, "Titania", "Titania", 1, -1)])
+
+    assert index.complete("prayer", guild_id=100) == []
+
+    index.add(CachedAlias(1, "prayer", "祈", 2, 100))
+    assert index.complete("prayer", guild_id=100) == ["祈"]
+    assert index.complete("prayer", guild_id=200) == []
+
+    index.remove(1)
+    assert index.complete("prayer", guild_id=100) == []
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.models import Base, Chart, Song, SongJacket
+from utils.references import ReferenceIndex
+
+
+def make_song(id: int, title: str, genre: str) -> Song:
+    return Song(
+        id=id,
+        title=title,
+        chunithm_catcode=0,
+        genre=genre,
+        artist="artist",
+        version="CHUNITHM",
+        jacket=f"{id}.webp",
+        available=True,
+        removed=False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_reference_index_looks_up_songs_and_charts():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    begin_db_session = async_sessionmaker(engine, expire_on_commit=False)
+    async with begin_db_session() as session, session.begin():
+        session.add_all(
+            [
+                make_song(1, "Song", "POPS & ANIME"),
+                make_song(8001, "Song", "WORLD'S END"),
+                Chart(song_id=1, difficulty="MAS", level="13+", const=13.7),
+                Chart(song_id=8001, difficulty="WE", level="☆5"),
+                SongJacket(song_id=1, jacket_url="https://example.com/1.webp"),
+            ]
+        )
+
+    async with begin_db_session() as session:
+        references = await ReferenceIndex.load(session)
+    await engine.dispose()
+
+    song = references.songs[1]
+    assert references.songs_by_jacket["1.webp"] is song
+    assert references.songs_by_jacket_url["https://example.com/1.webp"] is song
+    assert references.worlds_end_songs["Song"] is references.songs[8001]
+
+    chart = references.charts[(1, "MAS")]
+    assert chart.const == 13.7
+    assert (8001, "WE") in references.charts
+    assert (1, "EXP") not in references.charts
+
+    with pytest.raises(TypeError):
+        references.songs[2] = song  # type: ignore[index]
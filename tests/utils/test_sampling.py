@@ -0,0 +1,66 @@
+import random
+from collections import Counter
+from types import MappingProxyType
+
+from database.models import Chart, Song
+from utils.references import ReferenceIndex
+from utils.sampling import ChartSampler
+
+
+def make_references() -> ReferenceIndex:
+    songs = {
+        id: Song(id=id, title=str(id), genre="POPS & ANIME" if id < 10 else "VARIETY")
+        for id in range(100)
+    }
+    charts = {
+        (id, "MAS"): Chart(
+            id=id,
+            song_id=id,
+            difficulty="MAS",
+            level="13+" if id % 2 == 0 else "14",
+            const=None if id == 99 else 13 + (id % 20) / 10,
+        )
+        for id in songs
+    }
+
+    return ReferenceIndex(
+        songs=MappingProxyType(songs),
+        songs_by_jacket=MappingProxyType({}),
+        songs_by_jacket_url=MappingProxyType({}),
+        worlds_end_songs=MappingProxyType({}),
+        charts=MappingProxyType(charts),
+    )
+
+
+def test_sampler_samples_charts_by_level_and_const():
+    references = make_references()
+    sampler = ChartSampler(references, rng=random.Random(0))
+
+    charts = sampler.charts_by_level("13+", 4)
+    assert len(set(charts)) == 4
+    assert all(references.charts[(id, "MAS")].level == "13+" for id in charts)
+    assert sampler.charts_by_level("15", 4) == []
+
+    charts = sampler.charts_by_const(13.5, 13.7, 100)
+    assert sorted(charts) == [
+        id
+        for id in range(100)
+        if id != 99 and 13.5 <= 13 + (id % 20) / 10 <= 13.7
+    ]
+    assert sorted(sampler.charts_by_const(13.5, 13.5, 100)) == [5, 25, 45, 65, 85]
+    assert sampler.charts_by_const(15.0, 16.0, 4) == []
+
+
+def test_sampler_samples_songs_uniformly_across_genres():
+    sampler = ChartSampler(make_references(), rng=random.Random(0))
+
+    assert len(set(sampler.songs(100))) == 100
+    assert set(sampler.songs(100, genres=["POPS & ANIME", "ORIGINAL"])) == set(
+        range(10)
+    )
+
+    counts = Counter(
+        song_id < 10 for _ in range(2_000) for song_id in sampler.songs(1)
+    )
+    # 10 of the 100 songs are POPS & ANIME, even though there are only 2 genres.
+    assert 100 < counts[True] < 300
@@ -0,0 +1,83 @@
+from http.cookiejar import Cookie, LWPCookieJar
+from typing import cast
+
+from chunithm_net import ChuniNet
+from utils.sessions import CachedSession, SessionCache
+
+
+def make_session(discord_id: int) -> CachedSession:
+    # The cache never touches the client, so there's no need to create a real one.
+    return CachedSession(discord_id, cast(ChuniNet, None), LWPCookieJar())
+
+
+def test_session_cache_reuses_sessions():
+    cache = SessionCache()
+    session = make_session(1)
+
+    assert cache.acquire(1) is None
+    assert cache.add(session) == []
+    assert cache.acquire(1) is session
+    assert session.refs == 2
+
+
+def test_session_cache_evicts_least_recently_used():
+    cache = SessionCache(max_size=2)
+    first, second, third = make_session(1), make_session(2), make_session(3)
+
+    cache.add(first)
+    cache.release(first)
+    cache.add(second)
+    cache.release(second)
+
+    # Using the first session makes the second one the least recently used.
+    cache.acquire(1)
+    cache.release(first)
+
+    assert cache.add(third) == [second]
+    assert 1 in cache
+    assert 2 not in cache
+
+
+def test_session_cache_never_evicts_sessions_in_use():
+    cache = SessionCache(max_size=1, idle_ttl=0)
+    first, second = make_session(1), make_session(2)
+
+    cache.add(first)
+
+    assert cache.add(second) == []
+    assert cache.evict_idle() == []
+
+    cache.release(first)
+    cache.release(second)
+
+    assert sorted(x.discord_id for x in cache.evict_idle()) == [1, 2]
+    assert len(cache) == 0
+
+
+def test_cached_session_tracks_cookie_changes():
+    session = make_session(1)
+
+    assert not session.cookies_changed
+
+    session.jar.set_cookie(
+        Cookie(
+            version=0,
+            name="_t",
+            value="abcdef",
+            port=None,
+            port_specified=False,
+            domain="chunithm-net-eng.com",
+            domain_specified=False,
+            domain_initial_dot=False,
+            path="/",
+            path_specified=True,
+            secure=True,
+            expires=3856586927,
+            discard=False,
+            comment=None,
+            comment_url=None,
+            rest={},
+        )
+    )
+
+    assert session.cookies_changed
@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+
+from rapidfuzz import fuzz, process
+
+# Aliases with this guild ID apply to every guild.
+GLOBAL_GUILD_ID = -1
+
+# Songs are only suggested when one of their aliases is more similar than this.
+_COMPLETION_CUTOFF = 70
+
+
+class CachedAlias:
+    id: Optional[int] = None
+    alias: str
+    title: str
+    song_id: int
+    guild_id: Optional[int] = None
+
+    def __init__(
+        self,
+        id: Optional[int],
+        alias: str,
+        title: str,
+        song_id: int,
+        guild_id: Optional[int],
+    ) -> None:
+        self.id = id
+        self.alias = alias
+        self.title = title
+        self.song_id = song_id
+        self.guild_id = guild_id
+
+
+class _Candidates:
+    """Aliases of one guild, next to their lowercased text for scoring."""
+
+    __slots__ = ("aliases", "choices", "positions")
+
+    def __init__(self) -> None:
+        self.aliases: list[CachedAlias] = []
+        self.choices: list[str] = []
+        # Index of every alias with an ID in the lists above.
+        self.positions: dict[int, int] = {}
+
+    def add(self, alias: CachedAlias) -> None:
+        if alias.id is not None:
+            self.positions[alias.id] = len(self.aliases)
+
+        self.aliases.append(alias)
+        self.choices.append(alias.alias.lower())
+
+    def remove(self, alias_id: int) -> None:
+        # Move the last alias into the removed one's place, so nothing else moves.
+        position = self.positions.pop(alias_id)
+        last = self.aliases.pop()
+        last_choice = self.choices.pop()
+
+        if position < len(self.aliases):
+            self.aliases[position] = last
+            self.choices[position] = last_choice
+            if last.id is not None:
+                self.positions[last.id] = position
+
+
+class AliasIndex:
+    """
+    Song titles and aliases, grouped by guild for fuzzy searching.
+
+    Every guild's aliases are kept lowercased, so a search only has to score
+    the global aliases and the aliases of a single guild. Aliases are added and
+    removed in place as they are edited, instead of reloading all of them.
+
+    Completions are cached by guild and query, for the last `max_completions`
+    queries, since every keystroke asks for them again.
+    """
+
+    def __init__(
+        self, aliases: Iterable[CachedAlias] = (), *, max_completions: int = 1024
+    ) -> None:
+        self.max_completions = max_completions
+
+        self._guilds: dict[Optional[int], _Candidates] = {}
+        # Guild of every alias with an ID, to find it again when it is removed.
+        self._alias_guilds: dict[int, Optional[int]] = {}
+        self._completions: OrderedDict[
+            tuple[Optional[int], str, int], tuple[str, ...]
+        ] = OrderedDict()
+
+        for alias in aliases:
+            self.add(alias)
+
+    def __len__(self) -> int:
+        return sum(len(candidates.aliases) for candidates in self._guilds.values())
+
+    def add(self, alias: CachedAlias) -> None:
+        candidates = self._guilds.get(alias.guild_id)
+        if candidates is None:
+            candidates = self._guilds[alias.guild_id] = _Candidates()
+
+        if alias.id is not None:
+            self._alias_guilds[alias.id] = alias.guild_id
+
+        candidates.add(alias)
+        self._completions.clear()
+
+    def remove(self, alias_id: int) -> None:
+        """Removes an alias by its ID. Does nothing if there is no such alias."""
+        if alias_id not in self._alias_guilds:
+            return
+
+        guild_id = self._alias_guilds.pop(alias_id)
+        candidates = self._guilds[guild_id]
+        candidates.remove(alias_id)
+
+        if len(candidates.aliases) == 0:
+            del self._guilds[guild_id]
+
+        self._completions.clear()
+
+    def _candidates(self, guild_id: Optional[int]) -> Iterator[_Candidates]:
+        # Global aliases come first, so they win ties.
+        keys = [GLOBAL_GUILD_ID]
+        if guild_id is not None and guild_id != GLOBAL_GUILD_ID:
+            keys.append(guild_id)
+
+        for key in keys:
+            candidates = self._guilds.get(key)
+            if candidates is not None:
+                yield candidates
+
+    def search(
+        self, query: str, *, guild_id: Optional[int] = None
+    ) -> Optional[tuple[CachedAlias, float]]:
+        """Finds the global or guild alias most similar to `query`, along with
+        its similarity. Global aliases win ties. Returns None if there are no
+        aliases to search."""
+        query = query.lower()
+        best: Optional[tuple[CachedAlias, float]] = None
+
+        for candidates in self._candidates(guild_id):
+            # Only an alias scoring at least as well as the best so far is
+            # worth returning, so the rest is skipped while scoring.
+            result = process.extractOne(
+                query,
+                candidates.choices,
+                scorer=fuzz.QRatio,
+                processor=None,
+                score_cutoff=0 if best is None else best[1],
+            )
+            if result is None:
+                continue
+
+            _, similarity, index = result
+            if best is None or similarity > best[1]:
+                best = (candidates.aliases[index], similarity)
+
+        return best
+
+    def complete(
+        self, query: str, *, guild_id: Optional[int] = None, limit: int = 25
+    ) -> list[str]:
+        """Returns the titles of up to `limit` songs with a global or guild alias
+        similar to `query`, most similar first."""
+        query = query.lower()
+        key = (guild_id, query, limit)
+
+        titles = self._completions.get(key)
+        if titles is not None:
+            self._completions.move_to_end(key)
+            return list(titles)
+
+        similarities: dict[str, float] = {}
+        for candidates in self._candidates(guild_id):
+            # rapidfuzz skips aliases whose length alone rules them out, and
+            # scores the rest without going back to Python.
+            for _, similarity, index in process.extract(
+                query,
+                candidates.choices,
+                scorer=fuzz.QRatio,
+                processor=None,
+                score_cutoff=_COMPLETION_CUTOFF,
+                limit=None,
+            ):
+                title = candidates.aliases[index].title
+                if similarity > similarities.get(title, _COMPLETION_CUTOFF):
+                    similarities[title] = similarity
+
+        titles = tuple(
+            sorted(similarities, key=similarities.__getitem__, reverse=True)[:limit]
+        )
+        self._completions[key] = titles
+        if len(self._completions) > self.max_completions:
+            self._completions.popitem(last=False)
+
+        return list(titles)
@@ -0,0 +1,136 @@
+"""
+Total OVER POWER of a player's whole library, broken down by genre, version and
+difficulty.
+
+Every chart counts towards the maximum OVER POWER, played or not. The whole
+library is computed in one pass over columns of fixed point values, the same
+way as `utils.calculation.fixed_point`.
+"""
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Optional, TypeVar
+
+from chunithm_net.models.enums import ComboType, Difficulty
+from chunithm_net.models.record import Record
+
+from .fixed_point import (
+    LEVEL_SCALE,
+    overpower_base_hundredths,
+    round_level_to_fixed,
+)
+
+__all__ = [
+    "OverPowerBreakdown",
+    "OverPowerTotal",
+    "calculate_overpower_breakdown",
+]
+
+T = TypeVar("T")
+
+_MAX_SCORE = 1_010_000
+
+# Bonus OVER POWER for a combo lamp, in hundredths.
+_COMBO_BONUSES = {
+    ComboType.NONE: 0,
+    ComboType.FULL_COMBO: 50,
+    ComboType.ALL_JUSTICE: 100,
+    ComboType.ALL_JUSTICE_CRITICAL: 100,
+}
+
+
+@dataclass(slots=True)
+class OverPowerTotal:
+    value_hundredths: int = 0
+    max_hundredths: int = 0
+
+    @property
+    def value(self) -> Decimal:
+        return Decimal(self.value_hundredths).scaleb(-2)
+
+    @property
+    def max(self) -> Decimal:
+        return Decimal(self.max_hundredths).scaleb(-2)
+
+    @property
+    def progress(self) -> Decimal:
+        if self.max_hundredths == 0:
+            return Decimal(0)
+
+        return Decimal(self.value_hundredths) / self.max_hundredths
+
+
+@dataclass(slots=True)
+class OverPowerBreakdown:
+    total: OverPowerTotal = field(default_factory=OverPowerTotal)
+    genres: dict[str, OverPowerTotal] = field(default_factory=dict)
+    versions: dict[str, OverPowerTotal] = field(default_factory=dict)
+    difficulties: dict[Difficulty, OverPowerTotal] = field(default_factory=dict)
+
+
+def calculate_overpower_breakdown(
+    charts: Sequence[tuple[int, Difficulty]],
+    internal_levels: Sequence[Optional[float]],
+    genres: Sequence[str],
+    versions: Sequence[str],
+    records: Iterable[Record],
+) -> OverPowerBreakdown:
+    """Sums the OVER POWER of `records` over every chart in `charts`.
+
+    `charts` are pairs of song ID and difficulty, with the chart constant, genre
+    and version of their song at the same index of the other sequences. Records
+    of charts not in `charts` are ignored, and charts without a record count as
+    unplayed.
+    """
+    # Enums hash slowly, so charts are looked up by the difficulty's value.
+    index = {
+        (song_id, difficulty.value): i for i, (song_id, difficulty) in enumerate(charts)
+    }
+
+    scores = [0] * len(charts)
+    bonuses = [0] * len(charts)
+
+    for record in records:
+        i = index.get((record.song_id, record.difficulty.value))
+        if i is None or record.score < scores[i]:
+            continue
+
+        scores[i] = record.score
+        bonuses[i] = _COMBO_BONUSES[record.combo_lamp]
+
+    levels = [
+        round_level_to_fixed(internal_level) for internal_level in internal_levels
+    ]
+    # OVER POWER max is the chart constant * 5 + 15.
+    maxes = [(level * 5 + 15 * LEVEL_SCALE) // 100 for level in levels]
+    values = [
+        max_ if score >= _MAX_SCORE else base + bonus if score > 0 else 0
+        for score, base, bonus, max_ in zip(
+            scores, overpower_base_hundredths(scores, levels), bonuses, maxes
+        )
+    ]
+
+    return OverPowerBreakdown(
+        total=OverPowerTotal(sum(values), sum(maxes)),
+        genres=_sum_by(genres, values, maxes),
+        versions=_sum_by(versions, values, maxes),
+        difficulties={
+            Difficulty(difficulty): total
+            for difficulty, total in _sum_by(
+                [difficulty.value for _, difficulty in charts], values, maxes
+            ).items()
+        },
+    )
+
+
+def _sum_by(
+    keys: Sequence[T], values: Sequence[int], maxes: Sequence[int]
+) -> dict[T, OverPowerTotal]:
+    value_sums: dict[T, int] = {}
+    max_sums: dict[T, int] = {}
+
+    for key, value, max_ in zip(keys, values, maxes):
+        value_sums[key] = value_sums.get(key, 0) + value
+        max_sums[key] = max_sums.get(key, 0) + max_
+
+    return {key: OverPowerTotal(value_sums[key], max_sums[key]) for key in value_sums}
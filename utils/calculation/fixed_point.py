@@ -0,0 +1,327 @@
+"""
+Batch versions of the rating and OVER POWER calculations, in integer arithmetic.
+
+Chart constants are converted to fixed point with 4 decimal places. Every branch
+of the rating curve then divides by a factor of 600,000 at most, so the exact
+value of `rating100` is always an integer numerator over 600,000, and the play
+rating an integer numerator over `RATING_DENOMINATOR`. The numerators are exact,
+and the results are converted to `Decimal` with the exponents the functions in
+`utils.calculation.rating` and `utils.calculation.overpower` end up with, so they
+are identical to theirs, down to the trailing zeros.
+"""
+from array import array
+from collections.abc import Sequence
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional
+
+from .overpower import calculate_overpower_base, calculate_overpower_max
+from .rating import calculate_rating
+
+__all__ = [
+    "LEVEL_SCALE",
+    "OVERPOWER_HUNDREDTHS_DENOMINATOR",
+    "RATING_DENOMINATOR",
+    "calculate_overpower_bases",
+    "calculate_overpower_maxes",
+    "calculate_ratings",
+    "level_exponent",
+    "level_to_fixed",
+    "overpower_base_hundredths",
+    "overpower_to_decimal",
+    "rating100_numerator",
+    "rating_numerators",
+    "rating_to_decimal",
+    "round_level_to_fixed",
+]
+
+LEVEL_SCALE = 10_000
+# rating100 = numerator / _RATING100_DENOMINATOR
+_RATING100_DENOMINATOR = 600_000
+# rating = numerator / RATING_DENOMINATOR
+RATING_DENOMINATOR = _RATING100_DENOMINATOR * LEVEL_SCALE
+
+_DECIMAL_RATING_DENOMINATOR = Decimal(RATING_DENOMINATOR)
+# Exact ratings take at most 10 decimal places.
+_POWERS_OF_TEN = tuple(10**x for x in range(11))
+# OVER POWER is rating100 / 2000, floored to 2 decimal places.
+OVERPOWER_HUNDREDTHS_DENOMINATOR = _RATING100_DENOMINATOR * 2000 // 100
+
+
+@lru_cache(maxsize=1024)
+def level_to_fixed(internal_level: Optional[float]) -> Optional[int]:
+    """Converts a chart constant to fixed point, the same way the `Decimal`
+    functions read it. Returns None if it has more than 4 decimal places."""
+    value = Decimal(str(internal_level or 0)) * LEVEL_SCALE
+
+    if value != value.to_integral_value():
+        return None
+
+    return int(value)
+
+
+def round_level_to_fixed(internal_level: Optional[float]) -> int:
+    """Same as `level_to_fixed`, but rounds chart constants with more than 4
+    decimal places instead of returning None."""
+    level = level_to_fixed(internal_level)
+    if level is None:
+        return round((internal_level or 0) * LEVEL_SCALE)
+
+    return level
+
+
+def rating100_numerator(score: int, level: int, *, overpower: bool) -> int:
+    """`rating100` for a score and a fixed point chart constant, as a numerator
+    over 600,000. With `overpower`, follows the OVER POWER curve instead, which
+    keeps going up past 1,009,000. Not clamped to 0."""
+    if score >= 1_009_000 and not overpower:
+        return (level + 21_500) * 600_000
+    if score >= 1_007_500:
+        return (level + 20_000 + (score - 1_007_500) * (3 if overpower else 1)) * 600_000
+    if score >= 1_005_000:
+        return (level + 15_000 + (score - 1_005_000) * 2) * 600_000
+    if score >= 1_000_000:
+        return (level + 10_000 + (score - 1_000_000)) * 600_000
+    if score >= 975_000:
+        return level * 600_000 + (score - 975_000) * 240_000
+    if score >= 900_000:
+        return (level - 50_000) * 600_000 + (score - 900_000) * 400_000
+    if score >= 800_000:
+        return (level - 50_000) * (300_000 + (score - 800_000) * 3)
+    if score >= 500_000:
+        return (level - 50_000) * (score - 500_000)
+    return 0
+
+
+def _round_to_precision(numerator: int, denominator: int) -> tuple[int, int]:
+    """Rounds `numerator / denominator` to 28 significant digits, half to even,
+    like `decimal`'s default context. Returns the coefficient and exponent."""
+    if numerator == 0:
+        return 0, 0
+
+    sign = -1 if numerator < 0 else 1
+    numerator = abs(numerator)
+
+    # Scale the quotient to exactly 28 digits before the decimal point.
+    shift = 28 - (len(str(numerator)) - len(str(denominator)))
+    while True:
+        if shift >= 0:
+            coefficient, remainder = divmod(numerator * 10**shift, denominator)
+            divisor = denominator
+        else:
+            divisor = denominator * 10**-shift
+            coefficient, remainder = divmod(numerator, divisor)
+
+        if coefficient >= 10**28:
+            shift -= 1
+        elif coefficient < 10**27:
+            shift += 1
+        else:
+            break
+
+    if remainder * 2 > divisor or (remainder * 2 == divisor and coefficient % 2):
+        coefficient += 1
+
+        if coefficient == 10**28:
+            coefficient //= 10
+            shift -= 1
+
+    return sign * coefficient, -shift
+
+
+def _trailing_zeros(value: int) -> int:
+    zeros = 0
+    while value % 10 == 0:
+        value //= 10
+        zeros += 1
+
+    return zeros
+
+
+@lru_cache(maxsize=1024)
+def level_exponent(internal_level: Optional[float]) -> int:
+    """The exponent of a chart constant, as the `Decimal` functions read it."""
+    return Decimal(str(internal_level or 0)).as_tuple().exponent  # type: ignore[return-value]
+
+
+def _rating_exponent(score: int, level: int, level_exponent: int) -> Optional[int]:
+    """The exponent `calculate_rating` gives an exact play rating, unless the
+    rating needs more decimal places than that. `level_exponent` is the exponent
+    of the chart constant as it reads it.
+
+    Every operation on a `Decimal` keeps the decimal places of its operands, so
+    the exponent depends on the branch of the rating curve and the chart
+    constant, and not only on the value. Returns None if the rating is rounded,
+    where the exponent is only given by the value.
+    """
+    if score >= 1_000_000:
+        exponent = level_exponent
+    elif score >= 975_000:
+        # level_base + (score - 975,000) * 2 / 5
+        exponent = min(level_exponent, -1 if (score - 975_000) % 5 else 0)
+    elif score >= 900_000:
+        if (score - 900_000) % 3:
+            return None
+
+        exponent = level_exponent
+    elif score >= 500_000:
+        # (level_base - 50,000) / 2, with as many decimal places as needed.
+        coefficient = (level - 50_000) * 10**-level_exponent
+        exponent = level_exponent - (coefficient % 2)
+
+        if score >= 800_000:
+            # ... + (score - 800,000) * ((level_base - 50,000) / 2) / 100,000
+            product = (score - 800_000) * coefficient * 5
+            if product != 0:
+                exponent = min(
+                    exponent, level_exponent - 6 + _trailing_zeros(product)
+                )
+        elif (score - 500_000) * coefficient % 3:
+            return None
+    else:
+        exponent = 0
+
+    # Dividing by 10,000 at the end keeps the exponent.
+    return exponent
+
+
+def rating_to_decimal(
+    numerator: int, score: int, level: int, level_exponent: int
+) -> Decimal:
+    """Converts a play rating numerator to the `Decimal` `calculate_rating` gives
+    for the same score and chart constant, down to the trailing zeros.
+    `level_exponent` is the exponent of the chart constant, from
+    `level_exponent`."""
+    # Between 900,000 and 975,000, the Decimal calculation rounds twice: once
+    # when dividing by 3, then when adding the result to the level. Rounding the
+    # exact value only once can differ in the last digit, so do the same.
+    # The sum keeps the decimal places of the quotient, and is only rounded
+    # again if that takes more than 28 digits.
+    if 900_000 <= score < 975_000 and (score - 900_000) % 3:
+        coefficient, exponent = _round_to_precision((score - 900_000) * 2, 3)
+        coefficient += (level - 50_000) * 10**-exponent
+
+        if len(str(abs(coefficient))) > 28:
+            coefficient, shift = _round_to_precision(coefficient, 1)
+            exponent += shift
+
+        if coefficient < 0 and level > 0:
+            return Decimal(0)
+
+        return Decimal(coefficient).scaleb(exponent - 4)
+
+    exponent = _rating_exponent(score, level, level_exponent)
+
+    if numerator == 0 and score >= 500_000:
+        rating100 = rating100_numerator(score, level, overpower=False)
+
+        # Negative ratings are clamped to a plain 0.
+        if rating100 < 0 and level > 0:
+            return Decimal(0)
+
+        # At exactly 500,000 on charts below level 5, the Decimal calculation
+        # multiplies a negative number by zero.
+        if score == 500_000 and level < 50_000:
+            return Decimal((1, (0,), exponent))
+
+    if exponent is None:
+        return Decimal(numerator) / _DECIMAL_RATING_DENOMINATOR
+
+    # The rating is exact, so the numerator is a multiple of 3, and the rating is
+    # numerator * 5 / 3 units of 10^-10. It is padded with the zeros the Decimal
+    # calculation keeps, so the results are identical and not only equal.
+    coefficient, remainder = divmod(numerator // 3 * 5, _POWERS_OF_TEN[exponent + 10])
+    if remainder:
+        # Takes more decimal places than that, so none of them are zeros.
+        return Decimal(numerator) / _DECIMAL_RATING_DENOMINATOR
+
+    return Decimal(coefficient).scaleb(exponent)
+
+
+def overpower_to_decimal(hundredths: int, score: int, level: int) -> Decimal:
+    """Converts OVER POWER in hundredths to the `Decimal`
+    `calculate_overpower_base` gives for the same score and chart constant."""
+    # At exactly 500,000 on charts below level 5, the Decimal calculation
+    # multiplies a negative number by zero.
+    if score == 500_000 and level < 50_000:
+        return Decimal("-0.00")
+
+    return Decimal(hundredths).scaleb(-2)
+
+
+def rating_numerators(scores: Sequence[int], levels: Sequence[int]) -> array:
+    """Play ratings for pairs of scores and fixed point chart constants, as
+    numerators over `RATING_DENOMINATOR`."""
+    numerators = array("q")
+
+    for score, level in zip(scores, levels):
+        numerator = rating100_numerator(score, level, overpower=False)
+
+        if numerator < 0 and level > 0:
+            numerator = 0
+
+        numerators.append(numerator)
+
+    return numerators
+
+
+def overpower_base_hundredths(scores: Sequence[int], levels: Sequence[int]) -> array:
+    """OVER POWER for pairs of scores and fixed point chart constants, as
+    hundredths."""
+    return array(
+        "q",
+        (
+            max(0, rating100_numerator(score, level, overpower=True))
+            // OVERPOWER_HUNDREDTHS_DENOMINATOR
+            for score, level in zip(scores, levels)
+        ),
+    )
+
+
+def calculate_ratings(
+    scores: Sequence[int], internal_levels: Sequence[Optional[float]]
+) -> list[Decimal]:
+    """Same as calling `calculate_rating` on every pair of score and chart
+    constant."""
+    levels = [level_to_fixed(level) for level in internal_levels]
+    numerators = rating_numerators(scores, [level or 0 for level in levels])
+
+    return [
+        rating_to_decimal(numerator, score, level, level_exponent(internal_level))
+        if level is not None
+        else calculate_rating(score, internal_level)
+        for numerator, level, score, internal_level in zip(
+            numerators, levels, scores, internal_levels
+        )
+    ]
+
+
+def calculate_overpower_bases(
+    scores: Sequence[int], internal_levels: Sequence[float]
+) -> list[Decimal]:
+    """Same as calling `calculate_overpower_base` on every pair of score and
+    chart constant."""
+    levels = [level_to_fixed(level) for level in internal_levels]
+    hundredths = overpower_base_hundredths(scores, [level or 0 for level in levels])
+
+    return [
+        overpower_to_decimal(value, score, level)
+        if level is not None
+        else calculate_overpower_base(score, internal_level)
+        for value, level, score, internal_level in zip(
+            hundredths, levels, scores, internal_levels
+        )
+    ]
+
+
+def calculate_overpower_maxes(internal_levels: Sequence[float]) -> list[Decimal]:
+    """Same as calling `calculate_overpower_max` on every chart constant."""
+    # There are only so many chart constants, so compute each of them once.
+    maxes: dict[float, Decimal] = {}
+
+    return [
+        maxes[level]
+        if level in maxes
+        else maxes.setdefault(level, calculate_overpower_max(level))
+        for level in internal_levels
+    ]
@@ -0,0 +1,140 @@
+"""
+Ranks every chart by how much improving its score would raise a player's best 30
+average.
+
+A chart raises the average once its rating beats the rating it would replace:
+its own, if it already is in the best 30, or the lowest rating of the best 30
+otherwise. The lowest score doing so is looked up in `utils.calculation.tables`.
+Charts are then compared at the first rank border at or above that score, by
+rating gained per point of score the player still has to gain.
+
+Everything is computed column by column over the whole chart table, in fixed
+point.
+"""
+import heapq
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+from chunithm_net.models.enums import Difficulty, Rank
+from chunithm_net.models.record import Record
+
+from .fixed_point import RATING_DENOMINATOR, rating_numerators, round_level_to_fixed
+from .tables import rating_numerator, score_for_rating_numerator
+
+__all__ = ["RatingImprovement", "rank_rating_improvements"]
+
+_BEST30_SIZE = 30
+_RANK_BORDERS = sorted({rank.min_score for rank in Rank})
+
+
+@dataclass(slots=True)
+class RatingImprovement:
+    song_id: int
+    difficulty: Difficulty
+
+    # Personal best, 0 if the chart was never played.
+    score: int
+    # Lowest score that raises the best 30 average.
+    minimum_score: int
+    # First rank border at or above `minimum_score`.
+    target_score: int
+    # Best 30 average gained by reaching `target_score`.
+    rating_gain: Decimal
+
+
+def rank_rating_improvements(
+    charts: Sequence[tuple[int, Difficulty]],
+    internal_levels: Sequence[Optional[float]],
+    best30: Iterable[Record],
+    personal_bests: Iterable[Record],
+    *,
+    count: int = 5,
+) -> list[RatingImprovement]:
+    """Returns the `count` charts where reaching the next rank border raises the
+    best 30 average by the most per point of score, best first.
+
+    `charts` are pairs of song ID and difficulty, with their chart constants at
+    the same index of `internal_levels`. Charts without a personal best count
+    as unplayed. `best30` records must have their `internal_level` set, since
+    they may be on charts that aren't in `charts`, like removed songs.
+    """
+    # Enums hash slowly, so charts are looked up by the difficulty's value.
+    index = {
+        (song_id, difficulty.value): i for i, (song_id, difficulty) in enumerate(charts)
+    }
+    levels = [
+        round_level_to_fixed(internal_level) for internal_level in internal_levels
+    ]
+
+    scores = [0] * len(charts)
+    for record in personal_bests:
+        i = index.get((record.song_id, record.difficulty.value))
+        if i is not None and record.score > scores[i]:
+            scores[i] = record.score
+
+    current = rating_numerators(scores, levels)
+
+    # Ratings in the best 30 are replaced by a better score on the same chart.
+    # Every record of the best 30 counts towards the lowest rating, including
+    # those on charts that can't be improved anymore.
+    replaced = {}
+    best30_ratings = []
+    for record in best30:
+        i = index.get((record.song_id, record.difficulty.value))
+        if i is not None:
+            level = levels[i]
+        else:
+            level = round_level_to_fixed(record.internal_level or 0)
+
+        rating = rating_numerator(record.score, level)
+        best30_ratings.append(rating)
+        if i is not None:
+            replaced[i] = rating
+
+    lowest = 0
+    if len(best30_ratings) >= _BEST30_SIZE:
+        lowest = min(best30_ratings)
+
+    baselines = [replaced.get(i, lowest) for i in range(len(charts))]
+    minimums = list(
+        map(
+            score_for_rating_numerator,
+            [
+                max(baseline, rating) + 1
+                for baseline, rating in zip(baselines, current)
+            ],
+            levels,
+        )
+    )
+    # Charts that can't beat their baseline at any score are left out.
+    candidates = [
+        (i, minimum, _RANK_BORDERS[bisect_left(_RANK_BORDERS, minimum)])
+        for i, minimum in enumerate(minimums)
+        if minimum is not None
+    ]
+    gains = [
+        rating_numerator(target, levels[i]) - baselines[i]
+        for i, _, target in candidates
+    ]
+    efficiencies = [
+        gain / (target - scores[i]) for (i, _, target), gain in zip(candidates, gains)
+    ]
+
+    improvements = []
+    for c in heapq.nlargest(count, range(len(candidates)), key=efficiencies.__getitem__):
+        i, minimum, target = candidates[c]
+        improvements.append(
+            RatingImprovement(
+                song_id=charts[i][0],
+                difficulty=charts[i][1],
+                score=scores[i],
+                minimum_score=minimum,
+                target_score=target,
+                rating_gain=Decimal(gains[c]) / RATING_DENOMINATOR / _BEST30_SIZE,
+            )
+        )
+
+    return improvements
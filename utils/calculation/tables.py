@@ -0,0 +1,206 @@
+"""
+Precomputed rating and OVER POWER curves for every chart constant.
+
+Both curves are piecewise linear in the score, with the same pieces for every
+chart constant. For each chart constant from 0.0 to 16.0, the value and slope of
+every piece are precomputed as the fixed point numerators of
+`utils.calculation.fixed_point`. A lookup then finds the piece by indexing, and
+interpolates inside it with one multiplication. The results are the same as the
+functions in `utils.calculation.rating` and `utils.calculation.overpower`.
+
+Since the curves never go down, they are also inverted by finding the first
+piece that reaches the wanted rating, over the whole score range.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+from . import overpower, rating
+from .fixed_point import (
+    LEVEL_SCALE,
+    OVERPOWER_HUNDREDTHS_DENOMINATOR,
+    RATING_DENOMINATOR,
+    level_exponent,
+    level_to_fixed,
+    overpower_to_decimal,
+    rating100_numerator,
+    rating_to_decimal,
+)
+
+__all__ = [
+    "calculate_overpower_base",
+    "calculate_overpower_max",
+    "calculate_rating",
+    "calculate_score_for_rating",
+    "rating_numerator",
+    "score_for_rating_numerator",
+]
+
+MAX_SCORE = 1_010_000
+
+# Scores at which each piece of the curves starts.
+_STARTS = (
+    0,
+    500_000,
+    800_000,
+    900_000,
+    975_000,
+    1_000_000,
+    1_005_000,
+    1_007_500,
+    1_009_000,
+)
+
+# Every piece starts at a multiple of this, so the piece a score is in can be
+# looked up by `score // _STEP`.
+_STEP = 500
+_PIECES = bytes(
+    bisect_right(_STARTS, step * _STEP) - 1 for step in range(MAX_SCORE // _STEP + 1)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _ChartTable:
+    # Numerators at the start of every piece, and per point of score in it.
+    rating_bases: tuple[int, ...]
+    rating_slopes: tuple[int, ...]
+    overpower_bases: tuple[int, ...]
+    overpower_slopes: tuple[int, ...]
+
+    # Rating numerators at the end of every piece, never negative.
+    rating_ends: tuple[int, ...]
+
+    overpower_max: Decimal
+
+
+def _build(level: int) -> _ChartTable:
+    tables = {}
+
+    for name, is_overpower in (("rating", False), ("overpower", True)):
+        tables[f"{name}_bases"] = tuple(
+            rating100_numerator(start, level, overpower=is_overpower)
+            for start in _STARTS
+        )
+        tables[f"{name}_slopes"] = tuple(
+            rating100_numerator(start + 1, level, overpower=is_overpower) - base
+            for start, base in zip(_STARTS, tables[f"{name}_bases"])
+        )
+
+    return _ChartTable(
+        **tables,
+        rating_ends=tuple(
+            max(0, rating100_numerator(end, level, overpower=False))
+            for end in (*_STARTS[1:], MAX_SCORE)
+        ),
+        overpower_max=overpower.calculate_overpower_max(level / LEVEL_SCALE),
+    )
+
+
+_TABLES = {
+    level: _build(level) for level in range(0, 16 * LEVEL_SCALE + 1, LEVEL_SCALE // 10)
+}
+
+
+def _table(level: int) -> _ChartTable:
+    # Chart constants off the 0.1 grid are rare enough to build when needed.
+    table = _TABLES.get(level)
+    if table is None:
+        table = _build(level)
+
+    return table
+
+
+def _piece(score: int) -> int:
+    return _PIECES[min(max(score, 0), MAX_SCORE) // _STEP]
+
+
+def rating_numerator(score: int, level: int) -> int:
+    """Play rating for a score on a fixed point chart constant, as a numerator
+    over `RATING_DENOMINATOR`."""
+    if score < 0:
+        return 0
+
+    table = _table(level)
+    piece = _piece(score)
+    numerator = table.rating_bases[piece] + (
+        score - _STARTS[piece]
+    ) * table.rating_slopes[piece]
+
+    if numerator < 0 and level > 0:
+        return 0
+
+    return numerator
+
+
+def calculate_rating(score: int, internal_level: Optional[float]) -> Decimal:
+    level = level_to_fixed(internal_level)
+    if level is None:
+        return rating.calculate_rating(score, internal_level)
+
+    return rating_to_decimal(
+        rating_numerator(score, level), score, level, level_exponent(internal_level)
+    )
+
+
+def calculate_overpower_base(score: int, internal_level: float) -> Decimal:
+    level = level_to_fixed(internal_level)
+    if level is None:
+        return overpower.calculate_overpower_base(score, internal_level)
+
+    table = _table(level)
+    piece = _piece(score)
+    numerator = 0
+
+    if score >= 0:
+        numerator = table.overpower_bases[piece] + (
+            score - _STARTS[piece]
+        ) * table.overpower_slopes[piece]
+
+    return overpower_to_decimal(
+        max(0, numerator) // OVERPOWER_HUNDREDTHS_DENOMINATOR, score, level
+    )
+
+
+def calculate_overpower_max(internal_level: float) -> Decimal:
+    level = level_to_fixed(internal_level)
+    if level is None:
+        return overpower.calculate_overpower_max(internal_level)
+
+    return _table(level).overpower_max
+
+
+def score_for_rating_numerator(numerator: int, level: int) -> Optional[int]:
+    """Returns the lowest score that gives a play rating of at least `numerator`
+    over `RATING_DENOMINATOR` on a fixed point chart constant, or None if no
+    score does."""
+    if numerator <= 0:
+        return 0
+
+    table = _table(level)
+
+    # The first piece that reaches the target has the lowest score doing so.
+    piece = bisect_left(table.rating_ends, numerator)
+    if piece == len(_STARTS):
+        return None
+
+    # Any positive rating reached in a piece means it goes up.
+    base = table.rating_bases[piece]
+    slope = table.rating_slopes[piece]
+
+    return _STARTS[piece] + max(0, -((base - numerator) // slope))
+
+
+def calculate_score_for_rating(
+    target_rating: float, internal_level: float
+) -> Optional[int]:
+    """Returns the lowest score that gives at least `target_rating` on a chart,
+    or None if no score does."""
+    level = level_to_fixed(internal_level)
+    if level is None:
+        return rating.calculate_score_for_rating(target_rating, internal_level)
+
+    return score_for_rating_numerator(
+        math.ceil(Decimal(str(target_rating)) * RATING_DENOMINATOR), level
+    )
@@ -37,6 +37,34 @@ class BotConfig:
 
         return [int(x) for x in raw.split(",")]
 
+    @property
+    def chunithm_net_rate_limit(self) -> float:
+        return self.__section.getfloat("chunithm_net_rate_limit", fallback=5)
+
+    @property
+    def chunithm_net_burst(self) -> int:
+        return self.__section.getint("chunithm_net_burst", fallback=10)
+
+    @property
+    def chunithm_net_parser_pool(self) -> Optional[str]:
+        mode = self.__section.get("chunithm_net_parser_pool", fallback="thread")
+        return None if mode == "none" else mode
+
+    @property
+    def chunithm_net_parser_workers(self) -> Optional[int]:
+        # Left empty in the example config, for the number of CPUs.
+        raw = self.__section.get("chunithm_net_parser_workers", "").strip()
+        if len(raw) == 0:
+            return None
+
+        return int(raw)
+
+    @property
+    def chunithm_net_parser_inline_threshold(self) -> int:
+        return self.__section.getint(
+            "chunithm_net_parser_inline_threshold", fallback=64 * 1024
+        )
+
 
 class WebConfig:
     def __init__(self, section: "SectionProxy") -> None:
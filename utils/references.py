@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from database.models import Song
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from database.models import Chart
+
+
+@dataclass(frozen=True, slots=True)
+class ReferenceIndex:
+    """
+    An immutable snapshot of the song and chart tables, for looking songs and
+    charts up without querying the database.
+
+    The songs and charts are detached from their session, with their charts and
+    jackets loaded. They are shared between every command, so they must never be
+    modified or added to a session. To pick up changes to the tables, load a new
+    index and replace the old one.
+    """
+
+    songs: Mapping[int, Song]
+    # Keyed by the jacket's filename, as in `Song.jacket`.
+    songs_by_jacket: Mapping[str, Song]
+    # Keyed by every full URL a song's jacket is known to be hosted at.
+    songs_by_jacket_url: Mapping[str, Song]
+    # WORLD'S END songs, keyed by title.
+    worlds_end_songs: Mapping[str, Song]
+    # Keyed by song ID and the short form of the difficulty.
+    charts: Mapping[tuple[int, str], "Chart"]
+
+    @classmethod
+    async def load(cls, session: "AsyncSession") -> "ReferenceIndex":
+        stmt = select(Song).options(
+            selectinload(Song.charts), selectinload(Song.jackets)
+        )
+        songs = (await session.execute(stmt)).scalars().all()
+
+        songs_by_id: dict[int, Song] = {}
+        songs_by_jacket: dict[str, Song] = {}
+        songs_by_jacket_url: dict[str, Song] = {}
+        worlds_end_songs: dict[str, Song] = {}
+        charts: dict[tuple[int, str], "Chart"] = {}
+
+        for song in songs:
+            songs_by_id[song.id] = song
+            songs_by_jacket[song.jacket] = song
+
+            if song.genre == "WORLD'S END":
+                worlds_end_songs.setdefault(song.title, song)
+
+            for jacket in song.jackets:
+                songs_by_jacket_url[jacket.jacket_url] = song
+
+            for chart in song.charts:
+                charts[(song.id, chart.difficulty)] = chart
+
+        return cls(
+            songs=MappingProxyType(songs_by_id),
+            songs_by_jacket=MappingProxyType(songs_by_jacket),
+            songs_by_jacket_url=MappingProxyType(songs_by_jacket_url),
+            worlds_end_songs=MappingProxyType(worlds_end_songs),
+            charts=MappingProxyType(charts),
+        )
+
+    @classmethod
+    def empty(cls) -> "ReferenceIndex":
+        return cls(
+            songs=MappingProxyType({}),
+            songs_by_jacket=MappingProxyType({}),
+            songs_by_jacket_url=MappingProxyType({}),
+            worlds_end_songs=MappingProxyType({}),
+            charts=MappingProxyType({}),
+        )
@@ -0,0 +1,92 @@
+import random
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from utils.references import ReferenceIndex
+
+
+class ChartSampler:
+    """
+    Picks random charts and songs from a `ReferenceIndex`, without asking the
+    database to sort every row by `RANDOM()`.
+
+    Chart IDs are bucketed by level, and sorted by chart constant so a range of
+    chart constants is found by binary search. Song IDs are bucketed by genre.
+    Every sample is drawn in time proportional to its size, without replacement.
+    Like the index it is built from, a sampler never changes; build a new one to
+    pick up changes to the tables.
+    """
+
+    def __init__(
+        self, references: "ReferenceIndex", *, rng: Optional[random.Random] = None
+    ) -> None:
+        self._rng = rng if rng is not None else random.Random()
+
+        charts_by_level: dict[str, list[int]] = {}
+        consts: list[tuple[float, int]] = []
+        for chart in references.charts.values():
+            charts_by_level.setdefault(chart.level, []).append(chart.id)
+
+            if chart.const is not None:
+                consts.append((chart.const, chart.id))
+
+        songs_by_genre: dict[str, list[int]] = {}
+        for song in references.songs.values():
+            songs_by_genre.setdefault(song.genre, []).append(song.id)
+
+        consts.sort()
+
+        self._charts_by_level = {k: tuple(v) for k, v in charts_by_level.items()}
+        self._consts = [const for const, _ in consts]
+        self._charts_by_const = [chart_id for _, chart_id in consts]
+        self._songs_by_genre = {k: tuple(v) for k, v in songs_by_genre.items()}
+
+    @property
+    def genres(self) -> list[str]:
+        return list(self._songs_by_genre)
+
+    def charts_by_level(self, level: str, k: int) -> list[int]:
+        """Returns the IDs of up to `k` random charts of a level, e.g. 13+."""
+        charts = self._charts_by_level.get(level, ())
+        return self._rng.sample(charts, min(k, len(charts)))
+
+    def charts_by_const(self, min_const: float, max_const: float, k: int) -> list[int]:
+        """Returns the IDs of up to `k` random charts with a chart constant between
+        `min_const` and `max_const`, inclusive."""
+        start = bisect_left(self._consts, min_const)
+        end = bisect_right(self._consts, max_const)
+        if start >= end:
+            return []
+
+        return [
+            self._charts_by_const[i]
+            for i in self._rng.sample(range(start, end), min(k, end - start))
+        ]
+
+    def songs(self, k: int, *, genres: Optional[Iterable[str]] = None) -> list[int]:
+        """Returns the IDs of up to `k` random songs, from any genre if `genres` is
+        not given. Every song is equally likely, however large its genre."""
+        if genres is None:
+            genres = self._songs_by_genre
+
+        buckets = [
+            self._songs_by_genre[genre]
+            for genre in genres
+            if genre in self._songs_by_genre
+        ]
+
+        # Where each genre's songs start, when all genres are lined up.
+        offsets = []
+        total = 0
+        for bucket in buckets:
+            offsets.append(total)
+            total += len(bucket)
+
+        song_ids = []
+        for i in self._rng.sample(range(total), min(k, total)):
+            bucket = bisect_right(offsets, i) - 1
+            song_ids.append(buckets[bucket][i - offsets[bucket]])
+
+        return song_ids
@@ -0,0 +1,128 @@
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterator, Optional
+
+if TYPE_CHECKING:
+    from http.cookiejar import LWPCookieJar
+
+    from chunithm_net import ChuniNet
+
+
+def serialize_cookies(jar: "LWPCookieJar") -> str:
+    return f"#LWP-Cookies-2.0\n{jar.as_lwp_str()}"
+
+
+class CachedSession:
+    """A live CHUNITHM-NET session, along with what's needed to persist it."""
+
+    def __init__(
+        self, discord_id: int, client: "ChuniNet", jar: "LWPCookieJar"
+    ) -> None:
+        self.discord_id = discord_id
+        self.client = client
+        self.jar = jar
+
+        # The serialized cookie jar, as last written to the database.
+        self.saved_cookies = serialize_cookies(jar)
+
+        # Number of commands/views currently using this session. Sessions are only
+        # ever closed when nobody is using them.
+        self.refs = 0
+        self.last_used = time.monotonic()
+
+        # Set when the stored cookie is no longer valid for this session (the user
+        # logged in again or logged out), so it must never be written back.
+        self.invalidated = False
+
+    @property
+    def cookies_changed(self) -> bool:
+        return serialize_cookies(self.jar) != self.saved_cookies
+
+
+class SessionCache:
+    """
+    A bounded cache of live CHUNITHM-NET sessions, keyed by Discord ID.
+
+    Sessions that are not in use are evicted when they have been idle for longer
+    than `idle_ttl` seconds, or in least-recently-used order when there are more
+    than `max_size` sessions. Evicted sessions are handed back to the caller, who
+    is responsible for saving their cookies and closing them.
+    """
+
+    def __init__(self, *, max_size: int = 256, idle_ttl: float = 600) -> None:
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+
+        self._sessions: OrderedDict[int, CachedSession] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, discord_id: int) -> bool:
+        return discord_id in self._sessions
+
+    def __iter__(self) -> Iterator[CachedSession]:
+        return iter(list(self._sessions.values()))
+
+    def acquire(self, discord_id: int) -> Optional[CachedSession]:
+        if (session := self._sessions.get(discord_id)) is None:
+            return None
+
+        self._sessions.move_to_end(discord_id)
+        session.refs += 1
+        session.last_used = time.monotonic()
+
+        return session
+
+    def add(self, session: CachedSession) -> list[CachedSession]:
+        """Adds a session to the cache and acquires it, returning the sessions
+        evicted to make room for it."""
+        session.refs += 1
+        session.last_used = time.monotonic()
+        self._sessions[session.discord_id] = session
+
+        return self._evict_overflow()
+
+    def release(self, session: CachedSession) -> None:
+        session.refs -= 1
+        session.last_used = time.monotonic()
+
+    def pop(self, discord_id: int) -> Optional[CachedSession]:
+        return self._sessions.pop(discord_id, None)
+
+    def evict_idle(self) -> list[CachedSession]:
+        deadline = time.monotonic() - self.idle_ttl
+        evicted_ids = [
+            discord_id
+            for discord_id, session in self._sessions.items()
+            if session.refs <= 0 and session.last_used < deadline
+        ]
+
+        return [self._sessions.pop(discord_id) for discord_id in evicted_ids]
+
+    def clear(self) -> list[CachedSession]:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+
+        return sessions
+
+    def _evict_overflow(self) -> list[CachedSession]:
+        evicted = []
+        overflow = len(self._sessions) - self.max_size
+
+        if overflow <= 0:
+            return evicted
+
+        # Least recently used first. Sessions in use are skipped, so the cache can
+        # temporarily grow past its size limit under heavy load.
+        for discord_id, session in list(self._sessions.items()):
+            if overflow <= 0:
+                break
+
+            if session.refs > 0:
+                continue
+
+            evicted.append(self._sessions.pop(discord_id))
+            overflow -= 1
+
+        return evicted
@@ -1,3 +1,4 @@
+import math
 from collections.abc import Sequence
 
 import discord
@@ -5,6 +6,7 @@ import discord.ui
 from discord.ext.commands import Context
 
 from chunithm_net.consts import KEY_INTERNAL_LEVEL, KEY_PLAY_RATING
+from chunithm_net.models.batch import RecordBatch
 from utils import floor_to_ndp
 from utils.components import ScoreCardEmbed
 
@@ -26,12 +28,21 @@ class B30View(PaginationView):
     ):
         super().__init__(ctx, items, per_page)
 
-        self.average = floor_to_ndp(
-            sum(item.extras[KEY_PLAY_RATING] for item in items) / len(items), 2
-        )
-        self.has_estimated_play_rating = any(
-            item.extras.get(KEY_INTERNAL_LEVEL) is None for item in items
-        )
+        # Batches only materialize the records of the page being shown, so read
+        # their columns instead of going through every record.
+        if isinstance(items, RecordBatch):
+            play_ratings = [rating or 0 for rating in items.play_ratings]
+            has_estimated_play_rating = any(
+                math.isnan(level) for level in items.internal_levels
+            )
+        else:
+            play_ratings = [item.extras[KEY_PLAY_RATING] for item in items]
+            has_estimated_play_rating = any(
+                item.extras.get(KEY_INTERNAL_LEVEL) is None for item in items
+            )
+
+        self.average = floor_to_ndp(sum(play_ratings) / len(items), 2)
+        self.has_estimated_play_rating = has_estimated_play_rating
         self.show_average = show_average
 
     def format_content(self) -> str: